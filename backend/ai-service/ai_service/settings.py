@@ -128,6 +128,142 @@ REST_FRAMEWORK = {
     ],
 }
 
+# AI inference
+# Startup warmup: the "warmup" section of this manifest lists the models and translation
+# pairs to load and dummy inferences to run on them; /api/ready/ reports ready once the
+# models of its "required" routes (default: all of them) are warm. These models are pinned
+# in memory, and failed ones are warmed up again after AI_ROUTING_NEGATIVE_TTL seconds
+AI_WARMUP_MANIFEST = config('AI_WARMUP_MANIFEST', default=str(BASE_DIR / 'model_manifest.json'))
+# Replaces the manifest's warmup translation pairs when set (comma-separated, e.g. en-fr,fr-en)
+AI_WARMUP_TRANSLATION_PAIRS = [
+    pair.strip() for pair in config('AI_WARMUP_TRANSLATION_PAIRS', default='').split(',') if pair.strip()
+]
+# Warm up in a background thread when the server starts, never for management commands
+# (benchmarks turn this off to time cold loads; /api/ready/ is then always ready)
+AI_WARMUP_ENABLED = config('AI_WARMUP_ENABLED', default=True, cast=bool)
+# Approximate memory budget for loaded models; least recently used unpinned models are
+# evicted when it is exceeded (0 = unbounded)
+AI_MODEL_MEMORY_BUDGET_MB = config('AI_MODEL_MEMORY_BUDGET_MB', default=1200, cast=int)
+# CPU precision for model weights: fp32, int8 (dynamic quantization of Linear layers) or
+# bf16 (only on CPUs with native support). Per-model overrides use "model=precision,..."
+AI_MODEL_PRECISION = config('AI_MODEL_PRECISION', default='fp32')
+AI_MODEL_PRECISION_OVERRIDES = dict(
+    item.strip().rsplit('=', 1)
+    for item in config('AI_MODEL_PRECISION_OVERRIDES', default='').split(',')
+    if '=' in item
+)
+# int8 conversions are saved here after the first load so restarts skip the conversion
+AI_QUANTIZED_CACHE_DIR = config('AI_QUANTIZED_CACHE_DIR', default=str(BASE_DIR / '.model_cache'))
+# Inference backend: pytorch (transformers) or onnx (ONNX Runtime encoder/decoder graphs,
+# needs optimum[onnxruntime]; falls back to pytorch if unavailable). Per-model overrides
+# use "model=backend,...". Graphs are exported into AI_ONNX_DIR by download_models.py
+AI_INFERENCE_BACKEND = config('AI_INFERENCE_BACKEND', default='pytorch')
+AI_INFERENCE_BACKEND_OVERRIDES = dict(
+    item.strip().rsplit('=', 1)
+    for item in config('AI_INFERENCE_BACKEND_OVERRIDES', default='').split(',')
+    if '=' in item
+)
+AI_ONNX_DIR = config('AI_ONNX_DIR', default=str(BASE_DIR / 'onnx_models'))
+# Models packaged by download_models.py (safetensors weights loaded memory-mapped, fast
+# tokenizers that passed a parity check) are loaded offline from here when present
+AI_PACKAGED_MODELS_DIR = config('AI_PACKAGED_MODELS_DIR', default=str(BASE_DIR / 'packaged_models'))
+# Micro-batching: concurrent requests for the same model are collected for up to
+# AI_BATCH_WAIT_MS and run as one batched generate call (AI_BATCH_MAX_SIZE=1 disables it)
+AI_BATCH_MAX_SIZE = config('AI_BATCH_MAX_SIZE', default=8, cast=int)
+AI_BATCH_WAIT_MS = config('AI_BATCH_WAIT_MS', default=10, cast=int)
+# Maximum number of items accepted by /api/translate/batch/ and /api/summarize/batch/
+AI_BATCH_MAX_ITEMS = config('AI_BATCH_MAX_ITEMS', default=500, cast=int)
+# Long-document translation: texts over AI_DOCUMENT_THRESHOLD_CHARS are split into
+# sentence chunks of at most AI_DOCUMENT_CHUNK_TOKENS, translated AI_DOCUMENT_WINDOW at a time
+AI_DOCUMENT_THRESHOLD_CHARS = config('AI_DOCUMENT_THRESHOLD_CHARS', default=1000, cast=int)
+AI_DOCUMENT_CHUNK_TOKENS = config('AI_DOCUMENT_CHUNK_TOKENS', default=200, cast=int)
+AI_DOCUMENT_WINDOW = config('AI_DOCUMENT_WINDOW', default=8, cast=int)
+# Source language auto-detection: a guess below AI_LANGID_MIN_CONFIDENCE (or, for texts with
+# fewer than AI_LANGID_MIN_LETTERS letters, less than AI_LANGID_SHORT_MIN_MARGIN ahead of the
+# second guess; above 1 never trusts short texts) is dropped and the text taken to be in
+# AI_TRANSLATION_SOURCE_LANG (en)
+AI_LANGID_MIN_LETTERS = config('AI_LANGID_MIN_LETTERS', default=20, cast=int)
+AI_LANGID_MIN_CONFIDENCE = config('AI_LANGID_MIN_CONFIDENCE', default=0.6, cast=float)
+AI_LANGID_SHORT_MIN_MARGIN = config('AI_LANGID_SHORT_MIN_MARGIN', default=0.2, cast=float)
+# Map-reduce summarization: texts longer than one AI_SUMMARY_WINDOW_TOKENS window are
+# summarized per window (batched by the micro-batcher), then the partial summaries are reduced
+AI_SUMMARY_WINDOW_TOKENS = config('AI_SUMMARY_WINDOW_TOKENS', default=900, cast=int)
+AI_SUMMARY_MAP_MAX_TOKENS = config('AI_SUMMARY_MAP_MAX_TOKENS', default=120, cast=int)
+AI_SUMMARY_MAX_DEPTH = config('AI_SUMMARY_MAX_DEPTH', default=4, cast=int)
+# Admission control: at most AI_ADMISSION_MAX_REQUESTS inference requests in flight (keep it
+# below gunicorn's --threads so health checks always find a free thread) and at most
+# AI_ADMISSION_MAX_COST estimated cost (input tokens x beams; 0 = no cost bound). Requests
+# over either bound get 503 with Retry-After (capped at AI_ADMISSION_MAX_RETRY_AFTER seconds)
+AI_ADMISSION_ENABLED = config('AI_ADMISSION_ENABLED', default=True, cast=bool)
+AI_ADMISSION_MAX_REQUESTS = config('AI_ADMISSION_MAX_REQUESTS', default=6, cast=int)
+AI_ADMISSION_MAX_COST = config('AI_ADMISSION_MAX_COST', default=40000, cast=int)
+AI_ADMISSION_MAX_RETRY_AFTER = config('AI_ADMISSION_MAX_RETRY_AFTER', default=60, cast=int)
+# Inference worker pool: with AI_WORKER_POOL_SIZE > 0 the WSGI process loads the models and
+# forks that many inference workers sharing the weights copy-on-write (use one gunicorn worker).
+# Each worker runs AI_WORKER_THREADS torch threads (0 = CPUs / workers) and AI_WORKER_CONCURRENCY
+# requests at a time; AI_WORKER_CPU_AFFINITY=auto pins each worker to its own share of the CPUs.
+# Streams and background jobs still run in the front process
+AI_WORKER_POOL_SIZE = config('AI_WORKER_POOL_SIZE', default=0, cast=int)
+# Router mode instead of identical workers: shards of processes that each own some models,
+# "[name=]route,route:processes;..." with routes 'summarization', 'src-tgt' pairs, model names
+# or '*' (everything else), e.g. "summary=summarization:1;enfr=en-fr,fr-en:2;rest=*:1"
+AI_WORKER_SHARDS = config('AI_WORKER_SHARDS', default='')
+AI_WORKER_THREADS = config('AI_WORKER_THREADS', default=0, cast=int)
+AI_WORKER_CONCURRENCY = config('AI_WORKER_CONCURRENCY', default=2, cast=int)
+AI_WORKER_CPU_AFFINITY = config('AI_WORKER_CPU_AFFINITY', default='')
+AI_WORKER_TIMEOUT = config('AI_WORKER_TIMEOUT', default=120, cast=int)
+# Background jobs (/api/jobs/): run on AI_JOB_WORKERS threads, at most AI_JOB_MAX_PENDING
+# queued or running (more are rejected with 503), stored in the database for AI_JOB_TTL_SECONDS
+AI_JOB_WORKERS = config('AI_JOB_WORKERS', default=2, cast=int)
+AI_JOB_MAX_PENDING = config('AI_JOB_MAX_PENDING', default=100, cast=int)
+AI_JOB_TTL_SECONDS = config('AI_JOB_TTL_SECONDS', default=86400, cast=int)
+# Generation tiers a request can pick with "tier": fast (greedy), balanced (small beam) or
+# quality (full beam). AI_TIER_<TIER>_MAX_TIME (seconds) and AI_TIER_<TIER>_MAX_TOKENS stop
+# generation early (0, the default, means no limit); output cut off by either is returned
+# as is, without any marker. AI_DEFAULT_TIER is used when a request names none
+AI_DEFAULT_TIER = config('AI_DEFAULT_TIER', default='quality')
+AI_GENERATION_TIERS = {
+    tier: {
+        'num_beams': config(f'AI_TIER_{tier.upper()}_BEAMS', default=beams, cast=int),
+        'max_time': config(f'AI_TIER_{tier.upper()}_MAX_TIME', default=0, cast=float),
+        'max_tokens': config(f'AI_TIER_{tier.upper()}_MAX_TOKENS', default=0, cast=int),
+    }
+    for tier, beams in (('fast', 1), ('balanced', 2), ('quality', 4))
+}
+# Extra translation post-processing rules (JSON, see ai_tools/postprocess.py), applied
+# after the built-in fr→en pronoun fixes
+AI_POSTPROCESS_RULES_PATH = config('AI_POSTPROCESS_RULES_PATH', default='')
+# Result cache: identical translate/summarize requests are served from an in-memory LRU
+# (AI_CACHE_MAX_ENTRIES, AI_CACHE_TTL_SECONDS) backed by an optional SQLite file that
+# survives restarts and is shared between gunicorn workers (empty path disables it)
+AI_CACHE_ENABLED = config('AI_CACHE_ENABLED', default=True, cast=bool)
+AI_CACHE_MAX_ENTRIES = config('AI_CACHE_MAX_ENTRIES', default=2048, cast=int)
+AI_CACHE_TTL_SECONDS = config('AI_CACHE_TTL_SECONDS', default=86400, cast=int)
+AI_CACHE_SQLITE_PATH = config('AI_CACHE_SQLITE_PATH', default='')
+# Sentence-level translation memory for document translation; segments already seen for a
+# model and language pair skip the model (AI_TM_SQLITE_PATH persists it, empty keeps it in memory)
+AI_TM_ENABLED = config('AI_TM_ENABLED', default=True, cast=bool)
+AI_TM_MAX_ENTRIES = config('AI_TM_MAX_ENTRIES', default=50000, cast=int)
+AI_TM_SQLITE_PATH = config('AI_TM_SQLITE_PATH', default='')
+# Prometheus metrics at /metrics. With several processes (gunicorn workers, inference worker
+# pool) set PROMETHEUS_MULTIPROC_DIR to a writable directory so /metrics aggregates them all
+AI_METRICS_ENABLED = config('AI_METRICS_ENABLED', default=True, cast=bool)
+# /api/translate/ and /api/summarize/ send per-stage timings in a Server-Timing header.
+# ?profile=1 (cProfile) or ?profile=torch also returns the request's top profile entries;
+# allowed for staff sessions and for requests sending this token in X-Profile-Token
+AI_PROFILE_TOKEN = config('AI_PROFILE_TOKEN', default='')
+# Translation routing: every language pair is routed to a direct model, a two-step translation
+# through one of AI_ROUTING_PIVOTS, or marked unsupported. Only locally available models are
+# routed to, and missing ones are checked again every AI_ROUTING_NEGATIVE_TTL seconds; with
+# AI_ROUTING_ALLOW_DOWNLOADS pairs without a local model are routed "download" instead and
+# fetch their model on first use. Models that fail to load are routed around for
+# AI_ROUTING_NEGATIVE_TTL seconds
+AI_ROUTING_PIVOTS = [
+    lang.strip() for lang in config('AI_ROUTING_PIVOTS', default='en').split(',') if lang.strip()
+]
+AI_ROUTING_ALLOW_DOWNLOADS = config('AI_ROUTING_ALLOW_DOWNLOADS', default=False, cast=bool)
+AI_ROUTING_NEGATIVE_TTL = config('AI_ROUTING_NEGATIVE_TTL', default=600, cast=int)
+
 # CORS settings
 # Allow CORS from frontend (update with your Render frontend URL)
 CORS_ALLOWED_ORIGINS = config(
@@ -193,12 +329,14 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'x-profile-token',
 ]
 
 # Ensure CORS headers are sent even on error responses
 CORS_EXPOSE_HEADERS = [
     'Access-Control-Allow-Origin',
     'Access-Control-Allow-Credentials',
+    'Server-Timing',
 ]
 
 # Logging
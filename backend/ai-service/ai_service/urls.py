@@ -3,7 +3,7 @@ URL configuration for ai_service project.
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 
 def root_view(request):
     """Root endpoint - returns service status."""
@@ -13,9 +13,18 @@ def root_view(request):
         'message': 'AI Service is running. Use /api/ endpoints.',
         'endpoints': {
             'health': '/api/health/',
+            'ready': '/api/ready/',
             'translate': '/api/translate/',
+            'translate_batch': '/api/translate/batch/',
+            'translate_stream': '/api/translate/stream/',
             'summarize': '/api/summarize/',
-            'languages': '/api/languages/'
+            'summarize_batch': '/api/summarize/batch/',
+            'summarize_stream': '/api/summarize/stream/',
+            'jobs': '/api/jobs/',
+            'languages': '/api/languages/',
+            'stats': '/api/stats/',
+            'models': '/api/models/',
+            'metrics': '/metrics'
         }
     })
 
@@ -23,10 +32,16 @@ def health_view(request):
     """Health check endpoint."""
     return JsonResponse({'status': 'ok', 'service': 'ai-service'})
 
+def metrics_view(request):
+    """Prometheus metrics of the inference path."""
+    from ai_tools import metrics
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('ai_tools.urls')),  # This includes /api/health/, /api/translate/, etc.
     path('health/', health_view),
+    path('metrics', metrics_view),
     path('', root_view),
 ]
 
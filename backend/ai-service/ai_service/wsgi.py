@@ -8,6 +8,7 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 """
 
 import os
+import sys
 
 from django.core.wsgi import get_wsgi_application
 
@@ -15,3 +16,12 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_service.settings')
 
 application = get_wsgi_application()
 
+
+# Fork the inference worker pool (AI_WORKER_POOL_SIZE) now that the app is loaded, or
+# warm up the models in the background. gunicorn may load this module in its master
+# (--preload) and fork the workers afterwards, which would not inherit the warmup
+# thread: its workers start their own warmup in post_worker_init (gunicorn.conf.py)
+from ai_tools.services import start_warmup, start_worker_pool  # noqa: E402
+
+if not start_worker_pool() and 'gunicorn' not in sys.modules:
+    start_warmup()
@@ -1,4 +1,9 @@
 from django.contrib import admin
+from .models import Job
 
-# No models to register for AI service
 
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'progress_done', 'progress_total', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
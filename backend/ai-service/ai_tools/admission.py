@@ -0,0 +1,133 @@
+"""
+Admission control for inference requests.
+
+Every translate/summarize request is admitted with an estimated cost (input
+tokens times the tier's beam count) before it touches a model. The requests
+admitted and not yet finished form the inference queue, bounded both by
+count and by total cost. A request that would go over either bound is shed
+straight away with a retry delay estimated from how fast recent requests
+drained, instead of waiting behind long generations until the worker
+timeout. Keeping the count below the server's thread count leaves threads
+free for health and language routes, which are never admitted.
+"""
+import math
+import threading
+import time
+from collections import defaultdict
+
+# Weight of the newest sample in the drain-rate averages
+_EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """The inference queue is full; retry after ``retry_after`` seconds."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Inference queue full ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """An admitted request; release it when its inference is done (also usable as a context manager)."""
+    __slots__ = ('_controller', 'kind', 'cost', 'admitted_at', '_released')
+
+    def __init__(self, controller, kind, cost):
+        self._controller = controller
+        self.kind = kind
+        self.cost = cost
+        self.admitted_at = time.perf_counter()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class AdmissionController:
+    """Bounded inference queue: admits requests by count and estimated cost, sheds the rest."""
+
+    def __init__(self, max_requests=6, max_cost=0, max_retry_after=60, enabled=True):
+        self.max_requests = max_requests
+        self.max_cost = max_cost
+        self.max_retry_after = max_retry_after
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._cost = 0
+        self._peak_depth = 0
+        # Seconds per request and per unit of cost of recent requests
+        self._seconds_per_request = None
+        self._seconds_per_cost = None
+        self._admitted = defaultdict(int)
+        self._shed = defaultdict(int)
+        self._shed_reasons = defaultdict(int)
+
+    def admit(self, kind, cost):
+        """
+        Admit a request of estimated ``cost`` and return its Ticket, or raise Overloaded.
+
+        A request costing more than the whole budget is still admitted when
+        the queue is empty, so large inputs run alone rather than never.
+        """
+        cost = max(1, int(cost))
+        with self._lock:
+            if self.enabled:
+                if self.max_requests and self._depth >= self.max_requests:
+                    self._shed_locked(kind, 'requests')
+                    raise Overloaded('requests', self._retry_after(self._seconds_per_request))
+                over = self._cost + cost - self.max_cost
+                if self.max_cost and self._depth and over > 0:
+                    self._shed_locked(kind, 'cost')
+                    seconds = self._seconds_per_cost * over if self._seconds_per_cost is not None else None
+                    raise Overloaded('cost', self._retry_after(seconds))
+            self._depth += 1
+            self._cost += cost
+            self._peak_depth = max(self._peak_depth, self._depth)
+            self._admitted[kind] += 1
+        return Ticket(self, kind, cost)
+
+    def _shed_locked(self, kind, reason):
+        self._shed[kind] += 1
+        self._shed_reasons[reason] += 1
+
+    def _retry_after(self, seconds):
+        """Whole seconds to wait, clamped to [1, max_retry_after]; caller holds the lock."""
+        if seconds is None:
+            seconds = 1
+        return int(min(self.max_retry_after, max(1, math.ceil(seconds))))
+
+    def _release(self, ticket):
+        elapsed = time.perf_counter() - ticket.admitted_at
+        with self._lock:
+            self._depth -= 1
+            self._cost -= ticket.cost
+            self._seconds_per_request = _ewma(self._seconds_per_request, elapsed)
+            self._seconds_per_cost = _ewma(self._seconds_per_cost, elapsed / ticket.cost)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'depth': self._depth,
+                'peak_depth': self._peak_depth,
+                'cost_in_flight': self._cost,
+                'max_requests': self.max_requests or None,
+                'max_cost': self.max_cost or None,
+                'admitted': dict(self._admitted),
+                'shed': dict(self._shed),
+                'shed_total': sum(self._shed.values()),
+                'shed_reasons': dict(self._shed_reasons),
+                'seconds_per_request': round(self._seconds_per_request, 3) if self._seconds_per_request is not None else None,
+            }
+
+
+def _ewma(current, sample):
+    return sample if current is None else current + _EWMA_ALPHA * (sample - current)
@@ -0,0 +1,221 @@
+"""
+Dynamic micro-batching for translation and summarization inference.
+
+Concurrent requests for the same model are collected for a short wait window,
+grouped into length buckets (so padding stays small) and run through the
+pipeline as a single batched ``generate`` call. Each caller blocks on its own
+future and gets back only its own result.
+
+Every model key has its own queue and batch thread, so a long summarization
+batch never holds up translations queued behind it. A thread that has been
+idle for a while exits and is started again by the next request.
+"""
+import bisect
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+
+from . import metrics, timing
+
+logger = logging.getLogger(__name__)
+
+# Number of latency samples kept per batch size for percentile reporting
+_LATENCY_WINDOW = 1000
+# Seconds a model's batch thread waits for work before exiting
+_IDLE_SECONDS = 60
+
+
+class _PendingRequest:
+    """A single input waiting to be batched."""
+
+    __slots__ = ('model_key', 'pipe', 'text', 'params', 'params_key', 'future', 'enqueued_at', 'timings')
+
+    def __init__(self, model_key, pipe, text, params):
+        self.model_key = model_key
+        self.pipe = pipe
+        self.text = text
+        self.params = params
+        self.params_key = tuple(sorted(params.items()))
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+        # Stage timings of the submitting request, carried over to the batch thread
+        self.timings = timing.current()
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class MicroBatcher:
+    """
+    Collects requests per model within a wait window and runs them as batches.
+
+    Requests are grouped by (model key, generation params, length bucket);
+    only requests sharing all three go into the same forward pass. Each model
+    key is served by its own thread.
+    """
+
+    def __init__(self, max_batch_size=8, max_wait_ms=10, bucket_bounds=(64, 128, 256, 512, 1024)):
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self.bucket_bounds = tuple(sorted(bucket_bounds))
+        # model key -> (queue, batch thread)
+        self._queues = {}
+        self._worker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._latencies = defaultdict(lambda: deque(maxlen=_LATENCY_WINDOW))
+        self._batch_counts = defaultdict(int)
+
+    @property
+    def enabled(self):
+        return self.max_batch_size > 1
+
+    def submit(self, model_key, pipe, text, **params):
+        """
+        Run ``pipe(text, **params)`` as part of a batch and return this input's result.
+
+        Falls back to a direct call when batching is disabled or the request
+        is being profiled (so the profiler sees the work in its own thread).
+        """
+        if not self.enabled or timing.profiling():
+            started = time.perf_counter()
+            result = pipe(text, **params)
+            self._record(1, [time.perf_counter() - started])
+            return result
+
+        request = _PendingRequest(model_key, pipe, text, params)
+        self._enqueue(model_key, [request])
+        return request.future.result()
+
+    def submit_many(self, model_key, pipe, texts, **params):
+        """
+        Run several inputs for one model through the batcher and return their results in order.
+
+        The inputs are queued together, so they share batches with each other
+        and with any concurrent single requests for the same model.
+        """
+        texts = list(texts)
+        if not self.enabled or len(texts) <= 1 or timing.profiling():
+            return [self.submit(model_key, pipe, text, **params) for text in texts]
+
+        requests = [_PendingRequest(model_key, pipe, text, params) for text in texts]
+        self._enqueue(model_key, requests)
+        return [request.future.result() for request in requests]
+
+    def _enqueue(self, model_key, requests):
+        """Queue requests for their model's batch thread, starting it if needed."""
+        # Under the lock, so an idle thread can't exit between the check and the put
+        with self._worker_lock:
+            entry = self._queues.get(model_key)
+            if entry is None or not entry[1].is_alive():
+                pending = queue.Queue()
+                worker = threading.Thread(target=self._run, args=(model_key, pending),
+                                          name=f'ai-micro-batcher-{model_key}', daemon=True)
+                entry = self._queues[model_key] = (pending, worker)
+                worker.start()
+            for request in requests:
+                entry[0].put(request)
+
+    def _bucket(self, text):
+        """Index of the length bucket for ``text`` (character length approximates tokens)."""
+        return bisect.bisect_left(self.bucket_bounds, len(text))
+
+    def _run(self, model_key, pending_queue):
+        while True:
+            try:
+                first = pending_queue.get(timeout=_IDLE_SECONDS)
+            except queue.Empty:
+                with self._worker_lock:
+                    if pending_queue.empty():
+                        self._queues.pop(model_key, None)
+                        return
+                continue
+            pending = [first]
+            deadline = time.perf_counter() + self.max_wait
+            # Keep collecting until the window closes or the batch is full
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(pending_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            groups = defaultdict(list)
+            for request in pending:
+                groups[(request.params_key, self._bucket(request.text))].append(request)
+
+            for group in groups.values():
+                for start in range(0, len(group), self.max_batch_size):
+                    self._run_batch(group[start:start + self.max_batch_size])
+
+    def _run_batch(self, batch):
+        pipe = batch[0].pipe
+        params = batch[0].params
+        texts = [request.text for request in batch]
+        started = time.perf_counter()
+        try:
+            labels = getattr(pipe, 'metric_labels', (batch[0].model_key, ''))
+            # A request's queue wait is that of its longest-waiting input in the batch
+            waits = {}
+            for request in batch:
+                metrics.observe_queue_wait(labels, started - request.enqueued_at)
+                for timings in request.timings:
+                    waits[timings] = max(waits.get(timings, 0.0), started - request.enqueued_at)
+            for timings, wait in waits.items():
+                timings.add('queue', wait)
+            with timing.activate(waits):
+                if len(batch) == 1:
+                    results = [pipe(texts[0], **params)]
+                else:
+                    results = pipe(texts, batch_size=len(texts), **params)
+        except Exception as e:
+            # Whatever fails, the callers must not be left waiting on their futures
+            logger.warning(f"Batched generation failed for {batch[0].model_key} (size {len(batch)}): {e}")
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        finished = time.perf_counter()
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+        self._record(len(batch), [finished - request.enqueued_at for request in batch])
+        logger.debug(f"Ran batch of {len(batch)} for {batch[0].model_key}")
+
+    def _record(self, batch_size, latencies):
+        with self._stats_lock:
+            self._batch_counts[batch_size] += 1
+            self._latencies[batch_size].extend(latencies)
+
+    def get_stats(self):
+        """Per-batch-size request counts and p50/p99 latency in milliseconds."""
+        with self._stats_lock:
+            snapshot = {size: sorted(values) for size, values in self._latencies.items()}
+            counts = dict(self._batch_counts)
+        by_size = {}
+        for size in sorted(snapshot):
+            values = snapshot[size]
+            by_size[str(size)] = {
+                'batches': counts.get(size, 0),
+                'samples': len(values),
+                'p50_ms': round(_percentile(values, 50) * 1000, 2),
+                'p99_ms': round(_percentile(values, 99) * 1000, 2),
+            }
+        return {
+            'enabled': self.enabled,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'pending': sum(pending.qsize() for pending, _ in list(self._queues.values())),
+            'models': len(self._queues),
+            'batches_total': sum(counts.values()),
+            'requests_total': sum(size * count for size, count in counts.items()),
+            'by_batch_size': by_size,
+        }
@@ -0,0 +1,248 @@
+"""
+Content-addressed cache for translation and summarization results.
+
+Results are keyed by a hash of the normalized input and everything that
+affects the output (languages, model id, generation params). Lookups go
+through an in-memory LRU tier with TTL, then an optional SQLite tier that
+survives restarts and is shared by every gunicorn worker on the host.
+Identical requests that arrive while the first one is still running wait
+for its result instead of running inference again.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text):
+    """Canonical form of input text for cache keys (NFC, Unix line endings)."""
+    return unicodedata.normalize('NFC', text).replace('\r\n', '\n')
+
+
+def make_cache_key(namespace, text, **params):
+    """SHA-256 key over the normalized text and the params that shape the output."""
+    payload = json.dumps(
+        {'ns': namespace, 'text': normalize_text(text), 'params': params},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SQLiteStore:
+    """
+    Persistent key/value table with expiry, values stored as JSON.
+
+    Uses one connection per thread and WAL mode so several gunicorn workers
+    can share the file.
+    """
+
+    _PURGE_EVERY = 500
+    # Stay well under SQLite's bound-parameter limit
+    _MAX_PARAMS = 500
+
+    def __init__(self, path, table, ttl_seconds):
+        self.path = str(path)
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._writes = 0
+        self._connection().execute(
+            f'CREATE TABLE IF NOT EXISTS {table} ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """Return {key: value} for the keys that are present and not expired."""
+        found = {}
+        keys = list(keys)
+        now = time.time()
+        conn = self._connection()
+        for start in range(0, len(keys), self._MAX_PARAMS):
+            batch = keys[start:start + self._MAX_PARAMS]
+            rows = conn.execute(
+                f'SELECT key, value FROM {self.table} '
+                f'WHERE key IN ({",".join("?" * len(batch))}) AND expires_at >= ?',
+                (*batch, now),
+            )
+            for key, value in rows:
+                found[key] = json.loads(value)
+        return found
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def set_many(self, items):
+        """Store {key: value} pairs with a fresh expiry."""
+        if not items:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        conn = self._connection()
+        conn.executemany(
+            f'INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)',
+            [(key, json.dumps(value, ensure_ascii=False), expires_at) for key, value in items.items()],
+        )
+        previous = self._writes
+        self._writes += len(items)
+        if previous // self._PURGE_EVERY != self._writes // self._PURGE_EVERY:
+            conn.execute(f'DELETE FROM {self.table} WHERE expires_at < ?', (time.time(),))
+
+
+class ResultCache:
+    """Two-tier (memory LRU + optional SQLite) result cache with request coalescing."""
+
+    def __init__(self, max_entries=2048, ttl_seconds=86400, sqlite_path=None, enabled=True):
+        self.enabled = enabled
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'stores': 0,
+            'errors': 0,
+        }
+        self._disk = None
+        if enabled and sqlite_path:
+            try:
+                self._disk = SQLiteStore(sqlite_path, 'ai_result_cache', ttl_seconds)
+                logger.info(f"Result cache persistent tier: {sqlite_path}")
+            except Exception as e:
+                logger.warning(f"⚠️ Result cache persistent tier disabled: {e}")
+
+    def _get_memory(self, key):
+        """Memory-tier lookup; caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self._counters['expirations'] += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_memory(self, key, value):
+        """Memory-tier insert with LRU eviction; caller holds the lock."""
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def get_or_compute(self, key, compute, cacheable=lambda value: True):
+        """
+        Return ``(value, status)`` for ``key``, computing it at most once.
+
+        ``status`` is 'hit', 'disk_hit', 'coalesced' or 'miss'. Values for which
+        ``cacheable(value)`` is false (e.g. error payloads) are returned but not stored.
+        """
+        if not self.enabled:
+            return compute(), 'disabled'
+
+        with self._lock:
+            value = self._get_memory(key)
+            if value is not None:
+                self._counters['hits'] += 1
+                metrics.count_cache_lookup('result', 'hit')
+                return value, 'hit'
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                owner = True
+            else:
+                self._counters['coalesced'] += 1
+                owner = False
+
+        if not owner:
+            metrics.count_cache_lookup('result', 'coalesced')
+            return pending.result(), 'coalesced'
+
+        try:
+            status = 'miss'
+            value = self._get_disk(key)
+            if value is not None:
+                status = 'disk_hit'
+            else:
+                value = compute()
+            with self._lock:
+                self._counters['disk_hits' if status == 'disk_hit' else 'misses'] += 1
+                if cacheable(value):
+                    self._set_memory(key, value)
+                    if status == 'miss':
+                        self._counters['stores'] += 1
+            metrics.count_cache_lookup('result', status)
+            if status == 'miss' and cacheable(value):
+                self._set_disk(key, value)
+            pending.set_result(value)
+            return value, status
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _get_disk(self, key):
+        if self._disk is None:
+            return None
+        try:
+            return self._disk.get(key)
+        except Exception as e:
+            self._counters['errors'] += 1
+            logger.warning(f"Result cache read failed: {e}")
+            return None
+
+    def _set_disk(self, key, value):
+        if self._disk is None:
+            return
+        try:
+            self._disk.set(key, value)
+        except Exception as e:
+            self._counters['errors'] += 1
+            logger.warning(f"Result cache write failed: {e}")
+
+    def get_stats(self):
+        """Hit/miss/eviction counters and tier sizes."""
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters['hits'] + counters['disk_hits'] + counters['misses'] + counters['coalesced']
+        return dict(
+            counters,
+            enabled=self.enabled,
+            entries=size,
+            max_entries=self.max_entries,
+            ttl_seconds=self.ttl_seconds,
+            persistent=self._disk.path if self._disk is not None else None,
+            hit_rate=round((lookups - counters['misses']) / lookups, 4) if lookups else None,
+        )
@@ -0,0 +1,148 @@
+"""
+Build ai_tools/data/langid.npz, the character n-gram language identification model.
+
+The training text is the set of UI translations shipped in Django's and Django
+REST framework's locale catalogs (installed with the service, so the model can
+be rebuilt anywhere): msgids for English and msgstrs for the other languages,
+plus the course-material sentences in langid_extra/<language>.txt. Every tenth
+string is held out to fit the confidence temperature.
+
+Usage (from backend/ai-service):
+    python -m ai_tools.data.train_langid
+"""
+import argparse
+import gettext
+from collections import Counter
+from pathlib import Path
+
+import django
+import numpy as np
+import rest_framework
+
+from ai_tools.langid import MODEL_PATH, letter_count, ngram_keys
+
+LANGUAGES = ['en', 'fr', 'ar', 'es', 'de', 'it', 'pt']
+EXTRA_DIR = Path(__file__).resolve().parent / 'langid_extra'
+HOLDOUT_EVERY = 10
+
+
+def _catalog_strings(language):
+    """Translated strings of every Django/DRF catalog for ``language`` (msgids for English)."""
+    strings = set()
+    roots = [Path(django.__file__).parent, Path(rest_framework.__file__).parent]
+    source = 'fr' if language == 'en' else language
+    for root in roots:
+        for mo_path in sorted(root.glob(f'**/locale/{source}/LC_MESSAGES/*.mo')):
+            with open(mo_path, 'rb') as mo_file:
+                catalog = gettext.GNUTranslations(mo_file)._catalog
+            for msgid, msgstr in catalog.items():
+                if not msgid:
+                    continue  # catalog header
+                text = msgid[0] if isinstance(msgid, tuple) else msgid
+                if language != 'en':
+                    text = msgstr
+                strings.update(part for part in text.split('\x00') if part)
+    return sorted(strings)
+
+
+def _training_strings(language):
+    strings = _catalog_strings(language)
+    extra_path = EXTRA_DIR / f'{language}.txt'
+    if extra_path.exists():
+        strings += [line.strip() for line in extra_path.read_text(encoding='utf-8').splitlines() if line.strip()]
+    return strings
+
+
+def _split(strings):
+    train = [s for i, s in enumerate(strings) if i % HOLDOUT_EVERY]
+    held_out = [s for i, s in enumerate(strings) if not i % HOLDOUT_EVERY]
+    return train, held_out
+
+
+def train(max_order=3, per_language=4000, alpha=0.5):
+    corpora = {language: _split(_training_strings(language)) for language in LANGUAGES}
+
+    counts = {}
+    for language, (train_strings, _) in corpora.items():
+        counter = Counter()
+        for text in train_strings:
+            counter.update(ngram_keys(text, max_order).tolist())
+        counts[language] = counter
+
+    # Vocabulary: the most frequent n-grams of every language
+    vocabulary = set()
+    for counter in counts.values():
+        vocabulary.update(key for key, _ in counter.most_common(per_language))
+    keys = np.array(sorted(vocabulary), dtype=np.uint64)
+
+    log_probs = np.zeros((len(keys), len(LANGUAGES)), dtype=np.float32)
+    unknown = np.zeros(len(LANGUAGES), dtype=np.float32)
+    for column, language in enumerate(LANGUAGES):
+        counter = counts[language]
+        total = sum(counter.values()) + alpha * (len(keys) + 1)
+        log_probs[:, column] = np.log([(counter.get(int(key), 0) + alpha) / total for key in keys])
+        unknown[column] = np.log(alpha / total)
+
+    model = {
+        'languages': np.array(LANGUAGES),
+        'keys': keys,
+        'log_probs': log_probs,
+        'unknown_log_probs': unknown,
+        'max_order': np.array(max_order),
+        'temperature': np.array(1.0),
+    }
+    held_out = [(language, text) for language, (_, strings) in corpora.items() for text in strings
+                if letter_count(text) >= 10]
+    model['temperature'] = np.array(_fit_temperature(model, held_out))
+    return model, corpora, held_out
+
+
+def _held_out_scores(model, held_out):
+    from ai_tools.langid import LanguageIdentifier
+
+    identifier = LanguageIdentifier.__new__(LanguageIdentifier)
+    identifier.languages = list(model['languages'])
+    identifier.keys = model['keys']
+    identifier.log_probs = model['log_probs']
+    identifier.unknown_log_probs = model['unknown_log_probs']
+    identifier.max_order = int(model['max_order'])
+    scores = np.array([identifier.scores(text) for _, text in held_out])
+    labels = np.array([identifier.languages.index(language) for language, _ in held_out])
+    return scores, labels
+
+
+def _fit_temperature(model, held_out):
+    """Temperature minimizing the held-out negative log-likelihood of the confidences."""
+    scores, labels = _held_out_scores(model, held_out)
+    scores = scores - scores.max(axis=1, keepdims=True)
+    best_temperature, best_nll = 1.0, None
+    for temperature in np.geomspace(0.5, 200, 60):
+        scaled = scores / temperature
+        log_norm = np.log(np.exp(scaled).sum(axis=1))
+        nll = float(np.mean(log_norm - scaled[np.arange(len(labels)), labels]))
+        if best_nll is None or nll < best_nll:
+            best_temperature, best_nll = float(temperature), nll
+    return best_temperature
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the character n-gram language identifier.')
+    parser.add_argument('--output', default=str(MODEL_PATH))
+    parser.add_argument('--max-order', type=int, default=3)
+    parser.add_argument('--per-language', type=int, default=4000, help='n-grams kept per language')
+    args = parser.parse_args()
+
+    model, corpora, held_out = train(args.max_order, args.per_language)
+    np.savez_compressed(args.output, **model)
+
+    scores, labels = _held_out_scores(model, held_out)
+    accuracy = float((scores.argmax(axis=1) == labels).mean())
+    for language, (train_strings, held_out_strings) in corpora.items():
+        print(f"{language}: {len(train_strings)} training strings, {len(held_out_strings)} held out")
+    print(f"{len(model['keys'])} n-grams, temperature {float(model['temperature']):.2f}, "
+          f"held-out accuracy {accuracy:.3f}")
+    print(f"Saved {args.output} ({Path(args.output).stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == '__main__':
+    main()
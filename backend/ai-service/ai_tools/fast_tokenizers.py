@@ -0,0 +1,75 @@
+"""
+Fast (Rust) counterparts of slow tokenizers, for packaged models.
+
+transformers converts most seq2seq tokenizers itself; Marian's has no
+converter, so one is defined here.
+"""
+import transformers
+from tokenizers import normalizers, processors
+from transformers import PreTrainedTokenizerFast
+from transformers.convert_slow_tokenizer import SpmConverter, import_protobuf
+
+
+class _MarianConverter(SpmConverter):
+    """
+    Slow-to-fast conversion for MarianTokenizer, which transformers has none of.
+
+    Marian encodes with the source SentencePiece model but numbers pieces by
+    its own vocab.json, so the Unigram vocabulary follows vocab.json with the
+    SentencePiece scores; pieces only the target side knows get a score low
+    enough never to be picked over source pieces.
+    """
+
+    def __init__(self, original_tokenizer):
+        self.original_tokenizer = original_tokenizer
+        if getattr(original_tokenizer, 'separate_vocabs', False):
+            raise ValueError("Marian models with separate source and target vocabularies are not supported")
+        proto = import_protobuf().ModelProto()
+        with open(original_tokenizer.spm_files[0], 'rb') as f:
+            proto.ParseFromString(f.read())
+        self.proto = proto
+
+    def vocab(self, proto):
+        scores = {piece.piece: piece.score for piece in proto.pieces}
+        floor = min(scores.values(), default=0.0) - 10.0
+        ordered = sorted(self.original_tokenizer.encoder.items(), key=lambda item: item[1])
+        if [index for _, index in ordered] != list(range(len(ordered))):
+            raise ValueError("Marian vocabulary ids are not contiguous")
+        return [(piece, scores.get(piece, floor)) for piece, _ in ordered]
+
+    def unk_id(self, proto):
+        return self.original_tokenizer.encoder[str(self.original_tokenizer.unk_token)]
+
+    def normalizer(self, proto):
+        normalizer = super().normalizer(proto)
+        if not proto.normalizer_spec.remove_extra_whitespaces:
+            return normalizer
+        # SentencePiece also drops leading and trailing whitespace
+        return normalizers.Sequence([normalizer, normalizers.Strip()])
+
+    def post_processor(self):
+        eos = str(self.original_tokenizer.eos_token)
+        return processors.TemplateProcessing(
+            single=['$A', eos],
+            pair=['$A', '$B', eos],
+            special_tokens=[(eos, self.original_tokenizer.eos_token_id)],
+        )
+
+
+def build_fast_tokenizer(slow):
+    """Fast counterpart of a slow tokenizer (raises when there is no conversion)."""
+    if type(slow).__name__ == 'MarianTokenizer':
+        converted = _MarianConverter(slow).converted()
+        return PreTrainedTokenizerFast(
+            tokenizer_object=converted,
+            eos_token=str(slow.eos_token),
+            unk_token=str(slow.unk_token),
+            pad_token=str(slow.pad_token),
+            additional_special_tokens=list(slow.supported_language_codes),
+            model_max_length=slow.model_max_length,
+        )
+    # convert_slow_tokenizer covers the other seq2seq families (T5, BART, Pegasus, ...)
+    fast_class = getattr(transformers, f"{type(slow).__name__}Fast", None)
+    if fast_class is None:
+        raise ValueError(f"No fast tokenizer class for {type(slow).__name__}")
+    return fast_class.from_pretrained(slow.name_or_path)
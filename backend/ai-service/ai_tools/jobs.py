@@ -0,0 +1,279 @@
+"""
+Asynchronous translation and summarization jobs.
+
+A job is stored in the service database (ai_tools.Job) and run by a local
+thread pool, so the client only holds a connection long enough to submit it
+and can poll for status, progress and the result. Jobs keep running when the
+client goes away. Each job waits for an admission ticket like a synchronous
+request, so jobs and requests share one bounded inference queue.
+
+A running job records its owner (host, process id and process start time).
+On first use a process requeues queued jobs and running jobs whose owner
+process on this host is gone; jobs owned by other live processes are left
+alone. Jobs are deleted once their TTL passes.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .admission import Overloaded
+from .models import Job
+from .services import admit_request, estimate_cost, summarize_text, translate_text
+
+logger = logging.getLogger(__name__)
+
+# Seconds between progress writes of one job
+_PROGRESS_INTERVAL = 0.5
+
+
+class JobQueueFull(Exception):
+    """Too many jobs are waiting; retry after ``retry_after`` seconds."""
+
+    def __init__(self, pending, retry_after):
+        super().__init__(f"{pending} jobs pending, retry after {retry_after}s")
+        self.pending = pending
+        self.retry_after = retry_after
+
+
+def _run_translate(params, progress):
+    return translate_text(
+        params['text'],
+        params.get('target_language', 'en'),
+        params.get('source_language', 'auto'),
+        params.get('mode', 'auto'),
+        params.get('tier'),
+        progress=progress,
+    )
+
+
+def _run_summarize(params, progress):
+    return summarize_text(
+        params['text'],
+        params.get('max_length', 150),
+        params.get('mode', 'auto'),
+        params.get('tier'),
+        progress=progress,
+    )
+
+
+_RUNNERS = {
+    'translate': _run_translate,
+    'summarize': _run_summarize,
+}
+
+
+def _process_start(pid):
+    """Start time of process ``pid`` in clock ticks since boot, '' if unknown, None if it doesn't exist."""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            # The command name may contain spaces; fields after it are space separated
+            return f.read().rsplit(')', 1)[1].split()[19]
+    except FileNotFoundError:
+        return None
+    except (OSError, IndexError):
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return None
+    except OSError:
+        pass
+    return ''
+
+
+def current_owner():
+    """Owner id of jobs run by this process: 'host:pid:start time'."""
+    pid = os.getpid()
+    return f"{socket.gethostname()}:{pid}:{_process_start(pid) or ''}"
+
+
+def owner_alive(owner):
+    """
+    Whether the process that claimed a job may still be running it.
+
+    Processes on other hosts can't be checked and count as alive; a process id
+    reused by a newer process (different start time) counts as gone.
+    """
+    host, _, rest = owner.partition(':')
+    pid, _, started = rest.partition(':')
+    if not pid.isdigit():
+        return False
+    if host != socket.gethostname():
+        return True
+    current = _process_start(int(pid))
+    if current is None:
+        return False
+    return not (started and current and started != current)
+
+
+class JobRunner:
+    """Thread pool that runs stored jobs and tracks how many are pending."""
+
+    def __init__(self, workers=2, ttl_seconds=86400, max_pending=100):
+        self.workers = max(1, workers)
+        self.ttl_seconds = ttl_seconds
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _ensure_started(self):
+        """Start the pool and requeue jobs interrupted by a restart; runs once."""
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ai-job')
+        owner = current_owner()
+        running = Job.objects.filter(status=Job.STATUS_RUNNING).exclude(owner=owner).values_list('id', 'owner')
+        orphaned = [job_id for job_id, job_owner in running if not owner_alive(job_owner)]
+        requeued = 0
+        if orphaned:
+            requeued = Job.objects.filter(pk__in=orphaned, status=Job.STATUS_RUNNING).update(
+                status=Job.STATUS_QUEUED, started_at=None, owner=''
+            )
+        queued = list(Job.objects.filter(status=Job.STATUS_QUEUED).order_by('created_at').values_list('id', flat=True))
+        if queued:
+            logger.info(f"Resuming {len(queued)} queued jobs ({requeued} interrupted by a restart)")
+        for job_id in queued:
+            self._enqueue(job_id)
+
+    def _enqueue(self, job_id):
+        with self._lock:
+            self._pending += 1
+        self._executor.submit(self._run, job_id)
+
+    def submit(self, kind, params):
+        """Store a job and queue it; raises JobQueueFull when max_pending jobs are waiting."""
+        self._ensure_started()
+        self.purge_expired()
+        with self._lock:
+            pending = self._pending
+        if self.max_pending and pending >= self.max_pending:
+            raise JobQueueFull(pending, retry_after=30)
+        job = Job.objects.create(
+            kind=kind,
+            params=params,
+            expires_at=timezone.now() + timedelta(seconds=self.ttl_seconds),
+        )
+        self._enqueue(job.id)
+        logger.info(f"Queued {kind} job {job.id} ({len(params.get('text', ''))} chars)")
+        return job
+
+    def get(self, job_id):
+        """The job with ``job_id``, or None if it doesn't exist or has expired."""
+        self._ensure_started()
+        return Job.objects.filter(pk=job_id, expires_at__gt=timezone.now()).first()
+
+    def purge_expired(self):
+        """Delete jobs past their TTL."""
+        deleted, _ = Job.objects.filter(expires_at__lte=timezone.now()).exclude(status=Job.STATUS_RUNNING).delete()
+        if deleted:
+            logger.info(f"♻️ Deleted {deleted} expired jobs")
+        return deleted
+
+    def _admit(self, job):
+        """Wait until the job is admitted into the inference queue and return its ticket."""
+        cost = estimate_cost(job.params.get('text'), job.params.get('tier'))
+        while True:
+            try:
+                return admit_request(f'{job.kind}_job', cost)
+            except Overloaded as e:
+                time.sleep(e.retry_after)
+
+    def _run(self, job_id):
+        ticket = None
+        try:
+            job = Job.objects.filter(pk=job_id, status=Job.STATUS_QUEUED).first()
+            if job is None:
+                return
+            # The job stays queued while it waits for an admission ticket
+            ticket = self._admit(job)
+            # Claim the job so a requeued duplicate never runs it twice
+            claimed = Job.objects.filter(pk=job_id, status=Job.STATUS_QUEUED).update(
+                status=Job.STATUS_RUNNING, started_at=timezone.now(), owner=current_owner()
+            )
+            if not claimed:
+                return
+            last_write = [0.0]
+
+            def progress(done, total, unit):
+                now = time.monotonic()
+                if done < total and now - last_write[0] < _PROGRESS_INTERVAL:
+                    return
+                last_write[0] = now
+                Job.objects.filter(pk=job_id).update(progress_done=done, progress_total=total, progress_unit=unit)
+
+            started = time.perf_counter()
+            try:
+                result = _RUNNERS[job.kind](job.params, progress)
+            except Exception as e:
+                result = {'error': str(e)}
+            failed = bool(result.get('error')) and not result.get('summary')
+            update = {
+                'status': Job.STATUS_FAILED if failed else Job.STATUS_DONE,
+                'result': result,
+                'error': result.get('error', '') if failed else '',
+                'finished_at': timezone.now(),
+            }
+            if not failed:
+                job.refresh_from_db(fields=['progress_total'])
+                update.update(progress_done=job.progress_total or 1, progress_total=job.progress_total or 1)
+            Job.objects.filter(pk=job_id).update(**update)
+            with self._lock:
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+            logger.info(f"{'❌' if failed else '✅'} {job.kind} job {job_id} {update['status']} in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} could not run: {e}")
+        finally:
+            if ticket is not None:
+                ticket.release()
+            with self._lock:
+                self._pending -= 1
+            # Pool threads are long-lived; don't keep a database connection per thread
+            connection.close()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'pending': self._pending,
+                'max_pending': self.max_pending or None,
+                'completed': self._completed,
+                'failed': self._failed,
+                'ttl_seconds': self.ttl_seconds,
+            }
+
+
+_runner = JobRunner(
+    workers=getattr(settings, 'AI_JOB_WORKERS', 2),
+    ttl_seconds=getattr(settings, 'AI_JOB_TTL_SECONDS', 86400),
+    max_pending=getattr(settings, 'AI_JOB_MAX_PENDING', 100),
+)
+
+
+def submit_job(kind, params):
+    """Store and queue a job; see JobRunner.submit."""
+    return _runner.submit(kind, params)
+
+
+def get_job(job_id):
+    """A job that hasn't expired, or None."""
+    return _runner.get(job_id)
+
+
+def get_job_stats():
+    """Job worker pool size, pending jobs and completed/failed counts."""
+    return _runner.get_stats()
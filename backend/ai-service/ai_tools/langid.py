@@ -0,0 +1,156 @@
+"""
+Character n-gram language identification.
+
+A multinomial naive Bayes model over character 1-3 grams, stored as sorted
+n-gram keys and a log-probability matrix in data/langid.npz (built by
+data/train_langid.py). Scoring a text is a handful of NumPy operations:
+encode the normalized text as code points, pack every n-gram into one
+uint64 key, look the keys up with searchsorted and sum the matching rows.
+"""
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .segmentation import split_sentences
+
+MODEL_PATH = Path(__file__).resolve().parent / 'data' / 'langid.npz'
+
+# Everything but letters separates n-grams; format placeholders are dropped
+_NON_LETTER_RE = re.compile(r"[\W\d_]+")
+_PLACEHOLDER_RE = re.compile(r"%\([^)]*\)[sdif]|%[sdif]|\{[^}]*\}")
+_SPACE = ord(' ')
+
+
+def normalize(text):
+    """Lowercase letters only, single-spaced and padded with one space on each side."""
+    return ' ' + _NON_LETTER_RE.sub(' ', _PLACEHOLDER_RE.sub(' ', text.lower())).strip() + ' '
+
+
+def ngram_keys(text, max_order=3):
+    """
+    Character n-grams (orders 1..max_order) of ``text`` packed into uint64 keys.
+
+    Each code point takes 21 bits, so a trigram key is c0<<42 | c1<<21 | c2.
+    Orders can't collide because padded text never contains code point 0.
+    """
+    cleaned = normalize(text)
+    if len(cleaned) <= 2:
+        return np.empty(0, dtype=np.uint64)
+    codes = np.frombuffer(cleaned.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    keys = [codes[codes != _SPACE]]
+    for order in range(2, max_order + 1):
+        if len(codes) < order:
+            break
+        key = codes[:len(codes) - order + 1].copy()
+        for offset in range(1, order):
+            key = (key << np.uint64(21)) | codes[offset:len(codes) - order + 1 + offset]
+        keys.append(key)
+    return np.concatenate(keys)
+
+
+def letter_count(text):
+    return len(normalize(text).replace(' ', ''))
+
+
+class LanguageIdentifier:
+    """Scores texts against the languages of a trained n-gram model."""
+
+    def __init__(self, path=MODEL_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            self.languages = [str(language) for language in data['languages']]
+            self.keys = data['keys']
+            self.log_probs = data['log_probs']
+            self.unknown_log_probs = data['unknown_log_probs']
+            self.max_order = int(data['max_order'])
+            self.temperature = float(data['temperature'])
+
+    def scores(self, text):
+        """Log-likelihood of ``text`` under every language (``None`` if it has no letters)."""
+        keys = ngram_keys(text, self.max_order)
+        if not len(keys):
+            return None
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = self.keys[positions] == keys
+        return (self.log_probs[positions[found]].sum(axis=0)
+                + (len(keys) - found.sum()) * self.unknown_log_probs)
+
+    def detect(self, text):
+        """
+        Return ``(language, confidences)`` where confidences maps every language to
+        its probability. ``(None, {})`` for text without letters.
+        """
+        scores = self.scores(text)
+        if scores is None:
+            return None, {}
+        scaled = (scores - scores.max()) / self.temperature
+        probabilities = np.exp(scaled)
+        probabilities /= probabilities.sum()
+        return self.languages[int(probabilities.argmax())], dict(zip(self.languages, probabilities.round(4).tolist()))
+
+    def detect_confident(self, text, min_letters=20, min_confidence=0.6, short_margin=None):
+        """
+        Like ``detect``, but the language is None when the best guess is below
+        ``min_confidence``, or when ``text`` has fewer than ``min_letters``
+        letters and the best guess is less than ``short_margin`` ahead of the
+        second (no short text is trusted when it is None). Short words and
+        names ('Computer science', 'OK') look like several languages at once;
+        a short text whose guess stands out ('Bonjour', 'Hasta mañana') keeps it.
+        """
+        short = letter_count(text) < min_letters
+        if short and short_margin is None:
+            return None, {}
+        language, confidences = self.detect(text)
+        if short:
+            runner_up = max((value for other, value in confidences.items() if other != language), default=0)
+            if confidences.get(language, 0) - runner_up < short_margin:
+                return None, confidences
+        elif confidences.get(language, 0) < min_confidence:
+            return None, confidences
+        return language, confidences
+
+    def detect_runs(self, text, min_letters=20, min_confidence=0.6):
+        """
+        Split ``text`` into consecutive ``(language, segment)`` runs, sentence by sentence.
+
+        Sentences that are too short or too ambiguous to call on their own
+        (headings, names, numbers) join the run before them, or the run after
+        them at the start of the text. Joining the segments gives back ``text``.
+        """
+        leading, pairs = split_sentences(text)
+        runs = []
+        pending = leading
+        for sentence, whitespace in pairs:
+            language, _ = self.detect_confident(sentence, min_letters, min_confidence)
+            segment = pending + sentence + whitespace
+            pending = ''
+            if language is None:
+                if runs:
+                    runs[-1][1] += segment
+                else:
+                    pending = segment
+            elif runs and runs[-1][0] == language:
+                runs[-1][1] += segment
+            else:
+                runs.append([language, segment])
+        if not runs:
+            language, _ = self.detect(text)
+            return [(language, text)] if language else []
+        if pending:
+            runs[-1][1] += pending
+        return [(language, segment) for language, segment in runs]
+
+
+_identifier = None
+_identifier_lock = threading.Lock()
+
+
+def get_identifier():
+    """The shared identifier, loaded from MODEL_PATH on first use."""
+    global _identifier
+    if _identifier is None:
+        with _identifier_lock:
+            if _identifier is None:
+                _identifier = LanguageIdentifier()
+    return _identifier
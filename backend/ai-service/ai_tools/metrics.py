@@ -0,0 +1,166 @@
+"""
+Prometheus metrics for the inference path, served at /metrics.
+
+The metrics cover end-to-end request time, micro-batcher queue wait,
+tokenize/generate/decode time and token counts per model and language pair,
+plus model loads, loaded-model memory and cache lookups.
+
+Recording is cheap: labeled children are created once and kept in a dict, so
+a hot-path observation is a dict lookup and an increment (no per-request
+locks or allocations beyond the client's own value update). When
+PROMETHEUS_MULTIPROC_DIR is set, every process (gunicorn workers, forked
+inference workers) writes its values to files in that directory and
+/metrics aggregates them. The directory should be emptied before the server
+starts (see gunicorn.conf.py).
+
+Model and pair labels are bounded: once services sets ``known_models`` and
+``known_pairs``, any other model is recorded as 'other' and any other pair as
+'unsupported', so request input can't create new series.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+# Turned off by services when AI_METRICS_ENABLED is false
+enabled = True
+# Model and pair label values recorded as they are (None records any value); set by services
+known_models = None
+known_pairs = None
+OTHER_MODEL = 'other'
+UNSUPPORTED_PAIR = 'unsupported'
+
+_REQUEST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+_STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_RATE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+_LOAD_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+REQUEST_SECONDS = Histogram(
+    'scholara_ai_request_seconds', 'End-to-end time of translate and summarize calls',
+    ['kind', 'model', 'pair', 'cache'], buckets=_REQUEST_BUCKETS,
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    'scholara_ai_queue_wait_seconds', 'Time inputs wait in the micro-batcher before their batch runs',
+    ['model', 'pair'], buckets=_STAGE_BUCKETS,
+)
+TOKENIZE_SECONDS = Histogram(
+    'scholara_ai_tokenize_seconds', 'Tokenization time per input',
+    ['model', 'pair'], buckets=_STAGE_BUCKETS,
+)
+GENERATE_SECONDS = Histogram(
+    'scholara_ai_generate_seconds', 'Time of one (possibly batched) generate call',
+    ['model', 'pair'], buckets=_STAGE_BUCKETS,
+)
+DECODE_SECONDS = Histogram(
+    'scholara_ai_decode_seconds', 'Detokenization time per output',
+    ['model', 'pair'], buckets=_STAGE_BUCKETS,
+)
+GENERATE_TOKENS_PER_SECOND = Histogram(
+    'scholara_ai_generate_tokens_per_second', 'Output tokens per second of generate calls',
+    ['model', 'pair'], buckets=_RATE_BUCKETS,
+)
+INPUT_TOKENS = Counter('scholara_ai_input_tokens', 'Tokens fed to the models', ['model', 'pair'])
+OUTPUT_TOKENS = Counter('scholara_ai_output_tokens', 'Tokens generated by the models', ['model', 'pair'])
+MODEL_LOAD_SECONDS = Histogram(
+    'scholara_ai_model_load_seconds', 'Model load time', ['model'], buckets=_LOAD_BUCKETS,
+)
+# Largest value across processes: forked workers share the weights they inherit, so a sum
+# would overcount
+MODEL_RESIDENT_BYTES = Gauge(
+    'scholara_ai_model_resident_bytes', 'Approximate resident size of loaded models (0 once evicted)',
+    ['model'], multiprocess_mode='livemax',
+)
+CACHE_LOOKUPS = Counter(
+    'scholara_ai_cache_lookups', 'Result cache and translation memory lookups by outcome',
+    ['cache', 'result'],
+)
+
+_children = {}
+
+
+def _child(metric, *labels):
+    """The labeled child of ``metric``, created once per label set."""
+    key = (metric, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+def _bounded(model, pair):
+    """(model, pair) labels with unknown values collapsed; '' (no pair) is kept."""
+    if known_models is not None and model not in known_models:
+        model = OTHER_MODEL
+    if pair and known_pairs is not None and pair not in known_pairs:
+        pair = UNSUPPORTED_PAIR
+    return model, pair
+
+
+def observe_request(kind, model, pair, seconds, cache):
+    if enabled:
+        _child(REQUEST_SECONDS, kind, *_bounded(model, pair), cache).observe(seconds)
+
+
+def observe_queue_wait(labels, seconds):
+    if enabled:
+        _child(QUEUE_WAIT_SECONDS, *_bounded(*labels)).observe(seconds)
+
+
+def observe_tokenize(labels, seconds, tokens):
+    if enabled:
+        labels = _bounded(*labels)
+        _child(TOKENIZE_SECONDS, *labels).observe(seconds)
+        _child(INPUT_TOKENS, *labels).inc(tokens)
+
+
+def observe_generate(labels, seconds, tokens):
+    if enabled:
+        labels = _bounded(*labels)
+        _child(GENERATE_SECONDS, *labels).observe(seconds)
+        _child(OUTPUT_TOKENS, *labels).inc(tokens)
+        if seconds > 0:
+            _child(GENERATE_TOKENS_PER_SECOND, *labels).observe(tokens / seconds)
+
+
+def observe_decode(labels, seconds):
+    if enabled:
+        _child(DECODE_SECONDS, *_bounded(*labels)).observe(seconds)
+
+
+def observe_model_load(model, seconds, size_bytes):
+    if enabled:
+        _child(MODEL_LOAD_SECONDS, model).observe(seconds)
+        _child(MODEL_RESIDENT_BYTES, model).set(size_bytes)
+
+
+def observe_model_evicted(model):
+    if enabled:
+        _child(MODEL_RESIDENT_BYTES, model).set(0)
+
+
+def count_cache_lookup(cache, result, count=1):
+    if enabled and count:
+        _child(CACHE_LOOKUPS, cache, result).inc(count)
+
+
+def render():
+    """Metrics in the Prometheus text format, aggregated across processes in multiprocess mode."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
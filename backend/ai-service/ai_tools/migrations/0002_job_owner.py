@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_tools', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='owner',
+            field=models.CharField(blank=True, help_text='host:pid:start time of the process running the job', max_length=255),
+        ),
+    ]
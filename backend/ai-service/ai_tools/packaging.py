@@ -0,0 +1,156 @@
+"""
+Packaged models: self-contained local model directories the service loads offline.
+
+download_models.py packages every model of the manifest into
+``<models_dir>/<org>--<name>/``:
+
+- the weights as safetensors, which load memory-mapped instead of being
+  unpickled into freshly initialized parameters
+- the original (slow) tokenizer files
+- a fast (Rust) tokenizer in ``fast-tokenizer/``, only when it produces the
+  same token ids and decoded text as the slow one on the parity texts
+- ``package.json`` describing the above
+
+Services load a model from its package when there is one (local files only,
+no hub lookups) and from the Hugging Face cache otherwise. transformers is
+imported on first use, so reading package.json stays cheap.
+"""
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_FILE = 'package.json'
+FAST_TOKENIZER_DIR = 'fast-tokenizer'
+# Bumped when the directory layout changes; older packages are ignored
+PACKAGE_FORMAT = 1
+
+
+def package_dir(models_dir, model_name):
+    """Directory holding the package of a model."""
+    return Path(models_dir) / model_name.strip('/').replace('/', '--')
+
+
+def read_package(models_dir, model_name):
+    """The package.json of a model (with its 'path'), or None when it is not packaged."""
+    if not models_dir:
+        return None
+    path = package_dir(models_dir, model_name)
+    try:
+        with open(path / PACKAGE_FILE, encoding='utf-8') as f:
+            package = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if package.get('format') != PACKAGE_FORMAT:
+        logger.warning(f"Ignoring package of {model_name} in {path}: format {package.get('format')}, expected {PACKAGE_FORMAT}")
+        return None
+    package['path'] = str(path)
+    return package
+
+
+def load_tokenizer(model_name, package=None, use_fast=True):
+    """
+    Tokenizer of a model: from its package when given (the fast tokenizer if
+    it passed the parity check, else the slow one), else from the hub with
+    ``use_fast``.
+    """
+    from transformers import AutoTokenizer
+
+    if package is None:
+        return AutoTokenizer.from_pretrained(model_name, use_fast=use_fast)
+    if package['tokenizer'] == 'fast':
+        return AutoTokenizer.from_pretrained(os.path.join(package['path'], FAST_TOKENIZER_DIR), local_files_only=True)
+    return AutoTokenizer.from_pretrained(package['path'], use_fast=False, local_files_only=True)
+
+
+def check_token_parity(slow, fast, texts):
+    """
+    Compare the token ids and decoded text of both tokenizers on ``texts``.
+
+    Decoded texts are compared without surrounding whitespace, which the slow
+    Marian decoder strips and the fast one keeps.
+
+    Returns {'texts', 'mismatches', 'first_mismatch'}.
+    """
+    mismatches = 0
+    first = None
+    for text in texts:
+        slow_ids = slow(text)['input_ids']
+        fast_ids = fast(text)['input_ids']
+        slow_text = slow.decode(slow_ids, skip_special_tokens=True).strip()
+        fast_text = fast.decode(slow_ids, skip_special_tokens=True).strip()
+        if slow_ids != fast_ids or slow_text != fast_text:
+            mismatches += 1
+            if first is None:
+                first = {
+                    'text': text,
+                    'slow_ids': slow_ids, 'fast_ids': fast_ids,
+                    'slow_decoded': slow_text, 'fast_decoded': fast_text,
+                }
+    return {'texts': len(texts), 'mismatches': mismatches, 'first_mismatch': first}
+
+
+def package_model(model_name, models_dir, task, parity_texts):
+    """
+    Package a model (downloading it into the Hugging Face cache if needed).
+
+    The directory is built next to its final location and swapped in once
+    complete, so a failed run leaves the previous package in place. Returns
+    the package.json contents.
+    """
+    import transformers
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    from .fast_tokenizers import build_fast_tokenizer
+
+    started = time.perf_counter()
+    target = package_dir(models_dir, model_name)
+    building = target.with_name(f"{target.name}.tmp{os.getpid()}")
+    shutil.rmtree(building, ignore_errors=True)
+
+    slow = AutoTokenizer.from_pretrained(model_name, use_fast=False)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    # Keep tensors checkpoints usually leave out (Marian's sinusoidal position tables):
+    # loading onto the meta device would leave them uninitialized
+    model._keys_to_ignore_on_save = None
+    model.save_pretrained(building, safe_serialization=True)
+    slow.save_pretrained(building)
+    del model
+
+    tokenizer, parity = 'slow', None
+    try:
+        fast = build_fast_tokenizer(slow)
+        parity = check_token_parity(slow, fast, parity_texts)
+        if parity['mismatches'] == 0:
+            fast.save_pretrained(building / FAST_TOKENIZER_DIR)
+            tokenizer = 'fast'
+        else:
+            logger.warning(f"⚠️ Fast tokenizer of {model_name} differs from the slow one on "
+                           f"{parity['mismatches']}/{parity['texts']} parity texts; packaging the slow tokenizer")
+    except Exception as e:
+        logger.warning(f"⚠️ No fast tokenizer for {model_name}, packaging the slow tokenizer: {e}")
+        parity = {'error': str(e)}
+
+    package = {
+        'format': PACKAGE_FORMAT,
+        'model': model_name,
+        'task': task,
+        'weights': sorted(path.name for path in building.glob('*.safetensors')),
+        'tokenizer': tokenizer,
+        'tokenizer_class': type(slow).__name__,
+        'parity': parity,
+        'transformers': transformers.__version__,
+        'packaged_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+    with open(building / PACKAGE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(package, f, indent=2)
+
+    if target.exists():
+        shutil.rmtree(target)
+    building.rename(target)
+    logger.info(f"📦 Packaged {model_name} in {time.perf_counter() - started:.1f}s ({tokenizer} tokenizer) → {target}")
+    return package
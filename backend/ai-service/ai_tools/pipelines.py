@@ -0,0 +1,306 @@
+"""
+Model loading helpers: CPU precision modes, ONNX Runtime backend and shared
+translation models.
+
+Seq2seq checkpoints can be loaded in fp32, with dynamic int8 quantization of
+their Linear layers, or in bf16 where the CPU supports it. Quantized models
+are saved after the first conversion so later loads skip it. Alternatively
+they run as exported ONNX encoder/decoder graphs with past-key-value caching
+through optimum's ORTModelForSeq2SeqLM, which plugs into the same pipelines.
+Models packaged by download_models.py (see packaging.py) load from their
+local safetensors files without random initialization, weights memory-mapped.
+
+Several language pairs can resolve to the same checkpoint (t5-small serves
+both en→fr and fr→en; AI_TRANSLATION_MODEL serves every pair). The weights
+and tokenizer are loaded once per model and each pair gets its own thin
+TranslationPipeline on top of them.
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import torch
+import transformers
+from transformers import AutoModelForSeq2SeqLM, SummarizationPipeline, TranslationPipeline
+from transformers.utils import is_accelerate_available
+
+from . import metrics, timing
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ('fp32', 'int8', 'bf16')
+
+
+def cpu_supports_bf16():
+    """Whether the CPU has native bf16 instructions (AVX512-BF16 or AMX)."""
+    try:
+        with open('/proc/cpuinfo') as cpuinfo:
+            flags = cpuinfo.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
+
+
+def _quantized_cache_path(cache_dir, model_name):
+    """Where the int8 conversion of a model is saved; versioned so upgrades rebuild it."""
+    safe_name = model_name.strip('/').replace('/', '--')
+    return Path(cache_dir) / f"{safe_name}.int8.torch-{torch.__version__}.transformers-{transformers.__version__}.pt"
+
+
+_loading = threading.local()
+# transformers releases whose private MarianSinusoidalPositionalEmbedding._init_weight(out) is patched
+_POSITION_TABLE_PATCH_VERSIONS = ('4.35.',)
+
+
+def _skippable_position_tables():
+    """
+    Let packaged loads skip computing Marian's sinusoidal position tables.
+
+    Marian builds them in its constructor with a Python loop (about half a
+    second per table for 512 positions); packages store them, so loads from a
+    package (flagged in this thread) leave them to be filled from the file.
+    This patches a private transformers method, so only on the releases in
+    _POSITION_TABLE_PATCH_VERSIONS; other releases compute the tables as usual.
+    """
+    if not transformers.__version__.startswith(_POSITION_TABLE_PATCH_VERSIONS):
+        return
+    from transformers.models.marian.modeling_marian import MarianSinusoidalPositionalEmbedding
+
+    method = MarianSinusoidalPositionalEmbedding.__dict__.get('_init_weight')
+    if not isinstance(method, staticmethod):
+        logger.warning("MarianSinusoidalPositionalEmbedding._init_weight changed, packaged loads compute position tables")
+        return
+    compute = method.__func__
+    if getattr(compute, 'skippable', False):
+        return
+
+    def init_weight(out):
+        if getattr(_loading, 'packaged', False):
+            out.requires_grad = False
+            return out
+        return compute(out)
+    init_weight.skippable = True
+    MarianSinusoidalPositionalEmbedding._init_weight = staticmethod(init_weight)
+
+
+def load_seq2seq_model(model_name, precision='fp32', cache_dir=None, source=None):
+    """
+    Load a seq2seq model in the requested CPU precision.
+
+    Args:
+        model_name: Hub id or local path of the checkpoint
+        precision: 'fp32', 'int8' (dynamic quantization of Linear layers) or 'bf16'
+        cache_dir: Directory where int8 conversions are saved and reused (optional)
+        source: Packaged model directory to load from instead (see packaging.py); its
+            safetensors weights are memory-mapped rather than copied into fresh parameters
+
+    Returns:
+        (model, precision actually used)
+    """
+    if precision not in PRECISIONS:
+        logger.warning(f"Unknown precision '{precision}' for {model_name}, using fp32")
+        precision = 'fp32'
+    if precision == 'bf16' and not torch.cuda.is_available() and not cpu_supports_bf16():
+        logger.warning(f"⚠️ CPU has no native bf16 support, loading {model_name} in fp32")
+        precision = 'fp32'
+
+    cache_path = _quantized_cache_path(cache_dir, model_name) if precision == 'int8' and cache_dir else None
+    if cache_path is not None and cache_path.exists():
+        try:
+            model = torch.load(cache_path, weights_only=False)
+            model.eval()
+            logger.info(f"Loaded cached int8 model for {model_name} from {cache_path}")
+            return model, precision
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable int8 cache {cache_path}: {e}")
+
+    dtype = torch.bfloat16 if precision == 'bf16' else torch.float32
+    if source is not None and is_accelerate_available():
+        _skippable_position_tables()
+        _loading.packaged = True
+        try:
+            model = AutoModelForSeq2SeqLM.from_pretrained(
+                source,
+                torch_dtype=dtype,
+                local_files_only=True,
+                use_safetensors=True,
+                # Builds the model on the meta device (no random initialization) and keeps
+                # fp32 weights backed by the mapped file
+                low_cpu_mem_usage=True,
+            )
+        finally:
+            _loading.packaged = False
+        # Anything the package lacks is still on the meta device
+        if any(tensor.is_meta for tensor in itertools.chain(model.parameters(), model.buffers())):
+            logger.warning(f"Package of {model_name} misses some weights, loading it without memory-mapping")
+            model = AutoModelForSeq2SeqLM.from_pretrained(source, torch_dtype=dtype, local_files_only=True)
+    elif source is not None:
+        model = AutoModelForSeq2SeqLM.from_pretrained(source, torch_dtype=dtype, local_files_only=True)
+    else:
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name, torch_dtype=dtype)
+    if precision == 'int8':
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        if cache_path is not None:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = cache_path.with_suffix(f'.tmp{os.getpid()}')
+                torch.save(model, tmp_path)
+                os.replace(tmp_path, cache_path)
+                logger.info(f"Saved int8 conversion of {model_name} to {cache_path}")
+            except Exception as e:
+                logger.warning(f"Could not cache int8 model for {model_name}: {e}")
+    model.eval()
+    return model, precision
+
+
+def onnx_export_dir(onnx_dir, model_name):
+    """Directory holding the exported ONNX graphs of a model."""
+    return Path(onnx_dir) / model_name.strip('/').replace('/', '--')
+
+
+def export_onnx_model(model_name, onnx_dir):
+    """
+    Export a seq2seq model to ONNX (encoder, decoder and decoder-with-past graphs).
+
+    Returns the loaded ORTModelForSeq2SeqLM; the graphs are saved under
+    ``onnx_export_dir(onnx_dir, model_name)``. Requires optimum[onnxruntime].
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    started = time.perf_counter()
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        model_name, export=True, use_cache=True, provider='CPUExecutionProvider',
+    )
+    export_dir = onnx_export_dir(onnx_dir, model_name)
+    model.save_pretrained(export_dir)
+    logger.info(f"Exported {model_name} to ONNX in {time.perf_counter() - started:.1f}s: {export_dir}")
+    return model
+
+
+def load_onnx_seq2seq_model(model_name, onnx_dir):
+    """
+    Load a seq2seq model on ONNX Runtime (CPU), using pre-exported graphs when available.
+
+    Graphs missing from ``onnx_dir`` are exported on the spot and saved for the
+    next start. Raises ImportError when optimum/onnxruntime are not installed.
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    export_dir = onnx_export_dir(onnx_dir, model_name)
+    if (export_dir / 'encoder_model.onnx').exists():
+        return ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True, provider='CPUExecutionProvider')
+    logger.warning(f"No exported ONNX graphs for {model_name} in {onnx_dir}, exporting now")
+    return export_onnx_model(model_name, onnx_dir)
+
+
+class StageMetricsMixin:
+    """
+    Records tokenize, generate and decode time and token counts of a
+    text2text pipeline under its ``metric_labels`` (model, pair), and adds
+    the times to the request's stage timings.
+    """
+
+    metric_labels = ('unknown', '')
+
+    def preprocess(self, *args, **kwargs):
+        started = time.perf_counter()
+        model_inputs = super().preprocess(*args, **kwargs)
+        mask = model_inputs.get('attention_mask')
+        tokens = int(mask.sum()) if mask is not None else model_inputs['input_ids'].numel()
+        elapsed = time.perf_counter() - started
+        metrics.observe_tokenize(self.metric_labels, elapsed, tokens)
+        timing.record('tokenize', elapsed)
+        return model_inputs
+
+    def _forward(self, model_inputs, **generate_kwargs):
+        started = time.perf_counter()
+        model_outputs = super()._forward(model_inputs, **generate_kwargs)
+        output_ids = model_outputs['output_ids']
+        pad_token_id = getattr(self.tokenizer, 'pad_token_id', None)
+        tokens = int((output_ids != pad_token_id).sum()) if pad_token_id is not None else output_ids.numel()
+        elapsed = time.perf_counter() - started
+        metrics.observe_generate(self.metric_labels, elapsed, tokens)
+        timing.record('generate', elapsed)
+        return model_outputs
+
+    def postprocess(self, *args, **kwargs):
+        started = time.perf_counter()
+        records = super().postprocess(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        metrics.observe_decode(self.metric_labels, elapsed)
+        timing.record('decode', elapsed)
+        return records
+
+
+class MeteredSummarizationPipeline(StageMetricsMixin, SummarizationPipeline):
+    """Summarization pipeline that records stage metrics."""
+
+    def __init__(self, *args, model_name='unknown', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metric_labels = (model_name, '')
+
+
+class PairTranslationPipeline(StageMetricsMixin, TranslationPipeline):
+    """
+    Translation pipeline for one language pair over a model shared with other pairs.
+
+    The pair's task prefix (e.g. T5's "translate English to French: ") is applied
+    here instead of being written into the shared model config.
+    """
+
+    def __init__(self, *args, pair_prefix='', metric_labels=('unknown', ''), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pair_prefix = pair_prefix
+        self.metric_labels = metric_labels
+
+    def preprocess(self, *args, **kwargs):
+        if self.pair_prefix and args and isinstance(args[0], str):
+            args = (self.pair_prefix + args[0],) + args[1:]
+        return super().preprocess(*args, **kwargs)
+
+
+class SharedTranslationModel:
+    """One loaded translation model and tokenizer, shared by every pair that uses it."""
+
+    def __init__(self, model_name, model, tokenizer, device=-1, precision='fp32', backend='pytorch'):
+        self.model_name = model_name
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.precision = precision
+        self.backend = backend
+        self._pairs = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pairs(self):
+        return list(self._pairs)
+
+    def _pair_prefix(self, source_lang, target_lang):
+        """Task prefix for multi-task checkpoints such as T5 (empty for Marian models)."""
+        task_params = getattr(self.model.config, 'task_specific_params', None) or {}
+        return task_params.get(f'translation_{source_lang}_to_{target_lang}', {}).get('prefix', '')
+
+    def for_pair(self, source_lang, target_lang):
+        """Return (creating on first use) the pipeline for a language pair."""
+        pair = f'{source_lang}_{target_lang}'
+        translator = self._pairs.get(pair)
+        if translator is None:
+            with self._lock:
+                translator = self._pairs.get(pair)
+                if translator is None:
+                    translator = PairTranslationPipeline(
+                        model=self.model,
+                        tokenizer=self.tokenizer,
+                        device=self.device,
+                        # ONNX Runtime models are not PreTrainedModels, so the framework can't be inferred
+                        framework='pt',
+                        task='translation',
+                        pair_prefix=self._pair_prefix(source_lang, target_lang),
+                        metric_labels=(self.model_name, f'{source_lang}-{target_lang}'),
+                    )
+                    self._pairs[pair] = translator
+        return translator
@@ -0,0 +1,221 @@
+"""
+Single-pass rule engine for fixing up translations.
+
+Each rule is a case-insensitive pattern, a literal replacement and a ``when``
+condition on the source text and the raw translation (e.g. "the French says
+'sa fille' and mentions 'mère'"). Rules are compiled once. Per call, the
+conditions are evaluated once, and the rules that are active are applied in
+one pass with a combined alternation, compiled per set of active rules and
+cached.
+
+The result matches applying the active rules one after another with re.sub.
+In the combined pattern longer rules come first, so each match covers every
+rule that would touch that spot. Inside the match, the earliest active rule
+(in list order) is applied to its own sub-span, as it would have been first
+in the sequential order. This holds as long as a replacement never creates
+text another rule matches, which is true of rules that only swap a pronoun.
+
+``when`` is a dict of conditions that must all hold:
+    source_contains_all / source_contains_any: substrings of the lowercased source
+    output_contains_any: substrings of the lowercased translation
+    output_matches: regex searched in the translation (case-insensitive)
+    any: list of ``when`` dicts, at least one of which must hold
+
+Extra rules are loaded from a JSON file shaped like
+``{"fr-en": [{"name": ..., "pattern": ..., "replacement": ..., "when": {...}}]}``
+and run after the built-in rules of their language pair.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+
+from . import timing
+
+logger = logging.getLogger(__name__)
+
+_FEMININE_SOURCE_WORDS = ['fille', 'elle', 'disparue', 'mère']
+_FEMININE_OUTPUT_RE = r'(daughter|mother|girl|woman|she|her|Electra)'
+
+# Pronoun fixes for French → English: the model often renders "sa fille" (her
+# daughter) as "his daughter" and "il lui soit arrivé" as "happened to him"
+# when the person is female
+BUILTIN_RULES = {
+    'fr-en': [
+        # "his daughter" when French says "sa fille" and the mother is the subject
+        {'name': 'her_daughter', 'pattern': r'\bhis daughter\b', 'replacement': 'her daughter',
+         'when': {'source_contains_all': ['mère', 'sa fille']}},
+        {'name': 'her_own_daughter', 'pattern': r'\bhis own daughter\b', 'replacement': 'her daughter',
+         'when': {'source_contains_all': ['mère', 'sa fille']}},
+        # News of the daughter in a mother context
+        {'name': 'heard_of_her_daughter', 'pattern': r'\bheard of his daughter\b',
+         'replacement': 'heard of her daughter',
+         'when': {'any': [{'source_contains_any': ['mère']}, {'output_contains_any': ['mother']}]}},
+        {'name': 'news_of_her_daughter', 'pattern': r'\bnews of his daughter\b',
+         'replacement': 'news of her daughter',
+         'when': {'any': [{'source_contains_any': ['mère']}, {'output_contains_any': ['mother']}]}},
+        {'name': 'news_about_her_daughter', 'pattern': r'\bnews about his daughter\b',
+         'replacement': 'news about her daughter',
+         'when': {'any': [{'source_contains_any': ['mère']}, {'output_contains_any': ['mother']}]}},
+        {'name': 'heard_news_of_her_daughter', 'pattern': r'\bheard news of his daughter\b',
+         'replacement': 'heard news of her daughter',
+         'when': {'any': [{'source_contains_any': ['mère']}, {'output_contains_any': ['mother']}]}},
+        # "happened to him" about a woman or girl
+        {'name': 'happened_to_her', 'pattern': r'\bhappened to him\b', 'replacement': 'happened to her',
+         'when': {'source_contains_any': _FEMININE_SOURCE_WORDS, 'output_matches': _FEMININE_OUTPUT_RE}},
+        {'name': 'has_happened_to_her', 'pattern': r'\bhas happened to him\b', 'replacement': 'has happened to her',
+         'when': {'source_contains_any': _FEMININE_SOURCE_WORDS, 'output_matches': _FEMININE_OUTPUT_RE}},
+        {'name': 'had_happened_to_her', 'pattern': r'\bhad happened to him\b', 'replacement': 'had happened to her',
+         'when': {'source_contains_any': _FEMININE_SOURCE_WORDS, 'output_matches': _FEMININE_OUTPUT_RE}},
+        {'name': 'will_happen_to_her', 'pattern': r'\bwill happen to him\b', 'replacement': 'will happen to her',
+         'when': {'source_contains_any': _FEMININE_SOURCE_WORDS, 'output_matches': _FEMININE_OUTPUT_RE}},
+        # "she fears ... happened to him"
+        {'name': 'she_fears_happened_to_her', 'pattern': r'\bhappened to him\b', 'replacement': 'happened to her',
+         'when': {'output_matches': r'\bshe\b.*\bfears?\b'}},
+        {'name': 'she_fears_has_happened_to_her', 'pattern': r'\bhas happened to him\b',
+         'replacement': 'has happened to her', 'when': {'output_matches': r'\bshe\b.*\bfears?\b'}},
+        {'name': 'she_fears_had_happened_to_her', 'pattern': r'\bhad happened to him\b',
+         'replacement': 'had happened to her', 'when': {'output_matches': r'\bshe\b.*\bfears?\b'}},
+    ],
+}
+
+
+class _Texts:
+    """Source and output of one call, with their lowercased forms."""
+    __slots__ = ('source', 'output', 'source_lower', 'output_lower')
+
+    def __init__(self, source, output):
+        self.source = source
+        self.output = output
+        # Eager: lowering a sentence costs less than a lazy property lookup per condition
+        self.source_lower = source.lower()
+        self.output_lower = output.lower()
+
+
+def _all_in(words, text):
+    for word in words:
+        if word not in text:
+            return False
+    return True
+
+
+def _any_in(words, text):
+    for word in words:
+        if word in text:
+            return True
+    return False
+
+
+def _compile_condition(when):
+    """Turn a ``when`` dict into a predicate over _Texts."""
+    # Plain loops rather than generator expressions: conditions run on every translation
+    checks = []
+    for key, value in (when or {}).items():
+        if key == 'source_contains_all':
+            checks.append(lambda t, words=tuple(value): _all_in(words, t.source_lower))
+        elif key == 'source_contains_any':
+            checks.append(lambda t, words=tuple(value): _any_in(words, t.source_lower))
+        elif key == 'output_contains_any':
+            checks.append(lambda t, words=tuple(value): _any_in(words, t.output_lower))
+        elif key == 'output_matches':
+            checks.append(lambda t, regex=re.compile(value, re.IGNORECASE): regex.search(t.output) is not None)
+        elif key == 'any':
+            options = [_compile_condition(option) for option in value]
+
+            def any_option(t, options=options):
+                for option in options:
+                    if option(t):
+                        return True
+                return False
+            checks.append(any_option)
+        else:
+            raise ValueError(f"Unknown rule condition: {key}")
+    if len(checks) == 1:
+        return checks[0]
+
+    def condition(t):
+        for check in checks:
+            if not check(t):
+                return False
+        return True
+    return condition
+
+
+class RuleSet:
+    """Compiled rules of one language pair."""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._patterns = [re.compile(rule['pattern'], re.IGNORECASE) for rule in self.rules]
+        # Rules sharing a condition share one evaluation per call
+        self._conditions = []
+        self._condition_of = []
+        condition_index = {}
+        for rule in self.rules:
+            key = json.dumps(rule.get('when') or {}, sort_keys=True)
+            if key not in condition_index:
+                condition_index[key] = len(self._conditions)
+                self._conditions.append(_compile_condition(rule.get('when')))
+            self._condition_of.append(condition_index[key])
+        self._combined = {}
+        self._lock = threading.Lock()
+
+    def _combined_for(self, active):
+        """Combined alternation of the active rules, longest pattern first."""
+        combined = self._combined.get(active)
+        if combined is None:
+            ordered = sorted(active, key=lambda index: -len(self.rules[index]['pattern']))
+            combined = re.compile('|'.join(f'(?:{self.rules[index]["pattern"]})' for index in ordered), re.IGNORECASE)
+            with self._lock:
+                self._combined[active] = combined
+        return combined
+
+    def apply(self, output, source):
+        texts = _Texts(source, output)
+        holds = [None] * len(self._conditions)
+        active = []
+        for index, condition_index in enumerate(self._condition_of):
+            if holds[condition_index] is None:
+                holds[condition_index] = self._conditions[condition_index](texts)
+            if holds[condition_index]:
+                active.append(index)
+        if not active:
+            return output
+
+        def replace(match):
+            start, end = match.span()
+            for index in active:
+                inner = self._patterns[index].search(output, start, end)
+                if inner is not None:
+                    return output[start:inner.start()] + self.rules[index]['replacement'] + output[inner.end():end]
+            return match.group(0)
+
+        return self._combined_for(tuple(active)).sub(replace, output)
+
+
+class PostProcessor:
+    """Rule sets per language pair ('fr-en'), built-in rules first, then extra rules from a file."""
+
+    def __init__(self, rules_path=None):
+        rules = {pair: list(pair_rules) for pair, pair_rules in BUILTIN_RULES.items()}
+        if rules_path:
+            try:
+                with open(rules_path, encoding='utf-8') as rules_file:
+                    extra = json.load(rules_file)
+                for pair, pair_rules in extra.items():
+                    rules.setdefault(pair, []).extend(pair_rules)
+                logger.info(f"Loaded {sum(len(r) for r in extra.values())} extra post-processing rules from {rules_path}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Could not load post-processing rules from {rules_path}: {e}")
+        self._rule_sets = {pair: RuleSet(pair_rules) for pair, pair_rules in rules.items()}
+        # Identifies the rules in result cache keys, so editing them invalidates cached translations
+        self.fingerprint = hashlib.sha1(json.dumps(rules, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+    def apply(self, source_lang, target_lang, translated_text, original_text):
+        """Fix up ``translated_text`` (translated from ``original_text``) with the pair's rules."""
+        rule_set = self._rule_sets.get(f'{source_lang}-{target_lang}')
+        if rule_set is None or not translated_text:
+            return translated_text
+        with timing.stage('postprocess'):
+            return rule_set.apply(translated_text, original_text)
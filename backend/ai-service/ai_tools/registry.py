@@ -0,0 +1,199 @@
+"""
+Bounded registry of loaded inference pipelines.
+
+Tracks the approximate resident size of every loaded pipeline and evicts
+the least recently used ones when the total goes over a memory budget.
+Pinned models (the warmup set) are never evicted. Loads are single-flight:
+concurrent callers for a model that is already loading (e.g. a request
+arriving during warmup) wait for that load instead of starting another.
+"""
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from pathlib import Path
+
+from . import metrics, timing
+
+logger = logging.getLogger(__name__)
+
+# Number of load/evict events kept for the models endpoint
+_EVENT_HISTORY = 200
+
+
+def estimate_model_bytes(obj):
+    """Approximate resident bytes of a pipeline or model (parameters, buffers, quantized weights, ONNX graphs)."""
+    model = getattr(obj, 'model', obj)
+    total = 0
+    for tensors in (getattr(model, 'parameters', None), getattr(model, 'buffers', None)):
+        if tensors is None:
+            continue
+        for tensor in tensors():
+            total += tensor.numel() * tensor.element_size()
+    # Dynamically quantized Linear layers keep their weights in packed params
+    for module in getattr(model, 'modules', lambda: [])():
+        if hasattr(module, '_packed_params') and callable(getattr(module, 'weight', None)):
+            for tensor in (module.weight(), module.bias()):
+                if tensor is not None:
+                    total += tensor.numel() * tensor.element_size()
+    # ONNX Runtime models hold their weights in the session; use the graph files' size
+    save_dir = getattr(model, 'model_save_dir', None)
+    if not total and save_dir is not None:
+        total = sum(path.stat().st_size for path in Path(save_dir).glob('*.onnx*'))
+    return total
+
+
+class _Entry:
+    __slots__ = ('value', 'size_bytes', 'loaded_at', 'last_used', 'uses', 'load_seconds')
+
+    def __init__(self, value, size_bytes, load_seconds):
+        self.value = value
+        self.size_bytes = size_bytes
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.uses = 0
+        self.load_seconds = load_seconds
+
+
+class ModelRegistry:
+    """LRU cache of loaded pipelines bounded by an approximate memory budget."""
+
+    def __init__(self, budget_bytes=0, pinned=()):
+        self.budget_bytes = budget_bytes
+        self._pinned = set(pinned)
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=_EVENT_HISTORY)
+
+    def get(self, key, loader):
+        """
+        Return the pipeline for ``key``, calling ``loader()`` to build it if it is not loaded.
+
+        Only one thread runs ``loader`` for a given key at a time; the others
+        block until it finishes and share its result (or its exception).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._touch(key, entry)
+                return entry.value
+            pending = self._loading.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._loading[key] = Future()
+
+        if not owner:
+            logger.info(f"Waiting for in-progress load of {key}")
+            with timing.stage('load'):
+                return pending.result()
+
+        try:
+            started = time.perf_counter()
+            value = loader()
+            load_seconds = time.perf_counter() - started
+            size_bytes = estimate_model_bytes(value)
+
+            with self._lock:
+                entry = _Entry(value, size_bytes, load_seconds)
+                self._entries[key] = entry
+                self._touch(key, entry)
+                self._record('load', key, size_bytes, load_seconds=round(load_seconds, 2))
+                logger.info(f"📦 Loaded model {key}: {size_bytes / 2**20:.0f} MB in {load_seconds:.1f}s "
+                            f"(resident {self.resident_bytes / 2**20:.0f} MB)")
+                evicted = self._evict(keep=key)
+            metrics.observe_model_load(key, load_seconds, size_bytes)
+            timing.record('load', load_seconds)
+            for evicted_key in evicted:
+                metrics.observe_model_evicted(evicted_key)
+            pending.set_result(value)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+        if evicted:
+            gc.collect()
+        return value
+
+    def _touch(self, key, entry):
+        """Mark ``key`` most recently used; caller holds the lock."""
+        entry.last_used = time.time()
+        entry.uses += 1
+        self._entries.move_to_end(key)
+
+    def _evict(self, keep):
+        """Drop least recently used unpinned entries until under budget; caller holds the lock."""
+        if not self.budget_bytes:
+            return []
+        evicted = []
+        for key in list(self._entries):
+            if self.resident_bytes <= self.budget_bytes:
+                break
+            if key == keep or key in self._pinned:
+                continue
+            entry = self._entries.pop(key)
+            evicted.append(key)
+            self._record('evict', key, entry.size_bytes)
+            logger.info(f"♻️ Evicted model {key} ({entry.size_bytes / 2**20:.0f} MB) to stay within "
+                        f"{self.budget_bytes / 2**20:.0f} MB budget")
+        if self.resident_bytes > self.budget_bytes:
+            logger.warning(f"⚠️ Resident models ({self.resident_bytes / 2**20:.0f} MB) exceed budget "
+                           f"({self.budget_bytes / 2**20:.0f} MB); only pinned or in-use models remain")
+        return evicted
+
+    def _record(self, event, key, size_bytes, **extra):
+        self._events.append(dict(
+            event=event,
+            model=key,
+            size_mb=round(size_bytes / 2**20, 1),
+            resident_mb=round(self.resident_bytes / 2**20, 1),
+            at=time.time(),
+            **extra
+        ))
+
+    @property
+    def resident_bytes(self):
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def pin(self, *keys):
+        """Protect ``keys`` from eviction."""
+        with self._lock:
+            self._pinned.update(keys)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get_stats(self):
+        """Loaded models with sizes and usage, budget, and recent load/evict events."""
+        with self._lock:
+            models = [
+                {
+                    'model': key,
+                    'size_mb': round(entry.size_bytes / 2**20, 1),
+                    'pinned': key in self._pinned,
+                    'precision': getattr(entry.value, 'precision', None),
+                    'backend': getattr(entry.value, 'backend', None),
+                    # Language pairs served by a shared translation model
+                    'pairs': sorted(getattr(entry.value, 'pairs', [])),
+                    'uses': entry.uses,
+                    'load_seconds': round(entry.load_seconds, 2),
+                    'loaded_at': entry.loaded_at,
+                    'last_used': entry.last_used,
+                }
+                for key, entry in reversed(self._entries.items())
+            ]
+            events = list(self._events)
+            loading = sorted(self._loading)
+            resident = self.resident_bytes
+        return {
+            'budget_mb': round(self.budget_bytes / 2**20, 1) if self.budget_bytes else None,
+            'resident_mb': round(resident / 2**20, 1),
+            'pinned': sorted(self._pinned),
+            'loading': loading,
+            'models': models,
+            'events': events,
+        }
@@ -0,0 +1,242 @@
+"""
+Translation routing table.
+
+Built on first use over the supported languages: every (source, target)
+pair is served 'direct' by the first of its candidate models that is
+available, 'pivot' through another language (two models) when no direct
+model is, or is 'unsupported'. Availability is decided without loading the
+model (local directory or local Hugging Face cache), so requests for pairs
+without a model fail or pivot right away instead of trying to load one
+first, and models found missing are checked again after the negative TTL
+(e.g. once they have been downloaded). With downloads allowed, a pair with
+no local candidate is routed 'download' to its first candidate instead,
+which downloads on first use; it is reported apart from the pairs this
+server serves locally.
+
+Models that fail to load anyway go into a negative cache: the pairs they
+served are re-routed (to the next candidate, a pivot, or unsupported) until
+the entry expires, after which the model is tried again.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DIRECT = 'direct'
+DOWNLOAD = 'download'
+PIVOT = 'pivot'
+UNSUPPORTED = 'unsupported'
+
+
+class Route:
+    """How one language pair is served."""
+
+    __slots__ = ('source', 'target', 'kind', 'model', 'via', 'models', 'reason')
+
+    def __init__(self, source, target, kind, model=None, via=None, models=(), reason=''):
+        self.source = source
+        self.target = target
+        self.kind = kind
+        self.model = model
+        self.via = via
+        self.models = tuple(models)
+        self.reason = reason
+
+    @property
+    def direct(self):
+        """Whether one model serves the pair (already local, or downloading on first use)."""
+        return self.kind in (DIRECT, DOWNLOAD)
+
+    def describe(self):
+        if self.direct:
+            return {'route': self.kind, 'model': self.model}
+        if self.kind == PIVOT:
+            return {'route': PIVOT, 'via': self.via, 'models': list(self.models)}
+        return {'route': UNSUPPORTED, 'reason': self.reason}
+
+
+class NegativeCache:
+    """Models that failed to load, each remembered with its error for ``ttl_seconds``."""
+
+    def __init__(self, ttl_seconds=600):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, model, error):
+        with self._lock:
+            # Load errors can be very long (e.g. lists of known architectures)
+            self._entries[model] = (time.monotonic() + self.ttl_seconds, str(error)[:300])
+
+    def error(self, model):
+        """The load error of ``model`` if it failed within the TTL, else None."""
+        entry = self._entries.get(model)
+        if entry is None:
+            return None
+        expires, error = entry
+        if time.monotonic() >= expires:
+            with self._lock:
+                if self._entries.get(model) is entry:
+                    del self._entries[model]
+            return None
+        return error
+
+    def next_expiry(self):
+        with self._lock:
+            return min((expires for expires, _ in self._entries.values()), default=None)
+
+    def describe(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                model: {'error': error, 'retry_in_seconds': round(max(0.0, expires - now))}
+                for model, (expires, error) in self._entries.items()
+                if expires > now
+            }
+
+
+class RoutingTable:
+    """
+    Routes for every pair of ``languages``.
+
+    ``candidates(source, target)`` lists the models that could serve a pair
+    directly, in order of preference; ``is_available(model)`` says whether a
+    model can be loaded without a download. With ``allow_downloads`` pairs
+    without an available model are routed to a download of their first
+    candidate before trying a pivot.
+    """
+
+    def __init__(self, languages, candidates, is_available, pivots=('en',), negative_ttl=600,
+                 allow_downloads=False):
+        self.languages = list(languages)
+        self._language_set = frozenset(self.languages)
+        self.pivots = [pivot for pivot in pivots if pivot]
+        self.allow_downloads = allow_downloads
+        self._candidates = candidates
+        self._is_available = is_available
+        # model -> (available, when a missing model is checked again)
+        self._available = {}
+        self._routes = {}
+        self._built = False
+        self._negative = NegativeCache(negative_ttl)
+        # Routes are recomputed once the earliest negative entry expires or a missing model is due for a check
+        self._recheck_at = None
+        self._lock = threading.Lock()
+
+    def build(self):
+        """Check model availability and route every pair of the supported languages."""
+        started = time.perf_counter()
+        with self._lock:
+            self._built = True
+            self._available.clear()
+            self._routes.clear()
+        for source in self.languages:
+            for target in self.languages:
+                if source != target:
+                    self.route(source, target)
+        counts = self.counts()
+        logger.info(f"🧭 Routed {sum(counts.values())} translation pairs in {(time.perf_counter() - started) * 1000:.0f} ms: "
+                    f"{counts[DIRECT]} direct, {counts[DOWNLOAD]} to download, {counts[PIVOT]} pivoted, "
+                    f"{counts[UNSUPPORTED]} unsupported")
+
+    def _available_model(self, model):
+        entry = self._available.get(model)
+        if entry is None or (not entry[0] and time.monotonic() >= entry[1]):
+            try:
+                available = bool(self._is_available(model))
+            except Exception as e:
+                logger.warning(f"Could not check whether {model} is available: {e}")
+                available = False
+            entry = self._available[model] = (available, time.monotonic() + self._negative.ttl_seconds)
+        available, recheck_at = entry
+        if not available:
+            # Routes through a missing model are recomputed once it is due for another check
+            with self._lock:
+                if self._recheck_at is None or recheck_at < self._recheck_at:
+                    self._recheck_at = recheck_at
+        return available
+
+    def _direct_model(self, source, target):
+        """(first available candidate or None, why none is available)."""
+        reasons = []
+        for model in self._candidates(source, target):
+            error = self._negative.error(model)
+            if error is not None:
+                reasons.append(f"{model} failed to load: {error}")
+            elif self._available_model(model):
+                return model, ''
+            else:
+                reasons.append(f"{model} is not available locally")
+        return None, '; '.join(reasons) or 'no candidate model'
+
+    def _download_model(self, source, target):
+        """First candidate that hasn't failed to load, to download on first use."""
+        for model in self._candidates(source, target):
+            if self._negative.error(model) is None:
+                return model
+        return None
+
+    def _compute(self, source, target):
+        model, reason = self._direct_model(source, target)
+        if model is not None:
+            return Route(source, target, DIRECT, model=model)
+        model = self._download_model(source, target) if self.allow_downloads else None
+        if model is not None:
+            return Route(source, target, DOWNLOAD, model=model, reason=reason)
+        for via in self.pivots:
+            if via in (source, target):
+                continue
+            first, _ = self._direct_model(source, via)
+            second, _ = self._direct_model(via, target) if first else (None, '')
+            if first and second:
+                return Route(source, target, PIVOT, via=via, models=(first, second), reason=reason)
+        return Route(source, target, UNSUPPORTED, reason=reason)
+
+    def route(self, source, target):
+        """The route of a pair (pairs outside the supported languages are routed on every call)."""
+        if not self._built:
+            self.build()
+        if self._recheck_at is not None and time.monotonic() >= self._recheck_at:
+            with self._lock:
+                self._routes.clear()
+                self._recheck_at = self._negative.next_expiry()
+        route = self._routes.get((source, target))
+        if route is None:
+            route = self._compute(source, target)
+            # Only supported pairs are kept, so arbitrary codes can't grow the table
+            if source in self._language_set and target in self._language_set:
+                self._routes[(source, target)] = route
+        return route
+
+    def mark_failed(self, model, error):
+        """Remember that ``model`` failed to load and re-route the pairs it served."""
+        self._negative.add(model, error)
+        with self._lock:
+            self._routes.clear()
+            self._recheck_at = self._negative.next_expiry()
+        logger.warning(f"⚠️ {model} failed to load; routing around it for {self._negative.ttl_seconds}s: {error}")
+
+    def counts(self):
+        counts = {DIRECT: 0, DOWNLOAD: 0, PIVOT: 0, UNSUPPORTED: 0}
+        for source in self.languages:
+            for target in self.languages:
+                if source != target:
+                    counts[self.route(source, target).kind] += 1
+        return counts
+
+    def describe(self):
+        """Routes of every supported pair by source and target, with counts and failing models."""
+        return {
+            'routes': {
+                source: {
+                    target: self.route(source, target).describe()
+                    for target in self.languages if target != source
+                }
+                for source in self.languages
+            },
+            'pairs': self.counts(),
+            'pivots': self.pivots,
+            'allow_downloads': self.allow_downloads,
+            'unavailable_models': self._negative.describe(),
+        }
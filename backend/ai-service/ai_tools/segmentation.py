@@ -0,0 +1,110 @@
+"""
+Sentence segmentation and token-budgeted chunking for long documents.
+
+Text is split into sentences that keep their trailing whitespace, so the
+original spacing and paragraph breaks can be restored exactly after each
+chunk has been translated or summarized.
+"""
+import math
+import re
+
+# A sentence runs up to terminal punctuation followed by whitespace, a line break, or the end of text
+_SENTENCE_RE = re.compile(r'(.+?(?:[.!?…;。؟]+["»”’)\]]*(?=\s)|(?=\n)|$))(\s*)', re.DOTALL)
+_LEADING_WS_RE = re.compile(r'\s*')
+
+
+def split_sentences(text):
+    """
+    Split text into ``(sentence, trailing_whitespace)`` pairs.
+
+    Returns ``(leading_whitespace, pairs)`` where ``pairs`` is a lazy iterator;
+    joining the leading whitespace and every sentence with its trailing
+    whitespace gives back ``text``.
+    """
+    leading = _LEADING_WS_RE.match(text).group(0)
+    pairs = ((m.group(1), m.group(2)) for m in _SENTENCE_RE.finditer(text, len(leading)))
+    return leading, pairs
+
+
+def _split_long_sentence(sentence, tokens, budget):
+    """Split an over-budget sentence on word boundaries into roughly equal pieces."""
+    words = sentence.split(' ')
+    pieces = min(len(words), math.ceil(tokens / budget))
+    if pieces <= 1:
+        return [sentence]
+    per_piece = math.ceil(len(words) / pieces)
+    return [' '.join(words[i:i + per_piece]) for i in range(0, len(words), per_piece)]
+
+
+def _join(pairs):
+    """Join sentence pairs into one chunk, returning (chunk_text, trailing_whitespace)."""
+    inner = ''.join(sentence + whitespace for sentence, whitespace in pairs[:-1])
+    return inner + pairs[-1][0], pairs[-1][1]
+
+
+def iter_chunks(pairs, count_tokens, budget, keep_lines=True, max_sentences=None):
+    """
+    Pack sentence pairs into chunks of at most ``budget`` tokens.
+
+    Yields ``(chunk_text, trailing_whitespace)``. With ``keep_lines`` chunks
+    never cross a line break, so paragraph structure survives reassembly;
+    ``max_sentences`` caps how many sentences share a chunk (1 keeps every
+    sentence on its own). A single sentence over budget is split on word
+    boundaries. Works lazily so only one chunk is built at a time.
+    """
+    current = []
+    current_tokens = 0
+    for sentence, whitespace in pairs:
+        tokens = count_tokens(sentence)
+        if current and (current_tokens + tokens > budget or len(current) == max_sentences):
+            yield _join(current)
+            current, current_tokens = [], 0
+
+        if tokens > budget:
+            pieces = _split_long_sentence(sentence, tokens, budget)
+            for piece in pieces[:-1]:
+                yield piece, ' '
+            sentence = pieces[-1]
+            tokens = count_tokens(sentence)
+
+        current.append((sentence, whitespace))
+        current_tokens += tokens
+        if keep_lines and '\n' in whitespace:
+            yield _join(current)
+            current, current_tokens = [], 0
+
+    if current:
+        yield _join(current)
+
+
+def pack_misses(segments, count_tokens, budget, known, keep_lines=True):
+    """
+    Repack single-sentence segments around the ones already ``known``.
+
+    ``segments`` are ``(sentence, trailing_whitespace)`` pairs within the
+    budget (iter_chunks with ``max_sentences=1``). Known segments (e.g.
+    translation memory hits) become chunks of their own; the rest are packed
+    into chunks of at most ``budget`` tokens as iter_chunks would. Yields
+    ``(chunk_text, trailing_whitespace, sentences)``.
+    """
+    current = []
+    current_tokens = 0
+    for sentence, whitespace in segments:
+        if sentence in known:
+            if current:
+                yield (*_join(current), [s for s, _ in current])
+                current, current_tokens = [], 0
+            yield sentence, whitespace, [sentence]
+            continue
+        tokens = count_tokens(sentence)
+        if current and current_tokens + tokens > budget:
+            yield (*_join(current), [s for s, _ in current])
+            current, current_tokens = [], 0
+        current.append((sentence, whitespace))
+        current_tokens += tokens
+        if keep_lines and '\n' in whitespace:
+            yield (*_join(current), [s for s, _ in current])
+            current, current_tokens = [], 0
+
+    if current:
+        yield (*_join(current), [s for s, _ in current])
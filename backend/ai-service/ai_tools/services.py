@@ -1,20 +1,152 @@
 """
 AI services for translation and summarization using Transformers.
 """
+import functools
+import itertools
 import logging
+import math
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional
 import re
 from django.conf import settings
 from decouple import config
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-import torch
+from .batching import MicroBatcher
+from .registry import ModelRegistry
+from .cache import ResultCache, make_cache_key
+from .translation_memory import TranslationMemory
+from .segmentation import split_sentences, iter_chunks, pack_misses
+from .streaming import StreamStats, StreamTimer, stream_generate
+from .langid import get_identifier
+from .postprocess import PostProcessor
+from .tiers import GenerationTiers
+from .admission import AdmissionController
+from .workers import InferencePool, WorkerPoolError, parse_shards
+from .routing import PIVOT, RoutingTable
+from .packaging import load_tokenizer, read_package
+from .warmup import WARM, Warmup, load_plan
+from . import metrics, timing
 
 logger = logging.getLogger(__name__)
 
-# Global model cache to avoid reloading models
-_translation_pipelines = {}
-_summarization_pipeline = None
+# Global model cache to avoid reloading models, keyed by model name so pairs that
+# resolve to the same checkpoint share its weights. Bounded by a memory budget;
+# least recently used models are evicted, except the pinned warmup set.
+_model_registry = ModelRegistry(budget_bytes=getattr(settings, 'AI_MODEL_MEMORY_BUDGET_MB', 0) * 2**20)
+
+# CPU precision per model (fp32, int8 dynamic quantization, bf16); int8 conversions are
+# saved under _QUANTIZED_CACHE_DIR after the first load
+_MODEL_PRECISION = getattr(settings, 'AI_MODEL_PRECISION', 'fp32')
+_MODEL_PRECISION_OVERRIDES = getattr(settings, 'AI_MODEL_PRECISION_OVERRIDES', {})
+_QUANTIZED_CACHE_DIR = getattr(settings, 'AI_QUANTIZED_CACHE_DIR', None)
+
+# Inference backend per model: 'pytorch' (transformers) or 'onnx' (ONNX Runtime graphs
+# exported by download_models.py into _ONNX_DIR)
+_INFERENCE_BACKEND = getattr(settings, 'AI_INFERENCE_BACKEND', 'pytorch')
+_INFERENCE_BACKEND_OVERRIDES = getattr(settings, 'AI_INFERENCE_BACKEND_OVERRIDES', {})
+_ONNX_DIR = getattr(settings, 'AI_ONNX_DIR', None)
+
+# Models packaged by download_models.py (safetensors weights, validated fast tokenizers)
+# load from here offline; other models come from the Hugging Face cache
+_PACKAGED_MODELS_DIR = getattr(settings, 'AI_PACKAGED_MODELS_DIR', None)
+
+# Shared micro-batcher: concurrent requests for the same model run as one generate call
+_batcher = MicroBatcher(
+    max_batch_size=getattr(settings, 'AI_BATCH_MAX_SIZE', 8),
+    max_wait_ms=getattr(settings, 'AI_BATCH_WAIT_MS', 10),
+)
+
+# Result cache for identical translate/summarize requests (memory LRU + optional SQLite)
+_result_cache = ResultCache(
+    max_entries=getattr(settings, 'AI_CACHE_MAX_ENTRIES', 2048),
+    ttl_seconds=getattr(settings, 'AI_CACHE_TTL_SECONDS', 86400),
+    sqlite_path=getattr(settings, 'AI_CACHE_SQLITE_PATH', None),
+    enabled=getattr(settings, 'AI_CACHE_ENABLED', True),
+)
+
+# Sentence-level translation memory shared by all document translations
+_translation_memory = TranslationMemory(
+    max_entries=getattr(settings, 'AI_TM_MAX_ENTRIES', 50000),
+    sqlite_path=getattr(settings, 'AI_TM_SQLITE_PATH', None),
+    enabled=getattr(settings, 'AI_TM_ENABLED', True),
+)
+
+# Translation fix-up rules (built-in pronoun fixes plus optional extra rules from a file)
+_postprocessor = PostProcessor(getattr(settings, 'AI_POSTPROCESS_RULES_PATH', None))
+
+# Long-document translation: inputs over the threshold are split into sentence
+# chunks of at most _DOCUMENT_CHUNK_TOKENS tokens, translated _DOCUMENT_WINDOW at a time
+_DOCUMENT_THRESHOLD_CHARS = getattr(settings, 'AI_DOCUMENT_THRESHOLD_CHARS', 1000)
+_DOCUMENT_CHUNK_TOKENS = getattr(settings, 'AI_DOCUMENT_CHUNK_TOKENS', 200)
+_DOCUMENT_WINDOW = getattr(settings, 'AI_DOCUMENT_WINDOW', 8)
+
+# Source language detection only trusts confident guesses, and for texts under
+# _LANGID_MIN_LETTERS letters guesses clearly ahead of the runner-up; the rest default
+# to AI_TRANSLATION_SOURCE_LANG.
+# Short sentences of mixed documents join their neighbours' run instead
+_LANGID_MIN_LETTERS = getattr(settings, 'AI_LANGID_MIN_LETTERS', 20)
+_LANGID_MIN_CONFIDENCE = getattr(settings, 'AI_LANGID_MIN_CONFIDENCE', 0.6)
+_LANGID_SHORT_MIN_MARGIN = getattr(settings, 'AI_LANGID_SHORT_MIN_MARGIN', 0.2)
+
+# Long-input summarization: inputs over one window of _SUMMARY_WINDOW_TOKENS are
+# summarized window by window (map), then the partial summaries are summarized (reduce)
+_SUMMARY_WINDOW_TOKENS = getattr(settings, 'AI_SUMMARY_WINDOW_TOKENS', 900)
+# Input cap of single-pass ('text' mode) summarization, in characters
+_SUMMARY_MAX_INPUT_CHARS = 1024
+_SUMMARY_MAP_MAX_TOKENS = getattr(settings, 'AI_SUMMARY_MAP_MAX_TOKENS', 120)
+_SUMMARY_MAX_DEPTH = getattr(settings, 'AI_SUMMARY_MAX_DEPTH', 4)
+
+# Decoding settings shared by single-pass, map and reduce summarization; the beam count
+# (and early-exit limits) come from the request's tier
+_SUMMARY_GENERATION = {
+    'do_sample': False,
+    'early_stopping': True,
+    'no_repeat_ngram_size': 3,  # Prevent repetition for better summaries
+    'length_penalty': 1.2,  # Encourage shorter, more concise summaries
+}
+
+# Latency/quality tiers: 'fast' (greedy), 'balanced' (small beam), 'quality' (full beam)
+_tiers = GenerationTiers(
+    getattr(settings, 'AI_GENERATION_TIERS', None),
+    default=getattr(settings, 'AI_DEFAULT_TIER', 'quality'),
+)
+
+# Bounded inference queue: requests are admitted by count and estimated cost (input
+# tokens times beams) and shed with a retry delay when either bound would be exceeded
+_admission = AdmissionController(
+    max_requests=getattr(settings, 'AI_ADMISSION_MAX_REQUESTS', 6),
+    max_cost=getattr(settings, 'AI_ADMISSION_MAX_COST', 0),
+    max_retry_after=getattr(settings, 'AI_ADMISSION_MAX_RETRY_AFTER', 60),
+    enabled=getattr(settings, 'AI_ADMISSION_ENABLED', True),
+)
+# Optional pool of forked inference processes sharing the loaded weights copy-on-write
+# (AI_WORKER_POOL_SIZE=0 runs inference in this process), or with AI_WORKER_SHARDS, shards
+# of processes that each own the models of their routes
+_worker_pool = InferencePool(
+    shards=parse_shards(getattr(settings, 'AI_WORKER_SHARDS', '')),
+    workers=getattr(settings, 'AI_WORKER_POOL_SIZE', 0),
+    threads_per_worker=getattr(settings, 'AI_WORKER_THREADS', 0),
+    affinity=getattr(settings, 'AI_WORKER_CPU_AFFINITY', ''),
+    concurrency=getattr(settings, 'AI_WORKER_CONCURRENCY', 2),
+    timeout=getattr(settings, 'AI_WORKER_TIMEOUT', 120),
+)
+# Rough characters per model token, for cost estimates that don't need a tokenizer
+_CHARS_PER_TOKEN = 4
+# Prometheus metrics at /metrics
+metrics.enabled = getattr(settings, 'AI_METRICS_ENABLED', True)
+
+# Streaming decodes greedily: beam search only settles on its output at the end
+_STREAM_TRANSLATION_GENERATION = {'do_sample': False, 'num_beams': 1}
+_STREAM_SUMMARY_GENERATION = {'do_sample': False, 'num_beams': 1, 'no_repeat_ngram_size': 3}
+_stream_stats = StreamStats()
+
+# Threads that feed batch-endpoint items into the micro-batcher concurrently
+_batch_executor = ThreadPoolExecutor(
+    max_workers=max(2, getattr(settings, 'AI_BATCH_MAX_SIZE', 8) * 2),
+    thread_name_prefix='ai-batch-item',
+)
 
 # Simple language mapping for Transformers models
 LANGUAGE_MAP = {
@@ -30,148 +162,425 @@ LANGUAGE_MAP = {
 LANGUAGE_CODES = list(LANGUAGE_MAP.keys())
 
 
-def _fix_pronoun_references(translated_text, original_text):
-    """
-    Fix common pronoun reference errors in French-to-English translations.
-    Attempts to correct pronoun gender mismatches based on context.
-    """
-    original_lower = original_text.lower()
-    translated_lower = translated_text.lower()
-    
-    # Pattern 1: "his daughter" when French says "sa fille" (her daughter) - often refers to mother's daughter
-    # Check if original has "mère" (mother) and "sa fille" (her daughter)
-    if 'mère' in original_lower and 'sa fille' in original_lower:
-        # Replace "his daughter" with "her daughter" when context suggests it's the mother's daughter
-        translated_text = re.sub(r'\bhis daughter\b', 'her daughter', translated_text, flags=re.IGNORECASE)
-        translated_text = re.sub(r'\bhis own daughter\b', 'her daughter', translated_text, flags=re.IGNORECASE)
-    
-    # Pattern 2: Fix "heard of his daughter" when it should be "heard of her daughter"
-    # This often happens when "sa fille" (her daughter) is mistranslated, especially with "mère" (mother) context
-    if 'mère' in original_lower or 'mother' in translated_lower:
-        translated_text = re.sub(r'\bheard of his daughter\b', 'heard of her daughter', translated_text, flags=re.IGNORECASE)
-        translated_text = re.sub(r'\bnews of his daughter\b', 'news of her daughter', translated_text, flags=re.IGNORECASE)
-        translated_text = re.sub(r'\bnews about his daughter\b', 'news about her daughter', translated_text, flags=re.IGNORECASE)
-        translated_text = re.sub(r'\bheard news of his daughter\b', 'heard news of her daughter', translated_text, flags=re.IGNORECASE)
+def _translation_candidates(source_lang='en', target_lang='fr'):
+    """Models that could translate a language pair directly, in order of preference."""
+    # Allow overriding model via env var for Render/low-RAM
+    override_model = os.getenv('AI_TRANSLATION_MODEL')
+    if override_model:
+        model_name = override_model
+    else:
+        # Use smaller t5-small model by default for memory efficiency
+        if source_lang == 'en' and target_lang == 'fr':
+            model_name = "t5-small"
+        elif source_lang == 'fr' and target_lang == 'en':
+            model_name = "t5-small"
+        else:
+            # Use Helsinki-NLP models - lightweight and fast
+            model_name = f"Helsinki-NLP/opus-mt-{source_lang}-{target_lang}"
     
-    # Pattern 3: "happened to him" when French says "il lui soit arrivé" referring to a female
-    # Check if original has feminine context (fille, elle, disparue, mère) and the sentence mentions a female
-    if any(word in original_lower for word in ['fille', 'elle', 'disparue', 'mère']):
-        # If the sentence mentions a daughter/mother and "happened to him", likely should be "her"
-        # Look for patterns like "happened to him" after mentioning a female
-        if re.search(r'(daughter|mother|girl|woman|she|her|Electra)', translated_text, re.IGNORECASE):
-            translated_text = re.sub(r'\bhappened to him\b', 'happened to her', translated_text, flags=re.IGNORECASE)
-            translated_text = re.sub(r'\bhas happened to him\b', 'has happened to her', translated_text, flags=re.IGNORECASE)
-            translated_text = re.sub(r'\bhad happened to him\b', 'had happened to her', translated_text, flags=re.IGNORECASE)
-            translated_text = re.sub(r'\bwill happen to him\b', 'will happen to her', translated_text, flags=re.IGNORECASE)
+    # Fallback model for common languages (avoid large mbart model)
+    if source_lang == 'auto' and not override_model:
+        # Use smaller multilingual model - avoid large mbart (2.5GB)
+        if target_lang == 'en':
+            model_name = "Helsinki-NLP/opus-mt-mul-en"
+        else:
+            # Use a common pair model instead of large mbart
+            model_name = f"Helsinki-NLP/opus-mt-en-{target_lang}"  # Assume English source
+            logger.info(f"Auto-detect: using en→{target_lang} model (faster than multilingual)")
     
-    # Pattern 4: Fix "she fears that... happened to him" when it should be "happened to her"
-    # This is a common error when the subject is female but the object pronoun is wrong
-    if re.search(r'\bshe\b.*\bfears?\b', translated_text, re.IGNORECASE):
-        # If "she fears" appears, check if there's "happened to him" later in the sentence
-        translated_text = re.sub(r'\bhappened to him\b', 'happened to her', translated_text, flags=re.IGNORECASE)
-        translated_text = re.sub(r'\bhas happened to him\b', 'has happened to her', translated_text, flags=re.IGNORECASE)
-        translated_text = re.sub(r'\bhad happened to him\b', 'had happened to her', translated_text, flags=re.IGNORECASE)
+    # The multilingual model covers any source into English
+    if target_lang == 'en' and not override_model and model_name != "Helsinki-NLP/opus-mt-mul-en":
+        return [model_name, "Helsinki-NLP/opus-mt-mul-en"]
+    return [model_name]
+
+
+def _model_is_available(model_name):
+    """Whether a model loads without a download: packaged, a local directory, or a hub id in the local cache."""
+    if read_package(_PACKAGED_MODELS_DIR, model_name) is not None:
+        return True
+    if os.path.isdir(model_name):
+        return os.path.exists(os.path.join(model_name, 'config.json'))
+    from huggingface_hub import try_to_load_from_cache
+    return isinstance(try_to_load_from_cache(model_name, 'config.json'), str)
+
+
+# Route of every language pair: direct model, pivot through another language, or unsupported
+# (built on the first route lookup, usually the warmup's)
+_routing = RoutingTable(
+    LANGUAGE_CODES,
+    _translation_candidates,
+    _model_is_available,
+    pivots=getattr(settings, 'AI_ROUTING_PIVOTS', ['en']),
+    negative_ttl=getattr(settings, 'AI_ROUTING_NEGATIVE_TTL', 600),
+    allow_downloads=getattr(settings, 'AI_ROUTING_ALLOW_DOWNLOADS', False),
+)
+
+
+def _resolve_translation_model(source_lang='en', target_lang='fr'):
+    """Name of the translation model that serves a language pair (its preferred candidate when none does)."""
+    route = _routing.route(source_lang, target_lang)
+    if route.direct:
+        return route.model
+    return _translation_candidates(source_lang, target_lang)[0]
+
+
+def _translation_route_keys(source_lang, target_lang):
+    """
+    Shard router keys of a translation: the model and pair of each leg of its
+    route, so a pivot goes to a shard owning one of its legs, not to '*'.
+    """
+    route = _routing.route(source_lang, target_lang)
+    if route.kind == PIVOT:
+        first, second = route.models
+        return (first, f"{source_lang}-{route.via}", second, f"{route.via}-{target_lang}")
+    return (_resolve_translation_model(source_lang, target_lang), f"{source_lang}-{target_lang}")
+
+
+def _model_precision(model_name):
+    """CPU precision mode for a model: per-model override, else the default."""
+    return _MODEL_PRECISION_OVERRIDES.get(model_name, _MODEL_PRECISION)
+
+
+def _model_backend(model_name):
+    """Inference backend for a model ('pytorch' or 'onnx'): per-model override, else the default."""
+    return _INFERENCE_BACKEND_OVERRIDES.get(model_name, _INFERENCE_BACKEND)
+
+
+def _load_model_weights(model_name, package=None):
+    """
+    Load a seq2seq model with its configured backend and precision.
+
+    Returns (model, precision, backend). Models configured for ONNX Runtime fall
+    back to PyTorch when optimum/onnxruntime are missing or the export fails.
+    PyTorch weights come from the model's package when it has one.
+    """
+    # torch and transformers load with the first model, not with this module
+    from .pipelines import load_onnx_seq2seq_model, load_seq2seq_model
+
+    if _model_backend(model_name) == 'onnx':
+        try:
+            return load_onnx_seq2seq_model(model_name, _ONNX_DIR), 'fp32', 'onnx'
+        except Exception as e:
+            logger.warning(f"⚠️ ONNX Runtime backend unavailable for {model_name}, using PyTorch: {e}")
+    model, precision = load_seq2seq_model(
+        model_name, _model_precision(model_name), _QUANTIZED_CACHE_DIR,
+        source=package['path'] if package else None,
+    )
+    return model, precision, 'pytorch'
+
+
+def _load_translation_model(model_name):
+    """Load a translation model and tokenizer once, to be shared by every pair that uses it."""
+    import torch
+    from .pipelines import SharedTranslationModel
+
+    package = read_package(_PACKAGED_MODELS_DIR, model_name)
+    logger.info(f"Loading translation model: {model_name}" + (f" (packaged, {package['tokenizer']} tokenizer)" if package else ""))
+    # Use slow tokenizer to avoid SentencePiece fast-conversion issues on some platforms;
+    # packages only carry a fast tokenizer that passed the parity check against it
+    tokenizer = load_tokenizer(model_name, package, use_fast=False)
+    model, precision, backend = _load_model_weights(model_name, package)
     
-    return translated_text
+    # Optimize for CPU inference speed
+    device = 0 if torch.cuda.is_available() and backend == 'pytorch' else -1
+    logger.info(f"✅ Translation model loaded: {model_name} ({backend}, {precision})")
+    return SharedTranslationModel(model_name, model, tokenizer, device, precision, backend)
 
 
 def _get_translation_pipeline(source_lang='en', target_lang='fr'):
     """
     Get or create translation pipeline for language pair.
     Uses Helsinki-NLP models for translation.
-    """
-    global _translation_pipelines
     
-    cache_key = f"{source_lang}_{target_lang}"
+    Weights are loaded once per model and shared by every pair that resolves
+    to it; the returned pipeline is a lightweight per-pair wrapper.
     
-    if cache_key not in _translation_pipelines:
+    The model comes from the routing table. A model that fails to load is
+    put in its negative cache and the pair's next candidate is tried; raises
+    LookupError when no model serves the pair directly.
+    """
+    while True:
+        route = _routing.route(source_lang, target_lang)
+        if not route.direct:
+            raise LookupError(f"No direct translation model for {source_lang}→{target_lang}: {route.reason}")
+        model_name = route.model
         try:
-            # Allow overriding model via env var for Render/low-RAM
-            override_model = os.getenv('AI_TRANSLATION_MODEL')
-            if override_model:
-                model_name = override_model
-            else:
-                # Use smaller t5-small model by default for memory efficiency
-                if source_lang == 'en' and target_lang == 'fr':
-                    model_name = "t5-small"
-                elif source_lang == 'fr' and target_lang == 'en':
-                    model_name = "t5-small"
-                else:
-                    # Use Helsinki-NLP models - lightweight and fast
-                    model_name = f"Helsinki-NLP/opus-mt-{source_lang}-{target_lang}"
-            
-            # Fallback model for common languages (avoid large mbart model)
-            if source_lang == 'auto' and not override_model:
-                # Use smaller multilingual model - avoid large mbart (2.5GB)
-                if target_lang == 'en':
-                    model_name = "Helsinki-NLP/opus-mt-mul-en"
-                else:
-                    # Use a common pair model instead of large mbart
-                    model_name = f"Helsinki-NLP/opus-mt-en-{target_lang}"  # Assume English source
-                    logger.info(f"Auto-detect: using en→{target_lang} model (faster than multilingual)")
-            
-            logger.info(f"Loading translation model: {model_name}")
-            # Use slow tokenizer to avoid SentencePiece fast-conversion issues on some platforms
-            tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=False)
-            
-            # Optimize for CPU inference speed
-            device = 0 if torch.cuda.is_available() else -1
-            _translation_pipelines[cache_key] = pipeline(
-                "translation",
-                model=model_name,
-                tokenizer=tokenizer,
-                device=device,
-                # Don't set max_length here - let it be dynamic per request
-                model_kwargs={
-                    'torch_dtype': torch.float32,  # Use float32 for CPU
-                }
-            )
-            logger.info(f"✅ Translation model loaded: {model_name}")
+            shared = _model_registry.get(model_name, lambda: _load_translation_model(model_name))
         except Exception as e:
-            logger.warning(f"Failed to load {model_name}, trying fallback: {e}")
-            # Fallback to smaller multilingual model (avoid large mbart)
-            try:
-                # Use smaller Helsinki-NLP multilingual model instead of large mbart
-                if target_lang == 'en':
-                    model_name = "Helsinki-NLP/opus-mt-mul-en"
-                else:
-                    # Try a generic multilingual model
-                    model_name = "Helsinki-NLP/opus-mt-en-fr"  # Use common pair as fallback
-                    logger.warning(f"Using fallback model {model_name} for {source_lang}→{target_lang}")
-                
-                tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=False)
-                device = 0 if torch.cuda.is_available() else -1
-                _translation_pipelines[cache_key] = pipeline(
-                    "translation",
-                    model=model_name,
-                    tokenizer=tokenizer,
-                    device=device,
-                    # Don't set max_length here - let it be dynamic per request
-                    model_kwargs={
-                        'torch_dtype': torch.float32,
-                    }
-                )
-                logger.info(f"✅ Fallback translation model loaded: {model_name}")
-            except Exception as e2:
-                logger.error(f"Failed to load fallback model: {e2}")
-                raise
+            _routing.mark_failed(model_name, e)
+            continue
+        return shared.for_pair(source_lang, target_lang)
+
+
+# Map language codes to model language codes
+_LANG_MAP = {
+    'en': 'en', 'fr': 'fr', 'ar': 'ar', 'es': 'es', 
+    'de': 'de', 'it': 'it', 'pt': 'pt'
+}
+
+
+def language_error(target_language='en', source_language='auto'):
+    """Why a translation request's language codes can't be served (an unsupported code), or None."""
+    for field, code in (('target_language', target_language), ('source_language', source_language)):
+        if code in (None, '') or (field == 'source_language' and code == 'auto'):
+            continue
+        if not isinstance(code, str) or code not in _LANG_MAP:
+            return f"Unsupported {field} '{code}'. Supported languages: {', '.join(LANGUAGE_CODES)}"
+    return None
+
+
+def _detect_source_language(text):
+    """
+    Guess the source language of text with the character n-gram identifier.
+    Texts too short or too ambiguous to call fall back to AI_TRANSLATION_SOURCE_LANG (en).
+    """
+    with timing.stage('detect'):
+        source_lang, confidences = get_identifier().detect_confident(
+            text, _LANGID_MIN_LETTERS, _LANGID_MIN_CONFIDENCE, _LANGID_SHORT_MIN_MARGIN,
+        )
+    if source_lang is None:
+        # Not enough to go on: default to English or use env var
+        source_lang = _LANG_MAP.get(os.getenv('AI_TRANSLATION_SOURCE_LANG', 'en'), 'en')
+        logger.info(f"Using default source language: {source_lang}")
+    else:
+        logger.info(f"Auto-detected source language: {source_lang} (confidence {confidences[source_lang]:.2f})")
+    return source_lang
+
+
+def _resolve_language_pair(text, target_language='en', source_language='auto'):
+    """
+    Resolve request language codes to the (source, target) pair used for model lookup.
+    Auto-detects the source language when it is 'auto' or missing.
+    """
+    target_lang = _LANG_MAP.get(target_language, 'en')
     
-    return _translation_pipelines[cache_key]
+    # Determine source language: use provided source_language, or env var, or default to 'auto'
+    if source_language and source_language != 'auto':
+        source_lang = _LANG_MAP.get(source_language, source_language)
+    else:
+        source_lang = _detect_source_language(text)
+    return source_lang, target_lang
+
+
+def _extract_generated_text(result, key):
+    """Pull the generated string out of a pipeline result (list of dicts, dict or anything else)."""
+    if isinstance(result, list) and len(result) > 0:
+        return result[0].get(key, '')
+    elif isinstance(result, dict):
+        return result.get(key, '')
+    return str(result)
 
 
-def translate_text(text, target_language='en', source_language='auto'):
+def _memory_model(model_name, tier):
+    """Translation memory namespace of a model for a tier, so cheaper tiers never serve quality requests."""
+    # Quality keeps the bare model name used before tiers existed
+    return model_name if tier == 'quality' else f"{model_name}@{tier}"
+
+
+def _translate_single(source_lang, target_lang, text, tier):
+    """Translate one short text in a single generate call."""
+    translator = _get_translation_pipeline(source_lang, target_lang)
+    # Increase max_length for better context and quality (especially for longer sentences)
+    # Use longer max_length for better translation quality
+    max_length = _tiers.limit_tokens(tier, 256 if len(text) > 200 else 128)
+    result = _batcher.submit(
+        f"{source_lang}_{target_lang}", translator, text, max_length=max_length, **_tiers.generation(tier)
+    )
+    translated_text = _extract_generated_text(result, 'translation_text')
+    
+    # Post-process to fix common errors such as pronoun references (French → English)
+    return _postprocessor.apply(source_lang, target_lang, translated_text, text)
+
+
+def _document_windows(segments, count_tokens, budget, memory_key=None):
     """
-    Translate text to target language using ONLY Transformers (Helsinki-NLP models).
-    No external APIs are used - all processing is local.
+    Group document segments into windows of chunks to translate.
+
+    ``segments`` come from iter_chunks. Without ``memory_key`` they are the
+    chunks, _DOCUMENT_WINDOW per window. With it, a (model, source, target)
+    translation memory namespace, they are single sentences, as many per
+    window as _DOCUMENT_WINDOW full chunks hold: each window's sentences are
+    looked up, hits become chunks of their own and the misses are packed up
+    to ``budget`` tokens again. Yields lists of (chunk, whitespace, sentences,
+    translation from memory or None).
+    """
+    while True:
+        if memory_key is None:
+            window = list(itertools.islice(segments, _DOCUMENT_WINDOW))
+            if not window:
+                return
+            yield [(chunk, whitespace, [chunk], None) for chunk, whitespace in window]
+            continue
+        window, window_tokens = [], 0
+        for sentence, whitespace in segments:
+            window.append((sentence, whitespace))
+            window_tokens += count_tokens(sentence)
+            if window_tokens >= _DOCUMENT_WINDOW * budget:
+                break
+        if not window:
+            return
+        hits = _translation_memory.lookup(*memory_key, [sentence for sentence, _ in window])
+        yield [
+            (chunk, whitespace, sentences, hits.get(chunk) if len(sentences) == 1 else None)
+            for chunk, whitespace, sentences in pack_misses(window, count_tokens, budget, hits)
+        ]
+
+
+def _remember_chunk(memory_key, sentences, translated):
+    """
+    Store a chunk's translation in the translation memory, sentence by sentence.
+
+    A chunk of several sentences is stored only when its translation splits
+    into as many sentences, so each one can be paired with its source.
+    """
+    if len(sentences) == 1:
+        _translation_memory.store(*memory_key, {sentences[0]: translated})
+        return
+    _, pairs = split_sentences(translated)
+    pieces = [piece for piece, _ in pairs]
+    if len(pieces) == len(sentences):
+        _translation_memory.store(*memory_key, dict(zip(sentences, pieces)))
+
+
+def _translate_document(source_lang, target_lang, text, tier, progress=None):
+    """
+    Translate a long document chunk by chunk.
+
+    The text is split into sentences and packed into token-budgeted chunks that
+    never cross a line break. A window of chunks is translated as one batch at
+    a time, so memory is bounded by the window rather than the document, and
+    the output is reassembled with the original whitespace. ``progress`` is
+    called with (characters done, total characters, 'characters') after each window.
     
-    Args:
-        text: Text to translate
-        target_language: Target language code (default: 'en')
-        source_language: Source language code or 'auto' for auto-detection (default: 'auto')
+    With the translation memory enabled every sentence is looked up first;
+    hits are reused and only the misses are packed into chunks for the model.
     
     Returns:
-        dict with translated text and source language
+        (translated_text, details) with the chunk count and translation-memory usage
     """
+    translator = _get_translation_pipeline(source_lang, target_lang)
+    tokenizer = translator.tokenizer
+    budget = _DOCUMENT_CHUNK_TOKENS
+    # Every chunk shares the same generation params so they can batch together
+    max_length = _tiers.limit_tokens(tier, min(512, budget * 2))
+    generation = _tiers.generation(tier)
+    model_key = f"{source_lang}_{target_lang}"
+    model_name = _memory_model(_resolve_translation_model(source_lang, target_lang), tier)
+    use_memory = _translation_memory.enabled
+    memory_key = (model_name, source_lang, target_lang) if use_memory else None
+    
+    # Sentences are counted again when misses are repacked and hits are tallied
+    @functools.lru_cache(maxsize=1024)
+    def count_tokens(sentence):
+        return len(tokenizer.encode(sentence, add_special_tokens=False))
+    
+    leading, pairs = split_sentences(text)
+    segments = iter_chunks(pairs, count_tokens, budget, max_sentences=1 if use_memory else None)
+    output = [leading]
+    chunk_count = 0
+    segment_count = 0
+    memory_hits = 0
+    tokens_saved = 0
+    characters_done = len(leading)
+    for window in _document_windows(segments, count_tokens, budget, memory_key):
+        translations = {chunk: translation for chunk, _, _, translation in window if translation is not None}
+        sentences_of = {chunk: sentences for chunk, _, sentences, translation in window if translation is None}
+        misses = list(sentences_of)
+        if misses:
+            results = _batcher.submit_many(model_key, translator, misses, max_length=max_length, **generation)
+            translated = {
+                chunk: _extract_generated_text(result, 'translation_text')
+                for chunk, result in zip(misses, results)
+            }
+            if use_memory:
+                for chunk, translation in translated.items():
+                    _remember_chunk(memory_key, sentences_of[chunk], translation)
+            translations.update(translated)
+        
+        # Repeats of a chunk translated earlier in this window also skip the model
+        pending_misses = set(misses)
+        for chunk, whitespace, sentences, _ in window:
+            if chunk in pending_misses:
+                pending_misses.discard(chunk)
+            else:
+                memory_hits += len(sentences)
+                tokens_saved += count_tokens(chunk)
+            output.append(_postprocessor.apply(source_lang, target_lang, translations[chunk], chunk))
+            output.append(whitespace)
+            characters_done += len(chunk) + len(whitespace)
+            segment_count += len(sentences)
+        chunk_count += len(window)
+        if progress:
+            progress(characters_done, len(text), 'characters')
+    
+    details = {'chunks': chunk_count}
+    if use_memory:
+        _translation_memory.record(segment_count, memory_hits, tokens_saved)
+        details['translation_memory'] = {
+            'segments': segment_count,
+            'hits': memory_hits,
+            'hit_ratio': round(memory_hits / segment_count, 4) if segment_count else None,
+            'tokens_saved': tokens_saved,
+        }
+    logger.info(f"Translated document of {len(text)} chars in {chunk_count} chunks ({source_lang} → {target_lang}, {memory_hits} sentences from translation memory)")
+    return ''.join(output), details
+
+
+def _translate_pair(source_lang, target_lang, text, document_mode, tier, progress=None):
+    """Translate text for one model pair. Returns (translated_text, details)."""
+    if document_mode:
+        return _translate_document(source_lang, target_lang, text, tier, progress)
+    return _translate_single(source_lang, target_lang, text, tier), {'chunks': 1}
+
+
+def _translate_mixed(text, runs, target_language, tier, progress=None):
+    """
+    Translate a document that mixes languages, one run of same-language sentences at a time.
+
+    Each run goes to its own pair model (runs already in the target language
+    are kept as they are). The reported source language is the one covering
+    most of the text; 'source_languages' gives the characters per language.
+    """
+    target_lang = _LANG_MAP.get(target_language, 'en')
+    output = []
+    chunks = 0
+    languages = {}
+    methods = set()
+    characters_done = 0
+    for language, segment in runs:
+        languages[language] = languages.get(language, 0) + len(segment)
+        run_progress = None
+        if progress:
+            def run_progress(done, total, unit, offset=characters_done):
+                progress(offset + done, len(text), unit)
+        characters_done += len(segment)
+        if language == target_lang:
+            output.append(segment)
+            continue
+        result = _translate_text(segment, target_language, language, 'document', tier, run_progress)
+        if result.get('error'):
+            return dict(result, original_text=text)
+        output.append(result['translated_text'])
+        chunks += result.get('chunks', 0)
+        methods.add(result['method'])
+    
+    logger.info(f"Translated mixed-language document ({', '.join(languages)}) in {len(runs)} runs → {target_language}")
+    return {
+        'translated_text': ''.join(output),
+        'source_language': max(languages, key=languages.get),
+        'target_language': target_language,
+        'original_text': text,
+        'method': 'transformers_two_step' if 'transformers_two_step' in methods else 'transformers',
+        'mode': 'document',
+        'tier': tier,
+        'chunks': chunks,
+        'source_languages': languages,
+        'runs': len(runs),
+    }
+
+
+def _translate_text(text, target_language='en', source_language='auto', mode='auto', tier='quality', progress=None):
+    """Uncached translation; see translate_text."""
     try:
         if not text or not text.strip():
             return {
@@ -181,141 +590,96 @@ def translate_text(text, target_language='en', source_language='auto'):
                 'target_language': target_language
             }
         
-        # Limit text length to avoid memory issues
-        if len(text) > 1000:
-            text = text[:1000]
-            logger.warning("Text truncated to 1000 characters for translation")
+        document_mode = mode == 'document' or (mode != 'text' and len(text) > _DOCUMENT_THRESHOLD_CHARS)
         
-        # Map language codes to model language codes
-        lang_map = {
-            'en': 'en', 'fr': 'fr', 'ar': 'ar', 'es': 'es', 
-            'de': 'de', 'it': 'it', 'pt': 'pt'
-        }
+        # Single-pass mode keeps the old length cap to avoid memory issues
+        if not document_mode and len(text) > _DOCUMENT_THRESHOLD_CHARS:
+            text = text[:_DOCUMENT_THRESHOLD_CHARS]
+            logger.warning(f"Text truncated to {_DOCUMENT_THRESHOLD_CHARS} characters for single-pass translation")
         
-        target_lang = lang_map.get(target_language, 'en')
+        if document_mode and (not source_language or source_language == 'auto'):
+            with timing.stage('detect'):
+                runs = get_identifier().detect_runs(text, _LANGID_MIN_LETTERS, _LANGID_MIN_CONFIDENCE)
+            if len({language for language, _ in runs}) > 1:
+                return _translate_mixed(text, runs, target_language, tier, progress)
         
-        # Determine source language: use provided source_language, or env var, or default to 'auto'
-        if source_language and source_language != 'auto':
-            source_lang = lang_map.get(source_language, source_language)
-        else:
-            # Try to detect language from text (improved heuristic)
-            # Check for common French words/patterns (expanded list)
-            french_indicators = [
-                'est', 'une', 'des', 'les', 'dans', 'pour', 'avec', 'sont', 'être', 'avoir', 
-                'texte', 'langue', 'sonne', 'réveille', 'écoute', 'répondeur', 'message', 
-                'mère', 'demande', 'inquiète', 'fille', 'disparue', 'craint', 'accident',
-                'janvier', 'matin', 'téléphone', 'enfant', 'grave', 'nouvelle'
-            ]
-            text_lower = text.lower()
-            french_count = sum(1 for word in french_indicators if word in text_lower)
-            
-            # Check for French-specific characters/patterns
-            has_french_chars = any(char in text for char in ['é', 'è', 'ê', 'ë', 'à', 'â', 'ç', 'ù', 'û', 'ü', 'ô', 'ö'])
-            
-            # Check for Arabic characters
-            has_arabic = any('\u0600' <= char <= '\u06FF' for char in text)
-            
-            # Improved detection: French if indicators found OR French characters present
-            if french_count >= 2 or has_french_chars:
-                source_lang = 'fr'
-                logger.info(f"Auto-detected source language: French (found {french_count} French indicators, has_french_chars: {has_french_chars})")
-            elif has_arabic:
-                source_lang = 'ar'
-                logger.info("Auto-detected source language: Arabic (found Arabic characters)")
-            else:
-                # Default to English or use env var
-                source_lang = lang_map.get(os.getenv('AI_TRANSLATION_SOURCE_LANG', 'en'), 'en')
-                logger.info(f"Using default source language: {source_lang}")
+        source_lang, target_lang = _resolve_language_pair(text, target_language, source_language)
+        mode_used = 'document' if document_mode else 'text'
         
         # Use ONLY transformers - no external API fallbacks
-        try:
-            translator = _get_translation_pipeline(source_lang, target_lang)
-            # Increase max_length for better context and quality (especially for longer sentences)
-            # Use longer max_length for better translation quality
-            max_length = 256 if len(text) > 200 else 128
-            result = translator(text, max_length=max_length)
-
-            if isinstance(result, list) and len(result) > 0:
-                translated_text = result[0].get('translation_text', '')
-            elif isinstance(result, dict):
-                translated_text = result.get('translation_text', '')
-            else:
-                translated_text = str(result)
-            
-            # Post-process to fix common pronoun reference errors (French → English)
-            if source_lang == 'fr' and target_lang == 'en':
-                translated_text = _fix_pronoun_references(translated_text, text)
+        route = _routing.route(source_lang, target_lang)
+        if route.direct:
+            try:
+                translated_text, details = _translate_pair(source_lang, target_lang, text, document_mode, tier, progress)
 
-            logger.info(f"✅ Translation successful: {source_lang} → {target_language}")
-            return {
-                'translated_text': translated_text,
-                'source_language': source_lang,
-                'target_language': target_language,
-                'original_text': text,
-                'method': 'transformers'
-            }
-        except Exception as e:
-            logger.warning(f"Direct translation failed ({source_lang}→{target_lang}): {e}")
-            # Try two-step translation via English if direct model doesn't exist
-            if source_lang != 'en' and target_lang != 'en':
-                try:
-                    logger.info(f"Trying two-step translation: {source_lang} → en → {target_lang}")
-                    # Step 1: Translate to English
-                    translator_en = _get_translation_pipeline(source_lang, 'en')
-                    max_length = 256 if len(text) > 200 else 128
-                    result_en = translator_en(text, max_length=max_length)
-                    
-                    if isinstance(result_en, list) and len(result_en) > 0:
-                        text_en = result_en[0].get('translation_text', '')
-                    elif isinstance(result_en, dict):
-                        text_en = result_en.get('translation_text', '')
-                    else:
-                        text_en = str(result_en)
-                    
-                    # Step 2: Translate from English to target
-                    translator_target = _get_translation_pipeline('en', target_lang)
-                    max_length_en = 256 if len(text_en) > 200 else 128
-                    result_final = translator_target(text_en, max_length=max_length_en)
-                    
-                    if isinstance(result_final, list) and len(result_final) > 0:
-                        translated_text = result_final[0].get('translation_text', '')
-                    elif isinstance(result_final, dict):
-                        translated_text = result_final.get('translation_text', '')
-                    else:
-                        translated_text = str(result_final)
-                    
-                    logger.info(f"✅ Two-step translation successful: {source_lang} → en → {target_language}")
-                    return {
-                        'translated_text': translated_text,
-                        'source_language': source_lang,
-                        'target_language': target_language,
-                        'original_text': text,
-                        'method': 'transformers_two_step',
-                        'note': f'Used two-step translation ({source_lang}→en→{target_lang}) because direct model not available'
-                    }
-                except Exception as e2:
-                    logger.error(f"Two-step translation also failed: {e2}")
-                    # Return error
+                logger.info(f"✅ Translation successful: {source_lang} → {target_language}")
+                return {
+                    'translated_text': translated_text,
+                    'source_language': source_lang,
+                    'target_language': target_language,
+                    'original_text': text,
+                    'method': 'transformers',
+                    'mode': mode_used,
+                    'tier': tier,
+                    **details
+                }
+            except Exception as e:
+                logger.warning(f"Direct translation failed ({source_lang}→{target_lang}): {e}")
+                # A model that failed to load has re-routed the pair
+                route = _routing.route(source_lang, target_lang)
+                if route.direct:
+                    # Return error - no fallback to external APIs
                     return {
-                        'error': f'Translation failed: Direct model ({source_lang}→{target_lang}) not available, and two-step translation also failed: {str(e2)}',
+                        'error': f'Transformer model error: {str(e)}',
                         'translated_text': None,
                         'source_language': source_lang,
                         'target_language': target_language,
                         'original_text': text,
                         'method': 'transformers',
-                        'suggestion': f'Try specifying source_language explicitly, or use a supported language pair. Check if Helsinki-NLP/opus-mt-{source_lang}-{target_lang} model exists.'
+                        'suggestion': 'Ensure transformers models are properly installed and loaded. Check server logs for details.'
                     }
-            else:
-                # Return error - no fallback to external APIs
+        
+        if route.kind == PIVOT:
+            # Two-step translation through the pivot language when there is no direct model
+            via = route.via
+            try:
+                logger.info(f"Trying two-step translation: {source_lang} → {via} → {target_lang}")
+                text_via, _ = _translate_pair(source_lang, via, text, document_mode, tier, progress)
+                translated_text, details = _translate_pair(via, target_lang, text_via, document_mode, tier, progress)
+                
+                logger.info(f"✅ Two-step translation successful: {source_lang} → {via} → {target_language}")
+                return {
+                    'translated_text': translated_text,
+                    'source_language': source_lang,
+                    'target_language': target_language,
+                    'original_text': text,
+                    'method': 'transformers_two_step',
+                    'mode': mode_used,
+                    'tier': tier,
+                    **details,
+                    'note': f'Used two-step translation ({source_lang}→{via}→{target_lang}) because direct model not available'
+                }
+            except Exception as e2:
+                logger.error(f"Two-step translation also failed: {e2}")
                 return {
-                    'error': f'Transformer model error: {str(e)}',
+                    'error': f'Translation failed: Direct model ({source_lang}→{target_lang}) not available, and two-step translation via {via} also failed: {str(e2)}',
                     'translated_text': None,
                     'source_language': source_lang,
                     'target_language': target_language,
                     'original_text': text,
                     'method': 'transformers',
-                    'suggestion': 'Ensure transformers models are properly installed and loaded. Check server logs for details.'
+                    'suggestion': 'Try specifying source_language explicitly, or use a supported language pair (see /api/languages/).'
                 }
+        
+        return {
+            'error': f'Translation from {source_lang} to {target_lang} is not supported: {route.reason}',
+            'translated_text': None,
+            'source_language': source_lang,
+            'target_language': target_language,
+            'original_text': text,
+            'method': 'transformers',
+            'suggestion': 'Try specifying source_language explicitly, or use a supported language pair (see /api/languages/).'
+        }
     
     except Exception as e:
         logger.error(f"Translation error: {e}")
@@ -327,59 +691,290 @@ def translate_text(text, target_language='en', source_language='auto'):
         }
 
 
+def translate_text(text, target_language='en', source_language='auto', mode='auto', tier=None, progress=None):
+    """
+    Translate text to target language using ONLY Transformers (Helsinki-NLP models).
+    No external APIs are used - all processing is local.
+    
+    Args:
+        text: Text to translate
+        target_language: Target language code (default: 'en')
+        source_language: Source language code or 'auto' for auto-detection (default: 'auto')
+        mode: 'text' for a single pass, 'document' for sentence-chunked translation of
+              long inputs, or 'auto' to pick document mode for long texts (default: 'auto')
+        tier: 'fast' (greedy), 'balanced' (small beam) or 'quality' (full beam);
+              None uses the configured default tier
+        progress: optional callback(done, total, unit), called as document translation advances
+    
+    Returns:
+        dict with translated text, source language and the tier that ran
+    """
+    try:
+        tier = _tiers.resolve(tier)
+    except ValueError as e:
+        return {
+            'error': str(e),
+            'translated_text': None,
+            'source_language': None,
+            'target_language': target_language
+        }
+    
+    if not text or not text.strip():
+        return _translate_text(text, target_language, source_language, mode, tier)
+    
+    started = time.perf_counter()
+    source_lang, target_lang = _resolve_language_pair(text, target_language, source_language)
+    model_name = _resolve_translation_model(source_lang, target_lang)
+    
+    def compute():
+        # Pass the requested source so 'auto' documents still get per-sentence detection
+        return _run_inference(
+            _translate_text, text, target_language, source_language, mode, tier,
+            progress=progress, routes=_translation_route_keys(source_lang, target_lang),
+        )
+    
+    # Profiled requests always run, so the profile shows the real work
+    if not _result_cache.enabled or timing.profiling():
+        result = compute()
+        metrics.observe_request('translate', model_name, f"{source_lang}-{target_lang}",
+                                time.perf_counter() - started, 'disabled')
+        return result
+    
+    key = make_cache_key(
+        'translate',
+        text,
+        source=source_lang,
+        target=target_lang,
+        target_language=target_language,
+        model=model_name,
+        mode=mode,
+        tier=tier,
+        generation=_tiers.tiers[tier],
+        chunk_tokens=_DOCUMENT_CHUNK_TOKENS,
+        postprocess=_postprocessor.fingerprint,
+    )
+    result, cache_status = _result_cache.get_or_compute(
+        key,
+        compute,
+        cacheable=lambda value: not value.get('error'),
+    )
+    metrics.observe_request('translate', model_name, f"{source_lang}-{target_lang}",
+                            time.perf_counter() - started, cache_status)
+    return dict(result, cache=cache_status)
+
+
+def _resolve_summarization_model():
+    """Name of the summarization model."""
+    # Use smaller, faster model by default (better for CPU/free tier)
+    # sshleifer/distilbart-cnn-12-6 is ~500MB vs bart-large-cnn ~1.6GB
+    return os.getenv('AI_SUMMARIZATION_MODEL') or "sshleifer/distilbart-cnn-12-6"
+
+
+# Request and stage metrics are labeled only with the supported pairs and their models
+metrics.known_pairs = frozenset(
+    f"{source}-{target}" for source in LANGUAGE_CODES for target in LANGUAGE_CODES if source != target
+)
+metrics.known_models = frozenset(
+    model
+    for source in LANGUAGE_CODES for target in LANGUAGE_CODES if source != target
+    for model in _translation_candidates(source, target)
+) | {_resolve_summarization_model()}
+
+
+def _load_summarization_pipeline(model_name):
+    """Load a summarization pipeline."""
+    import torch
+    from .pipelines import MeteredSummarizationPipeline
+
+    package = read_package(_PACKAGED_MODELS_DIR, model_name)
+    logger.info(f"Loading summarization model: {model_name}" + (f" (packaged, {package['tokenizer']} tokenizer)" if package else ""))
+    tokenizer = load_tokenizer(model_name, package)
+    model, precision, backend = _load_model_weights(model_name, package)
+    
+    # Optimize for CPU inference
+    device = 0 if torch.cuda.is_available() and backend == 'pytorch' else -1
+    summarizer = MeteredSummarizationPipeline(
+        model=model,
+        tokenizer=tokenizer,
+        device=device,
+        framework='pt',
+        task='summarization',
+        model_name=model_name,
+    )
+    summarizer.precision = precision
+    summarizer.backend = backend
+    logger.info(f"✅ Summarization model loaded: {model_name} ({backend}, {precision})")
+    return summarizer
+
+
 def _get_summarization_pipeline():
     """Get or create summarization pipeline. Uses smaller, faster models for CPU."""
-    global _summarization_pipeline
-    
-    if _summarization_pipeline is None:
+    model_name = _resolve_summarization_model()
+    try:
+        return _model_registry.get(model_name, lambda: _load_summarization_pipeline(model_name))
+    except Exception as e:
+        logger.error(f"Failed to load summarization model: {e}")
+        # Fallback to even smaller model
         try:
-            # Use smaller, faster model by default (better for CPU/free tier)
-            # sshleifer/distilbart-cnn-12-6 is ~500MB vs bart-large-cnn ~1.6GB
-            model_name = os.getenv('AI_SUMMARIZATION_MODEL') or "sshleifer/distilbart-cnn-12-6"
-            logger.info(f"Loading summarization model: {model_name}")
-            
-            # Optimize for CPU inference
-            device = 0 if torch.cuda.is_available() else -1
-            _summarization_pipeline = pipeline(
-                "summarization",
-                model=model_name,
-                device=device,
-                model_kwargs={
-                    'torch_dtype': torch.float32,  # Use float32 for CPU (faster than float16)
-                }
-            )
-            logger.info(f"✅ Summarization model loaded: {model_name}")
-        except Exception as e:
-            logger.error(f"Failed to load summarization model: {e}")
-            # Fallback to even smaller model
-            try:
-                model_name = "facebook/bart-large-cnn"  # Fallback to original if distilbart fails
-                logger.info(f"Trying fallback model: {model_name}")
-                _summarization_pipeline = pipeline(
-                    "summarization",
-                    model=model_name,
-                    device=0 if torch.cuda.is_available() else -1
-                )
-                logger.info(f"✅ Fallback summarization model loaded: {model_name}")
-            except Exception as e2:
-                logger.error(f"Failed to load fallback summarization model: {e2}")
-                raise
-    
-    return _summarization_pipeline
+            model_name = "facebook/bart-large-cnn"  # Fallback to original if distilbart fails
+            logger.info(f"Trying fallback model: {model_name}")
+            return _model_registry.get(model_name, lambda: _load_summarization_pipeline(model_name))
+        except Exception as e2:
+            logger.error(f"Failed to load fallback summarization model: {e2}")
+            raise
+
+
+# Startup warmup: the models, translation pairs and dummy inferences of the manifest's
+# "warmup" section; AI_WARMUP_TRANSLATION_PAIRS replaces its pairs when set
+_warmup_plan = load_plan(
+    getattr(settings, 'AI_WARMUP_MANIFEST', None), pairs=getattr(settings, 'AI_WARMUP_TRANSLATION_PAIRS', None),
+)
+# Failed warmup models are retried once the routing table would try them again
+_warmup = Warmup(retry_seconds=getattr(settings, 'AI_ROUTING_NEGATIVE_TTL', 600))
+
+
+def _warmup_legs(pair):
+    """Directly translated pairs a warmup pair goes through: itself, or both legs of its pivot route."""
+    source_lang, target_lang = pair.split('-')
+    route = _routing.route(source_lang, target_lang)
+    if route.kind == PIVOT:
+        return [(source_lang, route.via), (route.via, target_lang)]
+    return [(source_lang, target_lang)]
 
 
-def summarize_text(text, max_length=150):
+def _summarize_windows(summarizer, windows, generation):
     """
-    Summarize text using ONLY Transformers (BART model).
-    No external APIs are used - all processing is local.
+    Map stage: summarize windows through the micro-batcher, which runs them
+    (and any concurrent summarization requests) in batches. Returns the
+    partial summaries in window order.
+    """
+    results = _batcher.submit_many('summarization', summarizer, windows, truncation=True, **generation)
+    return [_extract_generated_text(result, 'summary_text').strip() for result in results]
+
+
+def _summarize_map_levels(summarizer, text, generation, progress=None):
+    """
+    Map stages of map-reduce summarization.
+
+    Splits the text into windows of _SUMMARY_WINDOW_TOKENS tokens and replaces
+    it with the concatenated window summaries until it fits in one window.
+    ``progress`` is called with (windows done, windows known so far plus the
+    reduce pass, 'windows') before and after each level.
     
-    Args:
-        text: Text to summarize
-        max_length: Maximum length of summary in characters (default: 150)
+    Returns:
+        (text for the reduce pass, per-level window counts and timings)
+    """
+    tokenizer = summarizer.tokenizer
+    
+    def count_tokens(sentence):
+        return len(tokenizer.encode(sentence, add_special_tokens=False))
+    
+    map_generation = dict(
+        generation,
+        max_length=_SUMMARY_MAP_MAX_TOKENS,
+        min_length=min(30, _SUMMARY_MAP_MAX_TOKENS // 2),
+    )
+    levels = []
+    current = text
+    windows_done = 0
+    for _ in range(_SUMMARY_MAX_DEPTH):
+        split_started = time.perf_counter()
+        _, pairs = split_sentences(current)
+        windows = [chunk for chunk, _ in iter_chunks(pairs, count_tokens, _SUMMARY_WINDOW_TOKENS, keep_lines=False)]
+        split_ms = (time.perf_counter() - split_started) * 1000
+        if len(windows) <= 1:
+            break
+        
+        if progress:
+            progress(windows_done, windows_done + len(windows) + 1, 'windows')
+        map_started = time.perf_counter()
+        partial_summaries = _summarize_windows(summarizer, windows, map_generation)
+        map_ms = (time.perf_counter() - map_started) * 1000
+        windows_done += len(windows)
+        if progress:
+            progress(windows_done, windows_done + 1, 'windows')
+        levels.append({
+            'windows': len(windows),
+            'split_ms': round(split_ms, 1),
+            'map_ms': round(map_ms, 1),
+        })
+        logger.info(f"Map-reduce level {len(levels)}: {len(windows)} windows in {map_ms:.0f} ms")
+        
+        combined = ' '.join(summary for summary in partial_summaries if summary)
+        if len(combined) >= len(current):
+            # Partial summaries stopped shrinking; reduce what we have
+            current = combined
+            break
+        current = combined
+    
+    return current, levels
+
+
+def _summarize_map_reduce(summarizer, text, max_tokens, min_tokens, generation, progress=None):
+    """
+    Hierarchical summarization for inputs longer than one model window.
+
+    The text is split into windows of _SUMMARY_WINDOW_TOKENS tokens and the
+    windows are summarized as a batch (map). The concatenated partial summaries
+    are split and summarized again until they fit in one window, and the
+    final pass produces a summary of at most max_tokens (reduce).
     
     Returns:
-        dict with summarized text
+        (summary, details) where details holds window counts and per-stage timings in ms
     """
+    started = time.perf_counter()
+    current, levels = _summarize_map_levels(summarizer, text, generation, progress)
+    
+    reduce_started = time.perf_counter()
+    result = _batcher.submit(
+        'summarization',
+        summarizer,
+        current,
+        truncation=True,
+        max_length=max_tokens,
+        min_length=min_tokens,
+        **generation
+    )
+    summary = _extract_generated_text(result, 'summary_text').strip()
+    reduce_ms = (time.perf_counter() - reduce_started) * 1000
+    if progress:
+        windows = sum(level['windows'] for level in levels) + 1
+        progress(windows, windows, 'windows')
+    
+    details = {
+        'windows': levels[0]['windows'] if levels else 1,
+        'levels': levels,
+        'timings': {
+            'map_ms': round(sum(level['map_ms'] for level in levels), 1),
+            'split_ms': round(sum(level['split_ms'] for level in levels), 1),
+            'reduce_ms': round(reduce_ms, 1),
+            'total_ms': round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+    logger.info(f"Map-reduce summary timings: {details['timings']}")
+    return summary, details
+
+
+def _summary_token_limits(max_length):
+    """(max_tokens, min_tokens) of a summary for a max_length given in characters."""
+    # Convert max_length from characters to tokens
+    # Allow more tokens for complete summaries (max_length is in characters, tokens are ~4 chars each)
+    # For max_length=200 chars, allow ~50-60 tokens (enough for a complete summary)
+    max_tokens = min(max_length // 3, 80)  # Increased to 80 tokens for better summaries
+    min_tokens = max(20, max_tokens // 3)  # Minimum 20 tokens for meaningful summary
+    return max_tokens, min_tokens
+
+
+def _use_map_reduce(summarizer, text, mode):
+    """Whether a summarize request runs map-reduce ('map_reduce', or 'auto' when the text exceeds one window)."""
+    return mode == 'map_reduce' or (
+        mode == 'auto'
+        and len(summarizer.tokenizer.encode(text, add_special_tokens=False)) > _SUMMARY_WINDOW_TOKENS
+    )
+
+
+def _summarize_text(text, max_length=150, mode='auto', tier='quality', progress=None):
+    """Uncached summarization; see summarize_text."""
     try:
         if not text or not text.strip():
             return {
@@ -389,43 +984,47 @@ def summarize_text(text, max_length=150):
                 'summary_length': 0
             }
         
-        # Limit text length for faster processing
-        max_input_length = 1024  # Increased to allow longer texts
-        if len(text) > max_input_length:
-            text = text[:max_input_length]
-            logger.warning(f"Text truncated to {max_input_length} characters for faster summarization")
+        # Single-pass mode keeps the character cap for faster processing
+        if mode == 'text' and len(text) > _SUMMARY_MAX_INPUT_CHARS:
+            text = text[:_SUMMARY_MAX_INPUT_CHARS]
+            logger.warning(f"Text truncated to {_SUMMARY_MAX_INPUT_CHARS} characters for faster summarization")
         
-        # Convert max_length from characters to tokens
-        # Allow more tokens for complete summaries (max_length is in characters, tokens are ~4 chars each)
-        # For max_length=200 chars, allow ~50-60 tokens (enough for a complete summary)
-        max_tokens = min(max_length // 3, 80)  # Increased to 80 tokens for better summaries
-        min_tokens = max(20, max_tokens // 3)  # Minimum 20 tokens for meaningful summary
+        max_tokens, min_tokens = _summary_token_limits(max_length)
+        max_tokens = _tiers.limit_tokens(tier, max_tokens)
+        min_tokens = min(min_tokens, max_tokens)
+        generation = _tiers.generation(tier, _SUMMARY_GENERATION)
         
         try:
             summarizer = _get_summarization_pipeline()
             
+            map_reduce = _use_map_reduce(summarizer, text, mode)
+            if map_reduce:
+                summary, details = _summarize_map_reduce(summarizer, text, max_tokens, min_tokens, generation, progress)
+                logger.info(f"✅ Map-reduce summarization successful: {len(text)} → {len(summary)} chars")
+                return dict({
+                    'summary': summary,
+                    'original_length': len(text),
+                    'summary_length': len(summary),
+                    'method': 'transformers_bart',
+                    'mode': 'map_reduce',
+                    'tier': tier,
+                    'note': 'Using BART transformer model for hierarchical (map-reduce) summarization.'
+                }, **details)
+            
             # Summarize with balanced settings for quality and speed
             # Use length_penalty to encourage more concise summaries
-            result = summarizer(
+            result = _batcher.submit(
+                'summarization',
+                summarizer,
                 text,
+                truncation=True,
                 max_length=max_tokens,
                 min_length=min_tokens,
-                do_sample=False,
-                num_beams=4,  # Increased to 4 for better quality summaries
-                early_stopping=True,
-                no_repeat_ngram_size=3,  # Prevent repetition for better summaries
-                length_penalty=1.2  # Encourage shorter, more concise summaries
+                **generation
             )
             
             # Extract summary
-            if isinstance(result, list) and len(result) > 0:
-                summary = result[0].get('summary_text', '')
-            elif isinstance(result, dict):
-                summary = result.get('summary_text', '')
-            else:
-                summary = str(result)
-            
-            summary = summary.strip()
+            summary = _extract_generated_text(result, 'summary_text').strip()
             
             logger.info(f"✅ Summarization successful: {len(text)} → {len(summary)} chars")
             
@@ -434,6 +1033,8 @@ def summarize_text(text, max_length=150):
                 'original_length': len(text),
                 'summary_length': len(summary),
                 'method': 'transformers_bart',
+                'mode': 'text',
+                'tier': tier,
                 'note': 'Using BART transformer model for summarization.'
             }
             
@@ -476,11 +1077,631 @@ def summarize_text(text, max_length=150):
         }
 
 
+def summarize_text(text, max_length=150, mode='auto', tier=None, progress=None):
+    """
+    Summarize text using ONLY Transformers (BART model).
+    No external APIs are used - all processing is local.
+    
+    Args:
+        text: Text to summarize
+        max_length: Maximum length of summary in characters (default: 150)
+        mode: 'text' for a single pass over the first 1024 characters, 'map_reduce' for
+              hierarchical summarization, or 'auto' to use map-reduce when the text
+              does not fit one model window (default: 'auto')
+        tier: 'fast' (greedy), 'balanced' (small beam) or 'quality' (full beam);
+              None uses the configured default tier
+        progress: optional callback(done, total, unit), called as map-reduce summarization advances
+    
+    Returns:
+        dict with summarized text and the tier that ran
+    """
+    try:
+        tier = _tiers.resolve(tier)
+    except ValueError as e:
+        return {
+            'error': str(e),
+            'summary': None,
+            'original_length': len(text or ''),
+            'summary_length': 0
+        }
+    
+    if not text or not text.strip():
+        return _run_inference(_summarize_text, text, max_length, mode, tier, progress=progress, routes=_SUMMARY_ROUTES)
+    
+    started = time.perf_counter()
+    model_name = _resolve_summarization_model()
+    if not _result_cache.enabled or timing.profiling():
+        result = _run_inference(_summarize_text, text, max_length, mode, tier, progress=progress, routes=_SUMMARY_ROUTES)
+        metrics.observe_request('summarize', model_name, '', time.perf_counter() - started, 'disabled')
+        return result
+    
+    key = make_cache_key(
+        'summarize',
+        text,
+        max_length=max_length,
+        mode=mode,
+        model=model_name,
+        tier=tier,
+        generation=_SUMMARY_GENERATION,
+        tier_settings=_tiers.tiers[tier],
+        window_tokens=_SUMMARY_WINDOW_TOKENS,
+    )
+    result, cache_status = _result_cache.get_or_compute(
+        key,
+        lambda: _run_inference(_summarize_text, text, max_length, mode, tier, progress=progress, routes=_SUMMARY_ROUTES),
+        cacheable=lambda value: not value.get('error'),
+    )
+    metrics.observe_request('summarize', model_name, '', time.perf_counter() - started, cache_status)
+    return dict(result, cache=cache_status)
+
+
+def stream_translate_text(text, target_language='en', source_language='auto', mode='auto'):
+    """
+    Streaming variant of translate_text for server-sent events.
+    
+    Yields ('token', {'text': ...}) events while the translation is generated
+    (chunk by chunk in document mode), then ('done', payload) with the
+    translate_text payload plus 'timings' (ttft_ms, total_ms), or
+    ('error', payload). Decoding is greedy and the result cache is bypassed.
+    """
+    timer = StreamTimer()
+    document_mode = mode == 'document' or (mode != 'text' and len(text) > _DOCUMENT_THRESHOLD_CHARS)
+    if not document_mode and len(text) > _DOCUMENT_THRESHOLD_CHARS:
+        text = text[:_DOCUMENT_THRESHOLD_CHARS]
+    source_lang, target_lang = _resolve_language_pair(text, target_language, source_language)
+    payload = {
+        'source_language': source_lang,
+        'target_language': target_language,
+        'original_text': text,
+        'method': 'transformers',
+        'mode': 'document' if document_mode else 'text',
+    }
+    
+    try:
+        stream_source, pair_source = text, source_lang
+        route = _routing.route(source_lang, target_lang)
+        if route.direct:
+            try:
+                translator = _get_translation_pipeline(source_lang, target_lang)
+            except LookupError as e:
+                logger.warning(f"Direct translation failed ({source_lang}→{target_lang}): {e}")
+                route = _routing.route(source_lang, target_lang)
+        if route.kind == PIVOT:
+            # Two-step translation: the first leg runs without streaming
+            via = route.via
+            logger.info(f"Streaming {source_lang}→{target_lang} via {via}")
+            stream_source, _ = _translate_pair(source_lang, via, text, document_mode, _tiers.default)
+            pair_source = via
+            translator = _get_translation_pipeline(via, target_lang)
+            payload['method'] = 'transformers_two_step'
+            payload['note'] = f'Used two-step translation ({source_lang}→{via}→{target_lang}) because direct model not available'
+        elif not route.direct:
+            raise LookupError(f"Translation from {source_lang} to {target_lang} is not supported: {route.reason}")
+        
+        model_name = _resolve_translation_model(pair_source, target_lang)
+        use_memory = document_mode and _translation_memory.enabled
+        memory_key = (model_name, pair_source, target_lang) if use_memory else None
+        if document_mode:
+            @functools.lru_cache(maxsize=1024)
+            def count_tokens(sentence):
+                return len(translator.tokenizer.encode(sentence, add_special_tokens=False))
+            
+            leading, pairs = split_sentences(stream_source)
+            segments = iter_chunks(pairs, count_tokens, _DOCUMENT_CHUNK_TOKENS, max_sentences=1 if use_memory else None)
+            chunks = itertools.chain.from_iterable(
+                _document_windows(segments, count_tokens, _DOCUMENT_CHUNK_TOKENS, memory_key)
+            )
+            max_length = min(512, _DOCUMENT_CHUNK_TOKENS * 2)
+        else:
+            leading, chunks = '', [(stream_source, '', [stream_source], None)]
+            max_length = 256 if len(stream_source) > 200 else 128
+        
+        output = [leading]
+        chunk_count = 0
+        for chunk, whitespace, sentences, translated in chunks:
+            if translated is not None:
+                timer.mark()
+                yield 'token', {'text': translated}
+            else:
+                pieces = []
+                for piece in stream_generate(translator, chunk, dict(_STREAM_TRANSLATION_GENERATION, max_length=max_length)):
+                    timer.mark()
+                    pieces.append(piece)
+                    yield 'token', {'text': piece}
+                translated = ''.join(pieces).strip()
+                if use_memory:
+                    _remember_chunk(memory_key, sentences, translated)
+            translated = _postprocessor.apply(pair_source, target_lang, translated, chunk)
+            if whitespace:
+                yield 'token', {'text': whitespace}
+            output.extend((translated, whitespace))
+            chunk_count += 1
+    except Exception as e:
+        logger.error(f"Streaming translation error ({source_lang} → {target_lang}): {e}")
+        _stream_stats.record('translate', timer.timings(), error=True)
+        yield 'error', dict(payload, error=f'Transformer model error: {str(e)}', translated_text=None)
+        return
+    
+    timings = timer.timings()
+    _stream_stats.record('translate', timings)
+    logger.info(f"✅ Streamed translation {source_lang} → {target_language}: first token after {timings['ttft_ms']} ms, done after {timings['total_ms']} ms")
+    yield 'done', dict(payload, translated_text=''.join(output), chunks=chunk_count, timings=timings)
+
+
+def stream_summarize_text(text, max_length=150, mode='auto'):
+    """
+    Streaming variant of summarize_text for server-sent events.
+    
+    Yields ('token', {'text': ...}) events while the summary is generated,
+    then ('done', payload) with the summarize_text payload plus 'timings'
+    (ttft_ms, total_ms), or ('error', payload). In map-reduce mode the map
+    stages run first and the final reduce pass is streamed. Decoding is
+    greedy and the result cache is bypassed.
+    """
+    timer = StreamTimer()
+    if mode == 'text' and len(text) > _SUMMARY_MAX_INPUT_CHARS:
+        text = text[:_SUMMARY_MAX_INPUT_CHARS]
+    max_tokens, min_tokens = _summary_token_limits(max_length)
+    
+    try:
+        summarizer = _get_summarization_pipeline()
+        details = {'mode': 'text', 'note': 'Using BART transformer model for summarization.'}
+        source = text
+        if _use_map_reduce(summarizer, text, mode):
+            # The map stages don't stream; they decode like the default tier
+            source, levels = _summarize_map_levels(summarizer, text, _tiers.generation(_tiers.default, _SUMMARY_GENERATION))
+            details = {
+                'mode': 'map_reduce',
+                'note': 'Using BART transformer model for hierarchical (map-reduce) summarization.',
+                'windows': levels[0]['windows'] if levels else 1,
+                'levels': levels,
+            }
+        
+        pieces = []
+        generation = dict(_STREAM_SUMMARY_GENERATION, max_length=max_tokens, min_length=min_tokens)
+        for piece in stream_generate(summarizer, source, generation):
+            timer.mark()
+            pieces.append(piece)
+            yield 'token', {'text': piece}
+    except Exception as e:
+        logger.error(f"Streaming summarization error: {e}")
+        _stream_stats.record('summarize', timer.timings(), error=True)
+        yield 'error', {
+            'error': f'Transformer model error: {str(e)}',
+            'summary': None,
+            'original_length': len(text),
+            'summary_length': 0,
+        }
+        return
+    
+    summary = ''.join(pieces).strip()
+    timings = timer.timings()
+    _stream_stats.record('summarize', timings)
+    logger.info(f"✅ Streamed summary {len(text)} → {len(summary)} chars: first token after {timings['ttft_ms']} ms, done after {timings['total_ms']} ms")
+    yield 'done', dict({
+        'summary': summary,
+        'original_length': len(text),
+        'summary_length': len(summary),
+        'method': 'transformers_bart',
+    }, **details, timings=timings)
+
+
+def _run_batch_items(groups, run_item):
+    """
+    Run deduplicated batch items concurrently and yield results in completion order.
+
+    ``groups`` maps a model name to ``{dedupe_key: [indexes]}``. Items are submitted
+    model by model so the micro-batcher sees same-model work together; each result
+    is yielded once per original index that asked for it.
+    """
+    futures = {}
+    for model_name, unique_items in groups.items():
+        for dedupe_key, indexes in unique_items.items():
+            futures[_batch_executor.submit(run_item, *dedupe_key)] = indexes
+    
+    for future in as_completed(futures):
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'error': str(e)}
+        for index in futures[future]:
+            yield dict(result, index=index)
+
+
+def _non_string_fields(item, fields):
+    """Names of the optional ``fields`` of a batch item that are set to something other than a string."""
+    return [field for field in fields if item.get(field) is not None and not isinstance(item[field], str)]
+
+
+def translate_batch(items):
+    """
+    Translate a list of items, yielding one result dict per item in completion order.
+
+    Items are dicts with ``text``, ``target_language``, ``source_language`` and
+    optional ``mode`` and ``tier``. Identical (text, source, target, mode, tier) inputs are
+    translated once; every result carries the ``index`` of the item it answers.
+    Invalid items get an error line, as the response has already started.
+    """
+    groups = {}
+    for index, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        text = item.get('text')
+        invalid = _non_string_fields(item, ('target_language', 'source_language', 'mode', 'tier'))
+        target_language = item.get('target_language') or 'en'
+        if invalid or not text or not isinstance(text, str) or not text.strip():
+            yield {
+                'index': index,
+                'error': f"Invalid {', '.join(invalid)}: expected a string" if invalid else 'Text is required',
+                'translated_text': None,
+                'source_language': None,
+                'target_language': None if invalid else target_language
+            }
+            continue
+        
+        unsupported = language_error(target_language, item.get('source_language'))
+        if unsupported:
+            yield {
+                'index': index,
+                'error': unsupported,
+                'translated_text': None,
+                'source_language': item.get('source_language'),
+                'target_language': target_language
+            }
+            continue
+        
+        # Items are translated with the requested source, like single requests, so
+        # auto-detected items still get per-sentence mixed-language detection; the
+        # detected pair only groups items by model for the micro-batcher
+        source_language = item.get('source_language') or 'auto'
+        try:
+            source_lang, target_lang = _resolve_language_pair(text, target_language, source_language)
+            model_name = _resolve_translation_model(source_lang, target_lang)
+        except Exception as e:
+            yield {
+                'index': index,
+                'error': str(e),
+                'translated_text': None,
+                'source_language': source_language,
+                'target_language': target_language
+            }
+            continue
+        dedupe_key = (text, target_language, source_language, item.get('mode') or 'auto', item.get('tier'))
+        groups.setdefault(model_name, {}).setdefault(dedupe_key, []).append(index)
+    
+    yield from _run_batch_items(groups, translate_text)
+
+
+def summarize_batch(items):
+    """
+    Summarize a list of items, yielding one result dict per item in completion order.
+
+    Items are dicts with ``text`` and optional ``max_length``, ``mode`` and ``tier``.
+    Identical (text, max_length, mode, tier) inputs are summarized once.
+    """
+    unique_items = {}
+    for index, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        text = item.get('text')
+        invalid = _non_string_fields(item, ('mode', 'tier'))
+        if invalid or not text or not isinstance(text, str) or not text.strip():
+            yield {
+                'index': index,
+                'error': f"Invalid {', '.join(invalid)}: expected a string" if invalid else 'Text is required',
+                'summary': None,
+                'original_length': 0,
+                'summary_length': 0
+            }
+            continue
+        
+        try:
+            max_length = int(item.get('max_length', 150))
+        except (ValueError, TypeError):
+            max_length = 150
+        unique_items.setdefault((text, max_length, item.get('mode') or 'auto', item.get('tier')), []).append(index)
+    
+    # A single summarization model serves every item
+    yield from _run_batch_items({'summarization': unique_items}, summarize_text)
+
+
+def get_batching_stats():
+    """Micro-batching statistics (batch counts and p50/p99 latency per batch size)."""
+    return _batcher.get_stats()
+
+
+def get_cache_stats():
+    """Result cache hit/miss/eviction counters."""
+    return _result_cache.get_stats()
+
+
+def get_translation_memory_stats():
+    """Translation memory lookup/hit counters and model tokens saved."""
+    return _translation_memory.get_stats()
+
+
+def get_streaming_stats():
+    """Time to first token and total time of streamed responses."""
+    return _stream_stats.get_stats()
+
+
+def get_model_stats():
+    """Loaded models, resident sizes, memory budget and recent load/evict events."""
+    return _model_registry.get_stats()
+
+
+# Uncached entry points the inference workers can run
+_worker_pool.register(_translate_text)
+_worker_pool.register(_summarize_text)
+
+
+# Route keys of summarization calls for the shard router
+_SUMMARY_ROUTES = ('summarization', _resolve_summarization_model())
+
+
+def _run_inference(handler, *args, progress=None, routes=()):
+    """
+    Run an uncached translate/summarize call in an inference worker when the
+    pool is running, else in this process. ``routes`` (model name, language
+    pair or 'summarization') pick the shard in router mode; calls no shard
+    serves, calls that report progress (jobs, since the callback can't
+    cross processes) and profiled calls stay here.
+    """
+    local = progress is not None or timing.profiling()
+    shard = _worker_pool.shard_for(routes) if _worker_pool.active and not local else None
+    if shard is None:
+        return handler(*args, progress=progress)
+    try:
+        return _worker_pool.call(handler.__name__, *args, shard=shard)
+    except WorkerPoolError as e:
+        logger.error(f"❌ Inference worker error: {e}")
+        return {'error': str(e)}
+
+
+def _warmup_inference(spec):
+    """A dummy inference of the warmup manifest, run through the uncached handlers; raises on error."""
+    tier = _tiers.resolve(spec.get('tier'))
+    text = spec.get('text') or 'Warm-up.'
+    mode = spec.get('mode', 'text')
+    if spec['task'] == 'summarization':
+        handler, args = _summarize_text, (text, spec.get('max_length', 60), mode, tier)
+    else:
+        source_lang, target_lang = spec['pair'].split('-')
+        handler, args = _translate_text, (text, target_lang, source_lang, mode, tier)
+
+    def infer():
+        result = handler(*args)
+        if result.get('error'):
+            raise RuntimeError(result['error'])
+    return infer
+
+
+def _warmup_steps(routes=None, inferences=True):
+    """
+    Warmup steps of the plan, one per model: (model, task, routes, required, load, inferences).
+
+    With ``routes`` only the models serving one of them ('summarization',
+    'src-tgt' pairs or model names) are included. A translation inference
+    runs on the model of the last leg of its pair. Models serving a required
+    route of the plan (both legs of a pivoted pair) are required.
+    """
+    steps = {}
+    required = set(_warmup_plan['required'])
+
+    def step(model, task):
+        return steps.setdefault(model, {'task': task, 'routes': [], 'required': False, 'loads': [], 'inferences': []})
+
+    def add_summarization():
+        entry = step(_resolve_summarization_model(), 'summarization')
+        entry['required'] = entry['required'] or 'summarization' in required
+        if not entry['routes']:
+            entry['routes'].append('summarization')
+            entry['loads'].append(_get_summarization_pipeline)
+        return entry
+
+    def add_pair(pair):
+        for source_lang, target_lang in _warmup_legs(pair):
+            entry = step(_resolve_translation_model(source_lang, target_lang), 'translation')
+            entry['required'] = entry['required'] or pair in required
+            route = f"{source_lang}-{target_lang}"
+            if route not in entry['routes']:
+                entry['routes'].append(route)
+                entry['loads'].append(lambda s=source_lang, t=target_lang: _get_translation_pipeline(s, t))
+        return entry
+
+    if _warmup_plan['summarization']:
+        add_summarization()
+    for pair in _warmup_plan['translation_pairs']:
+        add_pair(pair)
+    # Keep the warmup set resident regardless of the memory budget
+    _model_registry.pin(*steps)
+    for spec in _warmup_plan['inferences'] if inferences else ():
+        try:
+            entry = add_summarization() if spec.get('task') == 'summarization' else add_pair(spec['pair'])
+            entry['inferences'].append(_warmup_inference(spec))
+        except (KeyError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring warmup inference {spec!r}: {e}")
+
+    def load_all(loads):
+        return lambda: [load() for load in loads]
+
+    return [
+        (model, entry['task'], entry['routes'], entry['required'], load_all(entry['loads']), entry['inferences'])
+        for model, entry in steps.items()
+        if routes is None or model in routes or any(route in routes for route in entry['routes'])
+    ]
+
+
+def warm_up_models(inferences=True):
+    """
+    Load the warmup manifest's models and run its dummy inferences, in this
+    thread. Runs once per process; /api/ready/ reports the progress.
+    """
+    _warmup.run(_warmup_steps(inferences=inferences))
+
+
+def start_warmup():
+    """
+    Warm up on a background thread, once per process, unless warmup is off or
+    start_worker_pool() handles it. Called by the server entry points (the
+    WSGI module, gunicorn's post_worker_init), never by management commands.
+    """
+    if not getattr(settings, 'AI_WARMUP_ENABLED', True) or _worker_pool.workers:
+        return False
+    _warmup.start(_warmup_steps)
+    return True
+
+
+def get_readiness():
+    """
+    Whether this process should get traffic, with the warm state of each
+    startup model. Not ready while the warmup runs or when a required model
+    failed; failed models are retried once their retry delay has passed.
+    """
+    readiness = {'pid': os.getpid()}
+    if _worker_pool.router:
+        readiness.update(_router_readiness())
+        return readiness
+    if not getattr(settings, 'AI_WARMUP_ENABLED', True) and not _worker_pool.workers:
+        readiness.update(status='ready', ready=True, warmup='disabled', models={})
+        return readiness
+    readiness.update(_warmup.describe())
+    if readiness['status'] == 'idle' and start_warmup():
+        # Started without a server entry point (e.g. a custom WSGI setup): warm up now
+        readiness.update(_warmup.describe())
+    elif readiness['failed'] and _warmup.retry_failed():
+        readiness.update(_warmup.describe())
+    return readiness
+
+
+def _router_readiness():
+    """
+    Readiness in router mode, from the warm states the shard workers report.
+
+    Every required route of the plan is checked on the shard its calls go
+    to: ready once all of that shard's workers report ready; routes no shard
+    serves run in this process and load on demand.
+    """
+    try:
+        workers = _worker_pool.warmup_states() if _worker_pool.active else {}
+    except WorkerPoolError as e:
+        return {'status': 'failed', 'ready': False, 'mode': 'router', 'error': str(e), 'routes': {}, 'workers': {}}
+    states = {}
+    for name, worker in workers.items():
+        state = worker['state'] or {'status': 'starting', 'failed': []}
+        states[name] = {'shard': worker['shard'], 'pid': worker['pid'], 'status': state['status'],
+                        'failed': state['failed'], 'models': state.get('models', {})}
+    routes = {}
+    for route in _warmup_plan['required']:
+        keys = _SUMMARY_ROUTES if route == 'summarization' else _translation_route_keys(*route.split('-'))
+        shard = _worker_pool.shard_for(keys)
+        if shard is None:
+            routes[route] = {'shard': None, 'status': 'ready'}
+            continue
+        statuses = {states[worker.name]['status'] for worker in shard.workers if worker.name in states}
+        if not statuses:
+            status = 'starting'
+        elif statuses == {'ready'}:
+            status = 'ready'
+        else:
+            status = next(s for s in ('failed', 'starting', 'warming', 'idle') if s in statuses)
+        routes[route] = {'shard': shard.name, 'status': status}
+    ready = bool(workers) and all(route['status'] == 'ready' for route in routes.values())
+    if ready:
+        status = 'ready'
+    elif not workers:
+        status = 'starting'
+    else:
+        status = next(s for s in ('failed', 'starting', 'warming', 'idle')
+                      if any(route['status'] == s for route in routes.values()))
+    failed = sorted({model for state in states.values() for model in state['failed']})
+    return {'status': status, 'ready': ready, 'mode': 'router', 'routes': routes, 'workers': states, 'failed': failed}
+
+
+@_worker_pool.register_warm_up
+def _warm_up_routes(routes, report):
+    """
+    Warm up an inference worker after forking and ``report`` its warm state
+    to the front process. Pool workers run the dummy inferences on the models
+    loaded before the fork; a router-mode shard loads and warms the models of
+    its routes ('*' loads on demand) and retries failed ones.
+    """
+    warmup = Warmup(retry_seconds=getattr(settings, 'AI_ROUTING_NEGATIVE_TTL', 600), on_change=report)
+    warmup.run(_warmup_steps(routes if _worker_pool.router else None))
+    if warmup.describe()['failed'] and _worker_pool.router:
+        # No readiness checks reach a worker: retry on a timer instead
+        def retry():
+            while any(entry['state'] != WARM for entry in warmup.describe()['models'].values()):
+                time.sleep(min(warmup.retry_seconds, 60))
+                warmup.retry_failed()
+
+        threading.Thread(target=retry, name='ai-warmup-retry', daemon=True).start()
+
+
+def start_worker_pool():
+    """
+    Fork the inference worker pool when AI_WORKER_POOL_SIZE or AI_WORKER_SHARDS
+    is set. Called by the WSGI entry point, before the server starts any
+    request threads. A homogeneous pool shares the warmup models loaded here;
+    in router mode each shard loads its own models after forking. Dummy
+    inferences only run in the workers: a process that forks after torch ran
+    its OpenMP thread pool leaves the children hanging on their first one.
+    """
+    if not _worker_pool.workers:
+        return False
+    if not _worker_pool.router:
+        try:
+            warm_up_models(inferences=False)
+        except Exception as e:
+            logger.warning(f'⚠️ AI warmup before forking workers failed, workers will load models on demand: {e}')
+    _worker_pool.start()
+    return True
+
+
+def get_worker_pool_stats():
+    """Inference worker processes with their memory (RSS, PSS) and call counts."""
+    return _worker_pool.get_stats()
+
+
+def estimate_cost(text, tier=None, streaming=False):
+    """
+    Estimated inference cost of one input: approximate input tokens times the
+    tier's beam count (streams decode greedily). Unknown tiers count as greedy;
+    they are rejected when the request runs.
+    """
+    if not isinstance(text, str):
+        return 0
+    try:
+        beams = 1 if streaming else _tiers.tiers[_tiers.resolve(tier)]['num_beams']
+    except ValueError:
+        beams = 1
+    return math.ceil(len(text) / _CHARS_PER_TOKEN) * max(1, beams)
+
+
+def admit_request(kind, cost):
+    """
+    Admit an inference request into the bounded queue.
+
+    Returns a Ticket to release when the request's inference is done; raises
+    admission.Overloaded (with a retry delay) when the queue is full.
+    """
+    return _admission.admit(kind, cost)
+
+
+def get_admission_stats():
+    """Inference queue depth, cost in flight, and admitted/shed counts per endpoint."""
+    return _admission.get_stats()
+
+
+def get_generation_tiers():
+    """Decoding settings of each generation tier and the default tier."""
+    return _tiers.describe()
+
+
 def get_supported_languages():
-    """Get list of supported languages for translation."""
+    """Supported languages and how each pair is routed (direct model, download, pivot or unsupported)."""
     return {
         'languages': LANGUAGE_MAP,
         'language_codes': LANGUAGE_CODES,
-        'note': 'Using Transformers models (Helsinki-NLP) for translation. Language support depends on available model pairs.'
+        **_routing.describe(),
+        'note': 'Using Transformers models (Helsinki-NLP) for translation. Pairs without a direct model go through a pivot language; "routes" shows what each pair uses on this server ("download" pairs are not served locally yet and download their model on first use).'
     }
 
@@ -0,0 +1,112 @@
+"""
+Token streaming for generation pipelines.
+
+``generate`` runs on a background thread with a TextIteratorStreamer, so the
+decoded text can be sent to the client while it is produced. Time to first
+token (what the user perceives) is recorded separately from total time.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+
+from .batching import _percentile
+
+# Latency samples kept per endpoint for percentiles
+_SAMPLES = 1000
+
+
+def stream_generate(pipe, text, generation, timeout=120):
+    """
+    Generate from ``pipe`` for one input, yielding decoded text pieces as they are produced.
+
+    The input goes through the pipeline's own preprocessing (task prefix,
+    truncation). Beam search can't stream, so ``generation`` should be greedy.
+    Errors raised by ``generate`` are re-raised here.
+    """
+    import torch
+    from transformers import TextIteratorStreamer
+
+    model_inputs = pipe.preprocess(text, truncation=True)
+    model_inputs = {name: tensor.to(pipe.device) for name, tensor in model_inputs.items()}
+    streamer = TextIteratorStreamer(pipe.tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=timeout)
+    errors = []
+
+    def run():
+        try:
+            with torch.no_grad():
+                pipe.model.generate(**model_inputs, streamer=streamer, **generation)
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=run, name='ai-stream-generate', daemon=True)
+    thread.start()
+    for piece in streamer:
+        if piece:
+            yield piece
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+class StreamTimer:
+    """Time to first token and total time of one streamed response."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token = None
+        self.pieces = 0
+
+    def mark(self):
+        """Call for every piece sent to the client."""
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+        self.pieces += 1
+
+    def timings(self):
+        now = time.perf_counter()
+        return {
+            'ttft_ms': round((self.first_token - self.started) * 1000, 1) if self.first_token else None,
+            'total_ms': round((now - self.started) * 1000, 1),
+            'pieces': self.pieces,
+        }
+
+
+class StreamStats:
+    """Per-endpoint time-to-first-token and total-time percentiles of streamed responses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ttft = defaultdict(lambda: deque(maxlen=_SAMPLES))
+        self._total = defaultdict(lambda: deque(maxlen=_SAMPLES))
+        self._counts = defaultdict(int)
+        self._errors = defaultdict(int)
+
+    def record(self, kind, timings, error=False):
+        with self._lock:
+            self._counts[kind] += 1
+            if error:
+                self._errors[kind] += 1
+                return
+            if timings['ttft_ms'] is not None:
+                self._ttft[kind].append(timings['ttft_ms'])
+            self._total[kind].append(timings['total_ms'])
+
+    def get_stats(self):
+        with self._lock:
+            snapshot = {
+                kind: (sorted(self._ttft[kind]), sorted(self._total[kind]), self._errors[kind])
+                for kind in self._counts
+            }
+            counts = dict(self._counts)
+        stats = {}
+        for kind, (ttft, total, errors) in snapshot.items():
+            stats[kind] = {
+                'streams': counts[kind],
+                'errors': errors,
+                'ttft_p50_ms': _percentile(ttft, 50),
+                'ttft_p99_ms': _percentile(ttft, 99),
+                'total_p50_ms': _percentile(total, 50),
+                'total_p99_ms': _percentile(total, 99),
+            }
+        return stats
@@ -0,0 +1,796 @@
+"""
+Tests for ai_tools (run with ``python manage.py test ai_tools``).
+"""
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+from django.test import SimpleTestCase
+
+from .registry import ModelRegistry
+
+# Threads hammering the registry at once
+_THREADS = 32
+_MB = 2**20
+
+
+class _FakeTensor:
+    """Just enough of a tensor for estimate_model_bytes."""
+
+    def __init__(self, size_bytes):
+        self.size_bytes = size_bytes
+
+    def numel(self):
+        return self.size_bytes
+
+    def element_size(self):
+        return 1
+
+
+class _FakeModel:
+    def __init__(self, key, size_bytes):
+        self.key = key
+        self._tensors = [_FakeTensor(size_bytes)]
+
+    def parameters(self):
+        return iter(self._tensors)
+
+    def buffers(self):
+        return iter(())
+
+
+class _CountingLoader:
+    """Loader factory that counts constructions per key; each load takes a little while."""
+
+    def __init__(self, size_bytes=_MB, seconds=0.05):
+        self.size_bytes = size_bytes
+        self.seconds = seconds
+        self.constructed = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, key):
+        def load():
+            with self._lock:
+                self.constructed[key] += 1
+            time.sleep(self.seconds)
+            return _FakeModel(key, self.size_bytes)
+        return load
+
+
+def _hammer(registry, loader, keys):
+    """Call registry.get from _THREADS threads released together; returns (results, errors)."""
+    barrier = threading.Barrier(_THREADS)
+    results, errors = [], []
+    lock = threading.Lock()
+
+    def run(index):
+        key = keys[index % len(keys)]
+        barrier.wait()
+        try:
+            value = registry.get(key, loader(key))
+            with lock:
+                results.append((key, value))
+        except Exception as e:
+            with lock:
+                errors.append((key, e))
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class ModelRegistryConcurrencyTests(SimpleTestCase):
+    def test_each_model_constructed_once(self):
+        registry = ModelRegistry()
+        loader = _CountingLoader()
+        keys = ['en-fr', 'fr-en', 'summarization', 'de-en']
+
+        results, errors = _hammer(registry, loader, keys)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(loader.constructed, Counter({key: 1 for key in keys}))
+        # Every caller of a key shares the one constructed instance
+        for key in keys:
+            self.assertEqual(len({id(value) for result_key, value in results if result_key == key}), 1)
+
+    def test_evicted_model_reloaded_once(self):
+        # Room for two models: loading a third evicts the least recently used
+        registry = ModelRegistry(budget_bytes=2 * _MB)
+        loader = _CountingLoader()
+        registry.get('a', loader('a'))
+        registry.get('b', loader('b'))
+        registry.get('c', loader('c'))
+        self.assertNotIn('a', registry)
+
+        # Reload 'a' while loading 'd', each of which evicts another model
+        results, errors = _hammer(registry, loader, ['a', 'd'])
+
+        self.assertEqual(errors, [])
+        self.assertEqual(loader.constructed, Counter({'a': 2, 'b': 1, 'c': 1, 'd': 1}))
+        self.assertEqual(len({id(value) for key, value in results if key == 'a'}), 1)
+        self.assertLessEqual(registry.resident_bytes, 2 * _MB)
+
+    def test_pinned_model_survives_eviction(self):
+        registry = ModelRegistry(budget_bytes=2 * _MB, pinned=['summarization'])
+        loader = _CountingLoader()
+
+        for round_keys in (['summarization', 'a'], ['b', 'c'], ['summarization', 'd']):
+            _, errors = _hammer(registry, loader, round_keys)
+            self.assertEqual(errors, [])
+
+        self.assertIn('summarization', registry)
+        self.assertEqual(loader.constructed['summarization'], 1)
+        self.assertTrue(all(count == 1 for count in loader.constructed.values()))
+
+    def test_failed_load_shared_then_retried(self):
+        registry = ModelRegistry()
+        attempts = Counter()
+
+        def failing(key):
+            def load():
+                attempts[key] += 1
+                time.sleep(0.2)
+                raise OSError(f"cannot load {key}")
+            return load
+
+        results, errors = _hammer(registry, failing, ['broken'])
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), _THREADS)
+        self.assertEqual(attempts['broken'], 1)
+        # A failure isn't cached: the next caller tries again
+        loader = _CountingLoader()
+        registry.get('broken', loader('broken'))
+        self.assertEqual(loader.constructed['broken'], 1)
+
+
+class JobOwnerTests(SimpleTestCase):
+    def test_current_process_is_alive(self):
+        from .jobs import current_owner, owner_alive
+        self.assertTrue(owner_alive(current_owner()))
+
+    def test_gone_or_reused_process_is_not_alive(self):
+        import socket
+        from .jobs import owner_alive
+        host = socket.gethostname()
+        self.assertFalse(owner_alive(f"{host}:{2**22 + 1}:1"))
+        # Same process id, different start time: the id was reused
+        self.assertFalse(owner_alive(f"{host}:{os.getpid()}:1"))
+        self.assertFalse(owner_alive(''))
+
+    def test_other_host_counts_as_alive(self):
+        from .jobs import owner_alive
+        self.assertTrue(owner_alive('another-host:1234:99'))
+
+
+class MetricLabelTests(SimpleTestCase):
+    def test_unknown_models_and_pairs_collapse(self):
+        from . import metrics, services  # noqa: F401 (services sets the known labels)
+        model = services._resolve_translation_model('en', 'fr')
+        self.assertEqual(metrics._bounded(model, 'en-fr'), (model, 'en-fr'))
+        self.assertEqual(metrics._bounded('Helsinki-NLP/opus-mt-qq123-en', 'qq123-en'), ('other', 'unsupported'))
+        self.assertEqual(metrics._bounded(services._resolve_summarization_model(), ''),
+                         (services._resolve_summarization_model(), ''))
+
+
+class RoutingTableTests(SimpleTestCase):
+    def test_missing_model_checked_again_after_ttl(self):
+        from .routing import DIRECT, UNSUPPORTED, RoutingTable
+        available = set()
+        table = RoutingTable(['en', 'fr'], lambda source, target: [f'{source}-{target}'],
+                             lambda model: model in available, pivots=[], negative_ttl=0.1)
+        self.assertEqual(table.route('en', 'fr').kind, UNSUPPORTED)
+        # Downloaded in the meantime
+        available.add('en-fr')
+        self.assertEqual(table.route('en', 'fr').kind, UNSUPPORTED)
+        time.sleep(0.15)
+        self.assertEqual(table.route('en', 'fr').kind, DIRECT)
+
+    def test_only_supported_pairs_are_kept(self):
+        from .routing import RoutingTable
+        table = RoutingTable(['en', 'fr'], lambda source, target: [f'{source}-{target}'],
+                             lambda model: True, pivots=[])
+        table.build()
+        for index in range(100):
+            table.route(f'q{index}', 'en')
+        self.assertEqual(len(table._routes), 2)
+
+    def test_uncached_pair_reported_apart(self):
+        from .routing import DIRECT, DOWNLOAD, PIVOT, UNSUPPORTED, RoutingTable
+        local = {'en-fr', 'fr-en'}
+
+        def table(allow_downloads):
+            return RoutingTable(['en', 'fr', 'de'], lambda source, target: [f'{source}-{target}'],
+                                lambda model: model in local, pivots=[], allow_downloads=allow_downloads)
+
+        self.assertEqual(table(False).route('en', 'de').kind, UNSUPPORTED)
+        downloads = table(True)
+        route = downloads.route('en', 'de')
+        self.assertEqual((route.kind, route.model, route.direct), (DOWNLOAD, 'en-de', True))
+        self.assertEqual(downloads.route('en', 'fr').kind, DIRECT)
+        described = downloads.describe()
+        self.assertEqual(described['routes']['en']['de'], {'route': DOWNLOAD, 'model': 'en-de'})
+        self.assertEqual(described['pairs'], {DIRECT: 2, DOWNLOAD: 4, PIVOT: 0, UNSUPPORTED: 0})
+
+    def test_pivot_goes_to_the_shard_of_a_leg(self):
+        from unittest import mock
+        from . import services
+        from .routing import RoutingTable
+        from .workers import InferencePool, parse_shards
+        # No en-de model: en-de pivots through fr
+        available = {'opus-en-fr', 'opus-fr-de'}
+        table = RoutingTable(['en', 'fr', 'de'], lambda source, target: [f'opus-{source}-{target}'],
+                             lambda model: model in available, pivots=['fr'])
+        with mock.patch.object(services, '_routing', table):
+            keys = services._translation_route_keys('en', 'de')
+        self.assertEqual(keys, ('opus-en-fr', 'en-fr', 'opus-fr-de', 'fr-de'))
+        pool = InferencePool(shards=parse_shards('enfr=en-fr:1;rest=*:1'))
+        self.assertEqual(pool.shard_for(keys).name, 'enfr')
+
+
+class WarmupTests(SimpleTestCase):
+    def _steps(self, loads):
+        return [(model, 'translation', [model], required, load, []) for model, required, load in loads]
+
+    def test_ready_with_failed_optional_model(self):
+        from .warmup import Warmup
+
+        def broken():
+            raise OSError('no such model')
+
+        warmup = Warmup()
+        warmup.run(self._steps([('a', True, lambda: None), ('b', False, broken)]))
+        state = warmup.describe()
+        self.assertTrue(state['ready'])
+        self.assertEqual(state['failed'], ['b'])
+
+    def test_failed_required_model_retried(self):
+        from .warmup import Warmup
+        attempts = Counter()
+
+        def flaky():
+            attempts['a'] += 1
+            if attempts['a'] == 1:
+                raise OSError('download failed')
+
+        reports = []
+        warmup = Warmup(retry_seconds=0.1, on_change=lambda state: reports.append(state['status']))
+        warmup.run(self._steps([('a', True, flaky)]))
+        self.assertEqual(warmup.describe()['status'], 'failed')
+        self.assertFalse(warmup.retry_failed())
+
+        time.sleep(0.15)
+        self.assertTrue(warmup.retry_failed())
+        warmup._retry_thread.join()
+        state = warmup.describe()
+        self.assertTrue(state['ready'])
+        self.assertEqual(state['failed'], [])
+        self.assertEqual(state['models']['a']['attempts'], 2)
+        self.assertEqual(reports, ['failed', 'ready'])
+
+
+class _RecordingPipe:
+    """Pipeline stand-in that records each call's inputs and params and upper-cases its inputs."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, texts, batch_size=None, **params):
+        batch = [texts] if isinstance(texts, str) else list(texts)
+        with self._lock:
+            self.calls.append((tuple(sorted(batch)), tuple(sorted(params.items()))))
+        if self.fail:
+            raise RuntimeError('generate failed')
+        results = [{'text': text.upper()} for text in batch]
+        return results[0] if isinstance(texts, str) else results
+
+
+def _submit_together(batcher, submissions):
+    """Submit (model_key, pipe, text, params) from one thread each, released together; returns results by index."""
+    barrier = threading.Barrier(len(submissions))
+    results = {}
+
+    def run(index, model_key, pipe, text, params):
+        barrier.wait()
+        try:
+            results[index] = batcher.submit(model_key, pipe, text, **params)
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=run, args=(index, *submission)) for index, submission in enumerate(submissions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class MicroBatcherTests(SimpleTestCase):
+    def test_batches_grouped_by_params_and_bucket(self):
+        from .batching import MicroBatcher
+        batcher = MicroBatcher(max_batch_size=8, max_wait_ms=300, bucket_bounds=(64,))
+        pipe = _RecordingPipe()
+        long_text = 'x' * 100
+
+        results = _submit_together(batcher, [
+            ('m', pipe, 'a', {'num_beams': 1}),
+            ('m', pipe, 'b', {'num_beams': 1}),
+            ('m', pipe, 'c', {'num_beams': 4}),
+            ('m', pipe, long_text, {'num_beams': 1}),
+        ])
+
+        self.assertEqual(sorted(pipe.calls), sorted([
+            (('a', 'b'), (('num_beams', 1),)),
+            (('c',), (('num_beams', 4),)),
+            ((long_text,), (('num_beams', 1),)),
+        ]))
+        # Each caller gets the result of its own input
+        self.assertEqual(results, {0: {'text': 'A'}, 1: {'text': 'B'}, 2: {'text': 'C'}, 3: {'text': long_text.upper()}})
+
+    def test_failed_batch_fails_every_caller(self):
+        from .batching import MicroBatcher
+        batcher = MicroBatcher(max_batch_size=8, max_wait_ms=300)
+        pipe = _RecordingPipe(fail=True)
+
+        results = _submit_together(batcher, [('m', pipe, text, {}) for text in ('a', 'b', 'c')])
+
+        self.assertEqual(len(pipe.calls), 1)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results.values()))
+        # The batch thread survives the failure
+        pipe.fail = False
+        self.assertEqual(batcher.submit('m', pipe, 'd'), {'text': 'D'})
+
+    def test_partial_batch_flushed_after_max_wait(self):
+        from .batching import MicroBatcher
+        batcher = MicroBatcher(max_batch_size=8, max_wait_ms=100)
+        pipe = _RecordingPipe()
+
+        started = time.perf_counter()
+        results = batcher.submit_many('m', pipe, ['a', 'b', 'c'])
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(results, [{'text': 'A'}, {'text': 'B'}, {'text': 'C'}])
+        self.assertEqual(pipe.calls, [(('a', 'b', 'c'), ())])
+        self.assertGreaterEqual(elapsed, 0.1)
+        self.assertLess(elapsed, 2)
+
+    def test_idle_thread_exits_and_restarts(self):
+        from unittest import mock
+        from . import batching
+        batcher = batching.MicroBatcher(max_batch_size=8, max_wait_ms=0)
+        pipe = _RecordingPipe()
+
+        with mock.patch.object(batching, '_IDLE_SECONDS', 0.1):
+            batcher.submit('m', pipe, 'a')
+            worker = batcher._queues['m'][1]
+            worker.join(timeout=2)
+            self.assertFalse(worker.is_alive())
+            self.assertNotIn('m', batcher._queues)
+            self.assertEqual(batcher.get_stats()['models'], 0)
+
+            self.assertEqual(batcher.submit('m', pipe, 'b'), {'text': 'B'})
+            self.assertIsNot(batcher._queues['m'][1], worker)
+
+
+class ResultCacheTests(SimpleTestCase):
+    def _counting(self, value='result', seconds=0.0):
+        calls = Counter()
+
+        def compute():
+            calls['compute'] += 1
+            time.sleep(seconds)
+            return value
+        return compute, calls
+
+    def test_entry_expires_after_ttl(self):
+        from .cache import ResultCache
+        cache = ResultCache(ttl_seconds=0.1)
+        compute, calls = self._counting()
+
+        self.assertEqual(cache.get_or_compute('k', compute), ('result', 'miss'))
+        self.assertEqual(cache.get_or_compute('k', compute), ('result', 'hit'))
+        time.sleep(0.15)
+        self.assertEqual(cache.get_or_compute('k', compute), ('result', 'miss'))
+        self.assertEqual(calls['compute'], 2)
+        self.assertEqual(cache.get_stats()['expirations'], 1)
+
+    def test_least_recently_used_entry_evicted(self):
+        from .cache import ResultCache
+        cache = ResultCache(max_entries=2)
+        cache.get_or_compute('a', lambda: 'A')
+        cache.get_or_compute('b', lambda: 'B')
+        # Touch 'a' so 'b' is the least recently used
+        self.assertEqual(cache.get_or_compute('a', lambda: 'A2'), ('A', 'hit'))
+        cache.get_or_compute('c', lambda: 'C')
+
+        self.assertEqual(cache.get_or_compute('b', lambda: 'B2'), ('B2', 'miss'))
+        self.assertEqual(cache.get_or_compute('c', lambda: 'C2'), ('C', 'hit'))
+        self.assertEqual(cache.get_stats()['evictions'], 2)
+
+    def test_uncacheable_value_not_stored(self):
+        from .cache import ResultCache
+        cache = ResultCache()
+        error = {'error': 'failed'}
+        cache.get_or_compute('k', lambda: error, cacheable=lambda value: not value.get('error'))
+        self.assertEqual(cache.get_or_compute('k', lambda: {'ok': True})[1], 'miss')
+
+    def test_sqlite_tier_survives_new_instance(self):
+        import tempfile
+        from .cache import ResultCache
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.sqlite3')
+            ResultCache(sqlite_path=path).get_or_compute('k', lambda: {'translated_text': 'bonjour'})
+
+            compute, calls = self._counting()
+            value, status = ResultCache(sqlite_path=path).get_or_compute('k', compute)
+
+        self.assertEqual((value, status), ({'translated_text': 'bonjour'}, 'disk_hit'))
+        self.assertEqual(calls['compute'], 0)
+
+    def test_concurrent_identical_requests_computed_once(self):
+        from .cache import ResultCache
+        cache = ResultCache()
+        compute, calls = self._counting(seconds=0.2)
+        barrier = threading.Barrier(_THREADS)
+        statuses = Counter()
+        lock = threading.Lock()
+
+        def run():
+            barrier.wait()
+            value, status = cache.get_or_compute('k', compute)
+            with lock:
+                statuses[(value, status)] += 1
+
+        threads = [threading.Thread(target=run) for _ in range(_THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls['compute'], 1)
+        self.assertEqual(statuses, Counter({('result', 'miss'): 1, ('result', 'coalesced'): _THREADS - 1}))
+
+
+class _WordTokenizer:
+    def encode(self, text, add_special_tokens=False):
+        return text.split()
+
+
+class _UpperTranslator:
+    tokenizer = _WordTokenizer()
+
+
+class DocumentTranslationMemoryTests(SimpleTestCase):
+    def setUp(self):
+        from unittest import mock
+        from . import services
+        from .translation_memory import TranslationMemory
+        self.translated = []
+
+        def submit_many(model_key, pipe, texts, **params):
+            self.translated.append(list(texts))
+            return [{'translation_text': text.upper()} for text in texts]
+
+        for target, value in (
+            ('_translation_memory', TranslationMemory()),
+            ('_get_translation_pipeline', lambda source, target: _UpperTranslator()),
+            ('_resolve_translation_model', lambda source, target: 'model'),
+            ('_DOCUMENT_CHUNK_TOKENS', 8),
+        ):
+            patcher = mock.patch.object(services, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(services._batcher, 'submit_many', submit_many)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.services = services
+
+    def _translate(self, text):
+        return self.services._translate_document('xx', 'yy', text, 'fast')
+
+    def test_misses_packed_and_hits_counted(self):
+        text, details = self._translate('A one. B two. C three.')
+        # Nothing in memory yet: the sentences are packed into one chunk
+        self.assertEqual(self.translated, [['A one. B two. C three.']])
+        self.assertEqual(text, 'A ONE. B TWO. C THREE.')
+        self.assertEqual(details['translation_memory'], {'segments': 3, 'hits': 0, 'hit_ratio': 0.0, 'tokens_saved': 0})
+
+        text, details = self._translate('A one. B two. D four. E five.')
+        # Only the new sentences go to the model, still packed together
+        self.assertEqual(self.translated[1:], [['D four. E five.']])
+        self.assertEqual(text, 'A ONE. B TWO. D FOUR. E FIVE.')
+        self.assertEqual(details['translation_memory'], {'segments': 4, 'hits': 2, 'hit_ratio': 0.5, 'tokens_saved': 4})
+
+    def test_chunks_stay_within_budget(self):
+        self._translate('One two three four. Five six seven eight. Nine ten.')
+        self.assertEqual(self.translated, [['One two three four. Five six seven eight.', 'Nine ten.']])
+
+
+class SourceDetectionTests(SimpleTestCase):
+    def test_short_texts_keep_clear_guesses(self):
+        from .services import _detect_source_language
+        for text, language in (('Bonjour', 'fr'), ('Hasta mañana', 'es'), ('Descrizione del corso', 'it'),
+                               ('مرحبا', 'ar'), ('Danke schön', 'de')):
+            self.assertEqual(_detect_source_language(text), language, text)
+
+    def test_ambiguous_short_texts_fall_back(self):
+        from .services import _detect_source_language
+        for text in ('OK', 'Computer science', 'https://x.com'):
+            self.assertEqual(_detect_source_language(text), 'en', text)
+
+
+def legacy_fix_pronoun_references(translated_text, original_text):
+    """The sequential implementation services._fix_pronoun_references used before."""
+    original_lower = original_text.lower()
+    translated_lower = translated_text.lower()
+    if 'mère' in original_lower and 'sa fille' in original_lower:
+        translated_text = re.sub(r'\bhis daughter\b', 'her daughter', translated_text, flags=re.IGNORECASE)
+        translated_text = re.sub(r'\bhis own daughter\b', 'her daughter', translated_text, flags=re.IGNORECASE)
+    if 'mère' in original_lower or 'mother' in translated_lower:
+        translated_text = re.sub(r'\bheard of his daughter\b', 'heard of her daughter', translated_text, flags=re.IGNORECASE)
+        translated_text = re.sub(r'\bnews of his daughter\b', 'news of her daughter', translated_text, flags=re.IGNORECASE)
+        translated_text = re.sub(r'\bnews about his daughter\b', 'news about her daughter', translated_text, flags=re.IGNORECASE)
+        translated_text = re.sub(r'\bheard news of his daughter\b', 'heard news of her daughter', translated_text, flags=re.IGNORECASE)
+    if any(word in original_lower for word in ['fille', 'elle', 'disparue', 'mère']):
+        if re.search(r'(daughter|mother|girl|woman|she|her|Electra)', translated_text, re.IGNORECASE):
+            translated_text = re.sub(r'\bhappened to him\b', 'happened to her', translated_text, flags=re.IGNORECASE)
+            translated_text = re.sub(r'\bhas happened to him\b', 'has happened to her', translated_text, flags=re.IGNORECASE)
+            translated_text = re.sub(r'\bhad happened to him\b', 'had happened to her', translated_text, flags=re.IGNORECASE)
+            translated_text = re.sub(r'\bwill happen to him\b', 'will happen to her', translated_text, flags=re.IGNORECASE)
+    if re.search(r'\bshe\b.*\bfears?\b', translated_text, re.IGNORECASE):
+        translated_text = re.sub(r'\bhappened to him\b', 'happened to her', translated_text, flags=re.IGNORECASE)
+        translated_text = re.sub(r'\bhas happened to him\b', 'has happened to her', translated_text, flags=re.IGNORECASE)
+        translated_text = re.sub(r'\bhad happened to him\b', 'had happened to her', translated_text, flags=re.IGNORECASE)
+    return translated_text
+
+
+GOLDEN_CASES = [
+    ("Sa mère a demandé des nouvelles de sa fille.", "His mother asked for news of his daughter."),
+    ("La mère craint qu'il soit arrivé quelque chose à sa fille.", "The mother fears that something has happened to him."),
+    ("Elle a peur qu'il lui soit arrivé un accident.", "She fears that an accident had happened to him."),
+    ("Sa mère n'a pas entendu parler de sa fille.", "His mother Heard of His daughter. HIS OWN DAUGHTER left."),
+    ("Le père parle à son fils.", "The father talks to his son. Something happened to him."),
+    ("La mère attend.", "heard news of his daughter, news about his daughter, news of his daughter"),
+    ("Il lit.", "She fears it Has Happened To Him and will happen to him."),
+    ("La fille est disparue.", "The girl is gone; nothing will happen to him, this daughter, his daughters."),
+    ("Sa mère et sa fille.", "Whose daughter? His daughter, his daughter and his own daughter."),
+    ("", ""),
+]
+
+_PHRASES = [
+    'his daughter', 'his own daughter', 'heard of his daughter', 'news of his daughter',
+    'news about his daughter', 'heard news of his daughter', 'happened to him', 'has happened to him',
+    'had happened to him', 'will happen to him', 'she fears', 'the mother', 'the girl', 'this daughter',
+    'He', 'there', 'Electra', 'his', 'him', 'fears', 'his daughters',
+]
+_FILLER = ['the', 'teacher', 'said', 'that', 'nothing', 'and', 'yesterday', 'at', 'school', ',', '.', '\n']
+_SOURCE_WORDS = ['mère', 'sa fille', 'fille', 'elle', 'disparue', 'le père', 'il', 'son fils']
+
+
+def _random_case(rng):
+    def vary(phrase):
+        choice = rng.random()
+        if choice < 0.2:
+            return phrase.upper()
+        if choice < 0.4:
+            return phrase.title()
+        return phrase
+    words = [vary(rng.choice(_PHRASES)) if rng.random() < 0.4 else rng.choice(_FILLER)
+             for _ in range(rng.randint(3, 25))]
+    source = ' '.join(rng.sample(_SOURCE_WORDS, rng.randint(0, 3)))
+    return source, ' '.join(words)
+
+
+class PostProcessorParityTests(SimpleTestCase):
+    """The rule engine must give exactly what the old sequential re.sub loop gave."""
+
+    def _check(self, cases):
+        from .postprocess import PostProcessor
+        processor = PostProcessor()
+        for source, output in cases:
+            self.assertEqual(processor.apply('fr', 'en', output, source),
+                             legacy_fix_pronoun_references(output, source), (source, output))
+
+    def test_golden_cases(self):
+        self._check(GOLDEN_CASES)
+
+    def test_random_cases(self):
+        rng = random.Random(7)
+        self._check([_random_case(rng) for _ in range(2000)])
+
+
+class AdmissionControllerTests(SimpleTestCase):
+    def test_sheds_by_request_count(self):
+        from .admission import AdmissionController, Overloaded
+        controller = AdmissionController(max_requests=2)
+        first = controller.admit('translate', 10)
+        controller.admit('translate', 10)
+        with self.assertRaises(Overloaded) as shed:
+            controller.admit('translate', 10)
+        self.assertEqual(shed.exception.reason, 'requests')
+        # No drain history yet: the shortest delay
+        self.assertEqual(shed.exception.retry_after, 1)
+        first.release()
+        controller.admit('translate', 10)
+        stats = controller.get_stats()
+        self.assertEqual((stats['depth'], stats['shed_total'], stats['shed_reasons']), (2, 1, {'requests': 1}))
+
+    def test_sheds_by_cost_but_admits_large_requests_alone(self):
+        from .admission import AdmissionController, Overloaded
+        controller = AdmissionController(max_requests=0, max_cost=100)
+        with controller.admit('summarize', 500):
+            with self.assertRaises(Overloaded) as shed:
+                controller.admit('summarize', 10)
+        self.assertEqual(shed.exception.reason, 'cost')
+        self.assertEqual(controller.get_stats()['cost_in_flight'], 0)
+
+    def test_retry_after_clamped(self):
+        from .admission import AdmissionController, Overloaded
+        controller = AdmissionController(max_cost=100, max_retry_after=30)
+        controller._seconds_per_cost = 10.0
+        controller.admit('translate', 100)
+        with self.assertRaises(Overloaded) as shed:
+            controller.admit('translate', 50)
+        self.assertEqual(shed.exception.retry_after, 30)
+
+
+class AdmissionViewTests(SimpleTestCase):
+    """Views shed with 503 + Retry-After and always give their ticket back."""
+
+    def setUp(self):
+        from unittest import mock
+        from rest_framework.test import APIRequestFactory
+        from . import views
+        from .admission import AdmissionController
+        self.views = views
+        self.factory = APIRequestFactory()
+        self.controller = AdmissionController(max_requests=1)
+        for name, value in (('admit_request', self.controller.admit), ('language_error', lambda *args: None)):
+            patcher = mock.patch.object(views, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _post(self, view, path):
+        return view(self.factory.post(path, {'text': 'Hello', 'target_language': 'fr'}, format='json'))
+
+    def test_shed_request_gets_503_with_retry_after(self):
+        from .admission import Overloaded
+        from unittest import mock
+        with mock.patch.object(self.views, 'admit_request', side_effect=Overloaded('requests', 7)):
+            response = self._post(self.views.translate, '/api/translate/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '7')
+        self.assertEqual((response.data['reason'], response.data['retry_after']), ('requests', 7))
+
+    def test_ticket_released_when_inference_fails(self):
+        from unittest import mock
+        with mock.patch.object(self.views, 'translate_text', side_effect=RuntimeError('model crashed')):
+            response = self._post(self.views.translate, '/api/translate/')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.controller.get_stats()['depth'], 0)
+
+    def test_ticket_released_when_stream_closed(self):
+        from unittest import mock
+
+        def events(*args):
+            yield 'token', {'text': 'Bon'}
+            yield 'token', {'text': 'jour'}
+            yield 'done', {}
+
+        with mock.patch.object(self.views, 'stream_translate_text', events):
+            response = self._post(self.views.translate_stream, '/api/translate/stream/')
+        content = iter(response.streaming_content)
+        next(content)
+        self.assertEqual(self.controller.get_stats()['depth'], 1)
+        # Client went away mid-stream
+        response.close()
+        self.assertEqual(self.controller.get_stats()['depth'], 0)
+
+
+def _echo(value):
+    return value
+
+
+def _crash(value):
+    if value == 'crash':
+        os._exit(1)
+    time.sleep(value)
+    return value
+
+
+class InferencePoolTests(SimpleTestCase):
+    """Forked workers: dead ones are replaced, and only one front process reads the results."""
+
+    def setUp(self):
+        from .workers import InferencePool
+        self.pool = InferencePool(workers=1, threads_per_worker=1, concurrency=2, timeout=30)
+        self.pool.register(_echo)
+        self.pool.register(_crash)
+        self.pool.start()
+        self.addCleanup(self.pool.stop)
+
+    def test_dead_worker_fails_its_calls_and_is_replaced(self):
+        from .workers import WorkerPoolError
+        self.assertEqual(self.pool.call('_echo', 'before'), 'before')
+        pid = self.pool.shards[0].workers[0].pid
+        outcome = {}
+
+        def slow_call():
+            try:
+                outcome['value'] = self.pool.call('_crash', 5)
+            except WorkerPoolError as e:
+                outcome['error'] = str(e)
+        thread = threading.Thread(target=slow_call)
+        thread.start()
+        started = time.monotonic()
+        with self.assertRaisesRegex(WorkerPoolError, 'died'):
+            self.pool.call('_crash', 'crash')
+        thread.join()
+        # Both calls the worker held fail right away, not after the 30s timeout
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertIn('died', outcome.get('error', ''))
+        self.assertEqual(self.pool.call('_echo', 'after'), 'after')
+        self.assertNotEqual(self.pool.shards[0].workers[0].pid, pid)
+        stats = self.pool.get_stats()
+        self.assertEqual((stats['restarts'], stats['in_flight'], stats['size']), (1, 0, 1))
+
+    def test_second_front_process_refused(self):
+        import multiprocessing
+        self.assertEqual(self.pool.call('_echo', 'front'), 'front')
+        ctx = multiprocessing.get_context('fork')
+        outcome = ctx.Queue()
+
+        def other_front():
+            try:
+                outcome.put(self.pool.call('_echo', 'stolen?'))
+            except Exception as e:
+                outcome.put(type(e).__name__)
+        process = ctx.Process(target=other_front)
+        process.start()
+        process.join(10)
+        self.assertEqual(outcome.get(timeout=5), 'WorkerPoolError')
+        # This process still gets its own results
+        self.assertEqual(self.pool.call('_echo', 'mine'), 'mine')
+
+    def test_router_readiness_waits_for_the_shard_of_each_required_route(self):
+        from unittest import mock
+        from . import services
+        from .workers import InferencePool, parse_shards
+        import multiprocessing
+        go = multiprocessing.get_context('fork').Event()
+        pool = InferencePool(shards=parse_shards('enfr=en-fr:1;rest=*:1'), threads_per_worker=1, timeout=30)
+
+        def warm_up(routes, report):
+            if '*' not in routes:
+                go.wait(30)
+            report({'status': 'ready', 'ready': True, 'models': {}, 'failed': []})
+        pool.register_warm_up(warm_up)
+        pool.start()
+        self.addCleanup(pool.stop)
+        plan = dict(services._warmup_plan, required=['summarization', 'en-fr'])
+        with mock.patch.object(services, '_worker_pool', pool), \
+                mock.patch.object(services, '_warmup_plan', plan), \
+                mock.patch.object(services, '_translation_route_keys', return_value=('opus-en-fr', 'en-fr')):
+            # Forked is not ready: en-fr waits for its shard, summarization goes to '*'
+            deadline = time.monotonic() + 10
+            while pool.warmup_states()['rest/0']['state'] is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+            readiness = services.get_readiness()
+            self.assertFalse(readiness['ready'])
+            self.assertEqual(readiness['status'], 'starting')
+            self.assertEqual(readiness['routes'], {'summarization': {'shard': 'rest', 'status': 'ready'},
+                                                   'en-fr': {'shard': 'enfr', 'status': 'starting'}})
+            go.set()
+            while not readiness['ready'] and time.monotonic() < deadline:
+                time.sleep(0.05)
+                readiness = services.get_readiness()
+        self.assertTrue(readiness['ready'])
+        self.assertEqual(readiness['routes']['en-fr'], {'shard': 'enfr', 'status': 'ready'})
@@ -0,0 +1,63 @@
+"""
+Latency/quality tiers for generation.
+
+A request picks a tier ('fast', 'balanced' or 'quality'); each tier maps to
+the decoding settings used for it: a beam count (1 = greedy) plus optional
+early-exit limits, a wall-clock cap on one generate call (``max_time``) and
+a cap on the generated tokens (``max_tokens``). Both limits are off by
+default: generate returns whatever it has when one hits, so a translation
+can end mid-sentence with nothing to say so.
+"""
+
+TIERS = ('fast', 'balanced', 'quality')
+
+# Defaults of AI_GENERATION_TIERS: greedy, a small beam, the full beam
+DEFAULT_TIERS = {
+    'fast': {'num_beams': 1, 'max_time': 0, 'max_tokens': 0},
+    'balanced': {'num_beams': 2, 'max_time': 0, 'max_tokens': 0},
+    'quality': {'num_beams': 4, 'max_time': 0, 'max_tokens': 0},
+}
+
+
+class GenerationTiers:
+    """Decoding settings per tier, with the default used when a request names none."""
+
+    def __init__(self, tiers=None, default='quality'):
+        self.tiers = {name: dict(DEFAULT_TIERS[name], **(tiers or {}).get(name, {})) for name in TIERS}
+        if default not in self.tiers:
+            raise ValueError(f"Unknown default tier: {default}")
+        self.default = default
+
+    def resolve(self, tier):
+        """Name of the tier to run for a requested one (None or '' means the default)."""
+        if not tier:
+            return self.default
+        tier = str(tier).lower()
+        if tier not in self.tiers:
+            raise ValueError(f"Unknown tier '{tier}' (use {', '.join(TIERS)})")
+        return tier
+
+    def generation(self, tier, base=None):
+        """
+        Generate kwargs for ``tier`` on top of ``base``.
+
+        Beam-only options in ``base`` (early_stopping, length_penalty) are
+        dropped when the tier decodes greedily.
+        """
+        settings = self.tiers[tier]
+        generation = dict(base or {}, do_sample=False, num_beams=max(1, int(settings['num_beams'])))
+        if generation['num_beams'] == 1:
+            generation.pop('early_stopping', None)
+            generation.pop('length_penalty', None)
+        if settings['max_time']:
+            generation['max_time'] = float(settings['max_time'])
+        return generation
+
+    def limit_tokens(self, tier, max_tokens):
+        """``max_tokens`` capped by the tier's token limit, if it has one."""
+        cap = int(self.tiers[tier]['max_tokens'] or 0)
+        return min(max_tokens, cap) if cap else max_tokens
+
+    def describe(self):
+        """Tier settings and the default, for the API documentation."""
+        return {'default': self.default, 'tiers': {name: dict(settings) for name, settings in self.tiers.items()}}
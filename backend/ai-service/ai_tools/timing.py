@@ -0,0 +1,179 @@
+"""
+Per-request stage timings and opt-in profiling.
+
+A view opens a ``collect()`` block around one translate/summarize call; the
+stages the call goes through (language detection, model load, micro-batcher
+queue wait, tokenization, generate, decoding, post-processing) add their
+time to it and the view reports them as a Server-Timing header. The
+collectors live in a thread-local, so the micro-batcher, the map-stage
+threads and the inference workers carry them over explicitly: work done on
+behalf of several requests (a batched generate) counts fully for each of
+them, and parallel work is summed, so stages can add up to more than the
+wall time. Outside a ``collect()`` block recording is a no-op.
+
+``profile()`` runs a call under cProfile or the torch profiler and returns
+its top entries.
+"""
+import cProfile
+import io
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+# Stages in the order they run, for a stable header
+STAGES = ('detect', 'load', 'queue', 'tokenize', 'generate', 'decode', 'postprocess', 'worker')
+
+_local = threading.local()
+
+
+class StageTimings:
+    """Seconds and call counts per stage of one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.profiling = False
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds, count=1):
+        with self._lock:
+            total, calls = self._stages.get(stage, (0.0, 0))
+            self._stages[stage] = (total + seconds, calls + count)
+
+    def merge(self, stages):
+        """Add the ``as_dict()`` of timings taken elsewhere (e.g. in an inference worker)."""
+        for stage, (seconds, calls) in stages.items():
+            self.add(stage, seconds, calls)
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self._stages)
+
+    def server_timing(self):
+        """Server-Timing header value: every recorded stage plus the total, in milliseconds."""
+        stages = self.as_dict()
+        order = [stage for stage in STAGES if stage in stages] + sorted(set(stages) - set(STAGES))
+        entries = [f"{stage};dur={stages[stage][0] * 1000:.1f}" for stage in order]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ', '.join(entries)
+
+
+def current():
+    """Collectors active in this thread (empty outside a ``collect()`` block)."""
+    return getattr(_local, 'timings', ())
+
+
+@contextmanager
+def activate(timings):
+    """Make ``timings`` (a sequence of StageTimings, possibly empty) this thread's collectors."""
+    previous = current()
+    _local.timings = tuple(timings)
+    try:
+        yield
+    finally:
+        _local.timings = previous
+
+
+@contextmanager
+def collect():
+    """Record the stages run in the block into a new StageTimings, which is yielded."""
+    timings = StageTimings()
+    with activate((timings,)):
+        yield timings
+
+
+def record(stage, seconds):
+    for timings in current():
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def stage(name):
+    """Add the time spent in the block to ``name`` of the active collectors."""
+    timings = current()
+    if not timings:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        for collector in timings:
+            collector.add(name, elapsed)
+
+
+def bind(fn):
+    """Wrap ``fn`` to record into this thread's collectors when it runs in another thread."""
+    timings = current()
+    if not timings:
+        return fn
+
+    def bound(*args, **kwargs):
+        with activate(timings):
+            return fn(*args, **kwargs)
+    return bound
+
+
+def profiling():
+    """Whether the request running in this thread is being profiled."""
+    return any(timings.profiling for timings in current())
+
+
+def _cprofile_top(profiler, limit):
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    entries = []
+    for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+        entries.append({
+            'function': f"{function} ({filename}:{line})",
+            'calls': calls,
+            'self_ms': round(total * 1000, 2),
+            'cumulative_ms': round(cumulative * 1000, 2),
+        })
+    entries.sort(key=lambda entry: entry['cumulative_ms'], reverse=True)
+    return entries[:limit]
+
+
+def _torch_top(profiler, limit):
+    events = sorted(profiler.key_averages(), key=lambda event: event.self_cpu_time_total, reverse=True)
+    return [
+        {
+            'op': event.key,
+            'calls': event.count,
+            'self_ms': round(event.self_cpu_time_total / 1000, 2),
+            'total_ms': round(event.cpu_time_total / 1000, 2),
+        }
+        for event in events[:limit]
+    ]
+
+
+def profile(fn, kind='cprofile', limit=25):
+    """
+    Run ``fn()`` under cProfile or the torch profiler ('torch').
+
+    Returns (result, {'profiler': kind, 'top': [...]}). cProfile only sees
+    this thread, so callers should keep the work in it (see ``profiling()``).
+    """
+    timings = current()
+    if not timings:
+        with collect():
+            return profile(fn, kind, limit)
+    for collector in timings:
+        collector.profiling = True
+    try:
+        if kind == 'torch':
+            from torch.profiler import ProfilerActivity, profile as torch_profile
+            with torch_profile(activities=[ProfilerActivity.CPU]) as profiler:
+                result = fn()
+            return result, {'profiler': 'torch', 'top': _torch_top(profiler, limit)}
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = fn()
+        finally:
+            profiler.disable()
+        return result, {'profiler': 'cprofile', 'top': _cprofile_top(profiler, limit)}
+    finally:
+        for collector in timings:
+            collector.profiling = False
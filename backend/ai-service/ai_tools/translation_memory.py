@@ -0,0 +1,124 @@
+"""
+Sentence-level translation memory.
+
+Stores the translation of every sentence per (model, source, target), so
+documents that share boilerplate (headers, policy paragraphs, schedule lines)
+only send their new sentences to the model. Entries live in an in-memory LRU
+and, optionally, in a SQLite table that survives restarts and is shared by
+all workers.
+"""
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+from . import metrics
+from .cache import SQLiteStore, normalize_text
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_segment(segment):
+    """Canonical form of a sentence for lookup (NFC, single spaces, no outer whitespace)."""
+    return _WHITESPACE_RE.sub(' ', normalize_text(segment)).strip()
+
+
+class TranslationMemory:
+    """Per-sentence translation store with an LRU memory tier and optional SQLite tier."""
+
+    def __init__(self, max_entries=50000, sqlite_path=None, ttl_seconds=180 * 86400, enabled=True):
+        self.enabled = enabled
+        self.max_entries = max(1, int(max_entries))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'lookups': 0,
+            'hits': 0,
+            'stores': 0,
+            'tokens_saved': 0,
+        }
+        self._disk = None
+        if enabled and sqlite_path:
+            try:
+                self._disk = SQLiteStore(sqlite_path, 'ai_translation_memory', ttl_seconds)
+                logger.info(f"Translation memory persistent tier: {sqlite_path}")
+            except Exception as e:
+                logger.warning(f"⚠️ Translation memory persistent tier disabled: {e}")
+
+    @staticmethod
+    def _key(model_name, source_lang, target_lang, segment):
+        payload = f"{model_name}\x1f{source_lang}\x1f{target_lang}\x1f{normalize_segment(segment)}"
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def lookup(self, model_name, source_lang, target_lang, segments):
+        """Return {segment: translation} for the segments already in memory."""
+        keys = {self._key(model_name, source_lang, target_lang, segment): segment for segment in segments}
+        found = {}
+        with self._lock:
+            for key, segment in keys.items():
+                translation = self._entries.get(key)
+                if translation is not None:
+                    self._entries.move_to_end(key)
+                    found[segment] = translation
+
+        missing = [key for key, segment in keys.items() if segment not in found]
+        if missing and self._disk is not None:
+            try:
+                from_disk = self._disk.get_many(missing)
+            except Exception as e:
+                logger.warning(f"Translation memory read failed: {e}")
+                from_disk = {}
+            with self._lock:
+                for key, translation in from_disk.items():
+                    found[keys[key]] = translation
+                    self._set_memory(key, translation)
+        return found
+
+    def store(self, model_name, source_lang, target_lang, translations):
+        """Remember {segment: translation} pairs."""
+        items = {
+            self._key(model_name, source_lang, target_lang, segment): translation
+            for segment, translation in translations.items()
+        }
+        with self._lock:
+            for key, translation in items.items():
+                self._set_memory(key, translation)
+            self._counters['stores'] += len(items)
+        if self._disk is not None:
+            try:
+                self._disk.set_many(items)
+            except Exception as e:
+                logger.warning(f"Translation memory write failed: {e}")
+
+    def record(self, lookups, hits, tokens_saved):
+        """Add one request's lookup results to the running counters."""
+        with self._lock:
+            self._counters['lookups'] += lookups
+            self._counters['hits'] += hits
+            self._counters['tokens_saved'] += tokens_saved
+        metrics.count_cache_lookup('translation_memory', 'hit', hits)
+        metrics.count_cache_lookup('translation_memory', 'miss', lookups - hits)
+
+    def _set_memory(self, key, translation):
+        """Memory-tier insert with LRU eviction; caller holds the lock."""
+        self._entries[key] = translation
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_stats(self):
+        """Lookup/hit counters, model tokens saved and memory-tier size."""
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        return dict(
+            counters,
+            enabled=self.enabled,
+            entries=size,
+            max_entries=self.max_entries,
+            persistent=self._disk.path if self._disk is not None else None,
+            hit_ratio=round(counters['hits'] / counters['lookups'], 4) if counters['lookups'] else None,
+        )
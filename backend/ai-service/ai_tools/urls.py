@@ -6,8 +6,18 @@ from . import views
 
 urlpatterns = [
     path('translate/', views.translate, name='translate'),
+    path('translate/batch/', views.translate_batch_view, name='translate_batch'),
+    path('translate/stream/', views.translate_stream, name='translate_stream'),
     path('summarize/', views.summarize, name='summarize'),
+    path('summarize/batch/', views.summarize_batch_view, name='summarize_batch'),
+    path('summarize/stream/', views.summarize_stream, name='summarize_stream'),
+    path('jobs/', views.jobs, name='jobs'),
+    path('jobs/<uuid:job_id>/', views.job_status, name='job_status'),
+    path('jobs/<uuid:job_id>/result/', views.job_result, name='job_result'),
     path('languages/', views.supported_languages, name='supported_languages'),
+    path('stats/', views.stats, name='stats'),
+    path('models/', views.models, name='models'),
     path('health/', views.health, name='health'),
+    path('ready/', views.ready, name='ready'),
 ]
 
@@ -1,19 +1,102 @@
 """
 Views for AI tools (translation and summarization).
 """
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import ParseError
-from .services import translate_text, summarize_text, get_supported_languages
+from .services import (
+    translate_text, summarize_text, translate_batch, summarize_batch,
+    get_supported_languages, get_batching_stats, get_cache_stats, get_translation_memory_stats,
+    get_model_stats, get_streaming_stats, stream_translate_text, stream_summarize_text,
+    get_generation_tiers, get_admission_stats, estimate_cost, admit_request, get_worker_pool_stats,
+    get_readiness, language_error,
+)
+from .admission import Overloaded
+from . import timing
+from .jobs import JobQueueFull, get_job, get_job_stats, submit_job
+from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
 
+def _admit(kind, cost):
+    """
+    Admit an inference request: (ticket, None), or (None, 503 response with
+    Retry-After) when the inference queue is full.
+    """
+    try:
+        return admit_request(kind, cost), None
+    except Overloaded as e:
+        logger.warning(f"⚠️ Shed {kind} request (cost {cost}): {e}")
+        response = Response(
+            {
+                'error': 'AI service is busy. Please retry later.',
+                'reason': e.reason,
+                'retry_after': e.retry_after,
+            },
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        response['Retry-After'] = str(e.retry_after)
+        return None, response
+
+
+def _profile_mode(request):
+    """
+    Profiler requested with ?profile= ('cprofile' or 'torch'), else None.
+    Raises PermissionError unless the caller is staff or sends AI_PROFILE_TOKEN.
+    """
+    requested = request.query_params.get('profile', '').lower()
+    if requested in ('', '0', 'false'):
+        return None
+    token = getattr(settings, 'AI_PROFILE_TOKEN', '')
+    user = getattr(request, 'user', None)
+    allowed = bool(user and user.is_staff) or (
+        bool(token) and constant_time_compare(request.headers.get('X-Profile-Token', ''), token)
+    )
+    if not allowed:
+        raise PermissionError('Profiling requires an admin session or a valid X-Profile-Token header')
+    return 'torch' if requested == 'torch' else 'cprofile'
+
+
+def _forbidden(error):
+    return Response({'error': str(error)}, status=status.HTTP_403_FORBIDDEN)
+
+
+def _run_timed(call, profile_mode=None):
+    """
+    Run ``call()`` recording stage timings, under the profiler when
+    ``profile_mode`` is set. Returns (result, timings, profile or None).
+    """
+    with timing.collect() as timings:
+        if profile_mode:
+            result, profile = timing.profile(call, profile_mode)
+            return result, timings, profile
+        return call(), timings, None
+
+
+def _with_timing(response, timings, profile=None):
+    """Add the Server-Timing header (and the profile, if one was taken) to a response."""
+    response['Server-Timing'] = timings.server_timing()
+    if profile is not None:
+        response.data['profile'] = profile
+    return response
+
+
+def _release_when_done(results, ticket):
+    """Yield from a streamed response's results, releasing its admission ticket when the stream ends or is closed."""
+    try:
+        yield from results
+    finally:
+        ticket.release()
+
+
 @api_view(['POST', 'GET'])  # Updated: Now supports both GET and POST methods
 def translate(request):
     """
@@ -25,10 +108,13 @@ def translate(request):
     Expected POST data:
     {
         "text": "Text to translate",
-        "target_language": "en"  // optional, default: 'en'
+        "target_language": "en",  // optional, default: 'en'
+        "mode": "auto",  // optional: 'text', 'document' or 'auto'
+        "tier": "fast"  // optional: 'fast', 'balanced' or 'quality'
     }
     """
     if request.method == 'GET':
+        tiers = get_generation_tiers()
         return Response({
             'endpoint': '/api/translate/',
             'method': 'POST',
@@ -43,13 +129,25 @@ def translate(request):
                     'type': 'string',
                     'required': False,
                     'default': 'en',
-                    'description': 'Target language code (en, fr, ar, es, de, it, pt, etc.)'
+                    'description': 'Target language code (en, fr, ar, es, de, it, pt; see /api/languages/)'
                 },
                 'source_language': {
                     'type': 'string',
                     'required': False,
                     'default': 'auto',
-                    'description': 'Source language code or "auto" for auto-detection (en, fr, ar, es, de, it, pt, etc.)'
+                    'description': 'Source language code or "auto" for auto-detection (en, fr, ar, es, de, it, pt; see /api/languages/)'
+                },
+                'mode': {
+                    'type': 'string',
+                    'required': False,
+                    'default': 'auto',
+                    'description': '"text" (single pass), "document" (sentence-chunked, for long documents) or "auto" (document mode for long texts)'
+                },
+                'tier': {
+                    'type': 'string',
+                    'required': False,
+                    'default': tiers['default'],
+                    'description': '"fast" (greedy), "balanced" (small beam) or "quality" (full beam search); the response reports the tier that ran'
                 }
             },
             'example': {
@@ -64,6 +162,7 @@ def translate(request):
                     'original_text': 'Hello'
                 }
             },
+            'diagnostics': 'Responses carry a Server-Timing header with per-stage times (detect, load, queue, tokenize, generate, decode, postprocess). Staff or holders of the profile token can add ?profile=1 (cProfile) or ?profile=torch to get the top profile entries of the request in "profile".',
             'note': 'Using Transformers models (Helsinki-NLP) for translation. All processing is done locally - no external APIs required.'
         })
     
@@ -73,6 +172,8 @@ def translate(request):
             text = request.data.get('text', '')
             target_language = request.data.get('target_language', 'en')
             source_language = request.data.get('source_language', 'auto')  # Allow source language specification
+            mode = request.data.get('mode', 'auto')
+            tier = request.data.get('tier')
         except (ParseError, json.JSONDecodeError, ValueError) as parse_error:
             error_msg = str(parse_error)
             return Response(
@@ -93,8 +194,27 @@ def translate(request):
                 {'error': 'Text is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        unsupported = language_error(target_language, source_language)
+        if unsupported:
+            return Response(
+                {'error': unsupported, 'suggestion': 'See /api/languages/ for the supported language codes.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            profile_mode = _profile_mode(request)
+        except PermissionError as e:
+            return _forbidden(e)
         
-        result = translate_text(text, target_language, source_language)
+        ticket, overloaded = _admit('translate', estimate_cost(text, tier))
+        if overloaded is not None:
+            return overloaded
+        try:
+            result, timings, profile = _run_timed(
+                lambda: translate_text(text, target_language, source_language, mode, tier), profile_mode
+            )
+        finally:
+            ticket.release()
 
         if result.get('error'):
             # Return error with CORS headers (Response will handle this)
@@ -103,7 +223,7 @@ def translate(request):
             
             # If it's a 502 (service down), return 503 Service Unavailable
             if '502' in error_msg or 'bad gateway' in error_msg.lower() or 'unavailable' in error_msg.lower():
-                return Response(
+                return _with_timing(Response(
                     {
                         'error': 'Translation service is currently unavailable. The API provider is down.',
                         'details': error_msg,
@@ -113,11 +233,11 @@ def translate(request):
                         'suggestion': result.get('suggestion', 'Please check server logs for model loading errors. Ensure transformers models are properly installed.')
                     },
                     status=status.HTTP_503_SERVICE_UNAVAILABLE
-                )
+                ), timings, profile)
             
             # If it's a timeout, suggest fallback
             if 'timeout' in error_msg.lower() or 'timed out' in error_msg.lower():
-                return Response(
+                return _with_timing(Response(
                     {
                         'error': 'Translation service is currently slow. Please try again in a moment.',
                         'details': error_msg,
@@ -127,15 +247,15 @@ def translate(request):
                         'suggestion': 'The transformer model is taking longer than expected. This may be due to model loading or processing time. Please retry.'
                     },
                     status=status.HTTP_408_REQUEST_TIMEOUT
-                )
+                ), timings, profile)
             
-            return Response(
+            return _with_timing(Response(
                 result,
                 status=status.HTTP_400_BAD_REQUEST
-            )
+            ), timings, profile)
         
         logger.info(f"✅ Translation successful: {result.get('source_language')} → {target_language}")
-        return Response(result, status=status.HTTP_200_OK)
+        return _with_timing(Response(result, status=status.HTTP_200_OK), timings, profile)
     
     except Exception as e:
         logger.error(f"❌ Translation error: {e}")
@@ -156,10 +276,13 @@ def summarize(request):
     Expected POST data:
     {
         "text": "Text to summarize",
-        "max_length": 150  // optional, default: 150
+        "max_length": 150,  // optional, default: 150
+        "mode": "auto",  // optional: 'text', 'map_reduce' or 'auto'
+        "tier": "fast"  // optional: 'fast', 'balanced' or 'quality'
     }
     """
     if request.method == 'GET':
+        tiers = get_generation_tiers()
         return Response({
             'endpoint': '/api/summarize/',
             'method': 'POST',
@@ -175,6 +298,18 @@ def summarize(request):
                     'required': False,
                     'default': 150,
                     'description': 'Maximum length of summary in characters'
+                },
+                'mode': {
+                    'type': 'string',
+                    'required': False,
+                    'default': 'auto',
+                    'description': '"text" (single pass), "map_reduce" (hierarchical, for long documents) or "auto" (map-reduce when the text exceeds one model window)'
+                },
+                'tier': {
+                    'type': 'string',
+                    'required': False,
+                    'default': tiers['default'],
+                    'description': '"fast" (greedy), "balanced" (small beam) or "quality" (full beam search); the response reports the tier that ran'
                 }
             },
             'example': {
@@ -189,6 +324,7 @@ def summarize(request):
                     'method': 'simple_extraction'
                 }
             },
+            'diagnostics': 'Responses carry a Server-Timing header with per-stage times (detect, load, queue, tokenize, generate, decode, postprocess). Staff or holders of the profile token can add ?profile=1 (cProfile) or ?profile=torch to get the top profile entries of the request in "profile".',
             'note': 'Using Transformers models (BART) for summarization. All processing is done locally - no external APIs required.'
         })
     
@@ -197,6 +333,8 @@ def summarize(request):
         try:
             text = request.data.get('text', '')
             max_length = request.data.get('max_length', 150)
+            mode = request.data.get('mode', 'auto')
+            tier = request.data.get('tier')
         except (ParseError, json.JSONDecodeError, ValueError) as parse_error:
             error_msg = str(parse_error)
             return Response(
@@ -224,16 +362,27 @@ def summarize(request):
         except (ValueError, TypeError):
             max_length = 150
         
-        result = summarize_text(text, max_length)
+        try:
+            profile_mode = _profile_mode(request)
+        except PermissionError as e:
+            return _forbidden(e)
+        
+        ticket, overloaded = _admit('summarize', estimate_cost(text, tier))
+        if overloaded is not None:
+            return overloaded
+        try:
+            result, timings, profile = _run_timed(lambda: summarize_text(text, max_length, mode, tier), profile_mode)
+        finally:
+            ticket.release()
         
         if result.get('error') and not result.get('summary'):
-            return Response(
+            return _with_timing(Response(
                 result,
                 status=status.HTTP_400_BAD_REQUEST
-            )
+            ), timings, profile)
         
         logger.info(f"✅ Summarization successful: {result.get('original_length')} → {result.get('summary_length')} chars")
-        return Response(result, status=status.HTTP_200_OK)
+        return _with_timing(Response(result, status=status.HTTP_200_OK), timings, profile)
     
     except Exception as e:
         logger.error(f"❌ Summarization error: {e}")
@@ -243,6 +392,371 @@ def summarize(request):
         )
 
 
+def _parse_batch_items(request):
+    """Return (items, error_response) for a batch request body of the form {"items": [...]}."""
+    try:
+        items = request.data.get('items') if isinstance(request.data, dict) else request.data
+    except (ParseError, json.JSONDecodeError, ValueError) as parse_error:
+        return None, Response(
+            {
+                'error': 'Invalid JSON format in request body',
+                'details': str(parse_error),
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if not isinstance(items, list) or not items:
+        return None, Response(
+            {'error': 'items must be a non-empty list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    max_items = getattr(settings, 'AI_BATCH_MAX_ITEMS', 500)
+    if len(items) > max_items:
+        return None, Response(
+            {'error': f'Too many items: {len(items)} (maximum {max_items})'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return items, None
+
+
+def _ndjson_response(results):
+    """Stream result dicts as newline-delimited JSON."""
+    return StreamingHttpResponse(
+        (json.dumps(result, ensure_ascii=False) + '\n' for result in results),
+        content_type='application/x-ndjson'
+    )
+
+
+@api_view(['POST'])
+def translate_batch_view(request):
+    """
+    Translate many texts in one request.
+    
+    Expected POST data:
+    {
+        "items": [
+            {"text": "Hello", "target_language": "fr", "source_language": "en", "tier": "fast"},
+            ...
+        ]
+    }
+    
+    Responds with NDJSON, one line per item in completion order. Each line
+    is the single-item translate payload plus the item's "index".
+    """
+    items, error_response = _parse_batch_items(request)
+    if error_response is not None:
+        return error_response
+    
+    cost = sum(estimate_cost(item.get('text'), item.get('tier')) for item in items if isinstance(item, dict))
+    ticket, overloaded = _admit('translate_batch', cost)
+    if overloaded is not None:
+        return overloaded
+    
+    logger.info(f"Batch translation of {len(items)} items")
+    return _ndjson_response(_release_when_done(translate_batch(items), ticket))
+
+
+@api_view(['POST'])
+def summarize_batch_view(request):
+    """
+    Summarize many texts in one request.
+    
+    Expected POST data:
+    {
+        "items": [
+            {"text": "Long text...", "max_length": 150, "tier": "quality"},
+            ...
+        ]
+    }
+    
+    Responds with NDJSON, one line per item in completion order. Each line
+    is the single-item summarize payload plus the item's "index".
+    """
+    items, error_response = _parse_batch_items(request)
+    if error_response is not None:
+        return error_response
+    
+    cost = sum(estimate_cost(item.get('text'), item.get('tier')) for item in items if isinstance(item, dict))
+    ticket, overloaded = _admit('summarize_batch', cost)
+    if overloaded is not None:
+        return overloaded
+    
+    logger.info(f"Batch summarization of {len(items)} items")
+    return _ndjson_response(_release_when_done(summarize_batch(items), ticket))
+
+
+class _EventStreamRenderer(BaseRenderer):
+    """Accepts EventSource requests (Accept: text/event-stream); error responses are still JSON."""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def _sse_response(events):
+    """Stream (event, data) pairs as server-sent events with JSON data."""
+    def render():
+        for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    response = StreamingHttpResponse(render(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _stream_params(request):
+    """Request parameters of a streaming endpoint: JSON body for POST, query string for GET (EventSource)."""
+    return request.data if request.method == 'POST' else request.query_params
+
+
+@api_view(['POST', 'GET'])
+@renderer_classes([JSONRenderer, _EventStreamRenderer])
+def translate_stream(request):
+    """
+    Translate text, streaming the output as server-sent events.
+    
+    Takes the same parameters as /api/translate/ (JSON body for POST, query
+    string for GET so browsers can use EventSource). Sends "token" events
+    with {"text": ...} pieces as they are generated, then one "done" event
+    whose data is the /api/translate/ payload plus "timings" (time to first
+    token and total time), or an "error" event. Decoding is greedy.
+    """
+    try:
+        params = _stream_params(request)
+        text = params.get('text', '')
+        target_language = params.get('target_language', 'en')
+        source_language = params.get('source_language', 'auto')
+        mode = params.get('mode', 'auto')
+    except (ParseError, json.JSONDecodeError, ValueError) as parse_error:
+        return Response(
+            {'error': 'Invalid JSON format in request body', 'details': str(parse_error)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if not text:
+        return Response(
+            {'error': 'Text is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    unsupported = language_error(target_language, source_language)
+    if unsupported:
+        return Response(
+            {'error': unsupported, 'suggestion': 'See /api/languages/ for the supported language codes.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    ticket, overloaded = _admit('translate_stream', estimate_cost(text, streaming=True))
+    if overloaded is not None:
+        return overloaded
+    return _sse_response(_release_when_done(stream_translate_text(text, target_language, source_language, mode), ticket))
+
+
+@api_view(['POST', 'GET'])
+@renderer_classes([JSONRenderer, _EventStreamRenderer])
+def summarize_stream(request):
+    """
+    Summarize text, streaming the output as server-sent events.
+    
+    Takes the same parameters as /api/summarize/ (JSON body for POST, query
+    string for GET so browsers can use EventSource). Sends "token" events
+    with {"text": ...} pieces as they are generated, then one "done" event
+    whose data is the /api/summarize/ payload plus "timings" (time to first
+    token and total time), or an "error" event. Decoding is greedy.
+    """
+    try:
+        params = _stream_params(request)
+        text = params.get('text', '')
+        max_length = params.get('max_length', 150)
+        mode = params.get('mode', 'auto')
+    except (ParseError, json.JSONDecodeError, ValueError) as parse_error:
+        return Response(
+            {'error': 'Invalid JSON format in request body', 'details': str(parse_error)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if not text:
+        return Response(
+            {'error': 'Text is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        max_length = int(max_length)
+    except (ValueError, TypeError):
+        max_length = 150
+    
+    ticket, overloaded = _admit('summarize_stream', estimate_cost(text, streaming=True))
+    if overloaded is not None:
+        return overloaded
+    return _sse_response(_release_when_done(stream_summarize_text(text, max_length, mode), ticket))
+
+
+def _job_payload(request, job):
+    """Status, progress and links of a job."""
+    fraction = None
+    if job.status == job.STATUS_DONE:
+        fraction = 1.0
+    elif job.progress_total:
+        fraction = round(job.progress_done / job.progress_total, 4)
+    payload = {
+        'id': str(job.id),
+        'kind': job.kind,
+        'status': job.status,
+        'progress': {
+            'done': job.progress_done,
+            'total': job.progress_total,
+            'unit': job.progress_unit or None,
+            'fraction': fraction,
+        },
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+        'expires_at': job.expires_at,
+        'status_url': request.build_absolute_uri(f'/api/jobs/{job.id}/'),
+        'result_url': request.build_absolute_uri(f'/api/jobs/{job.id}/result/'),
+    }
+    if job.error:
+        payload['error'] = job.error
+    return payload
+
+
+@api_view(['POST', 'GET'])
+def jobs(request):
+    """
+    Submit a translation or summarization job that runs in the background.
+    
+    GET: Returns API documentation
+    POST: Queues a job and responds 202 with its id and status URL
+    
+    Expected POST data:
+    {
+        "kind": "translate",  // or "summarize"
+        "text": "Long document...",
+        // plus the options of /api/translate/ or /api/summarize/
+        "target_language": "fr"
+    }
+    """
+    if request.method == 'GET':
+        return Response({
+            'endpoint': '/api/jobs/',
+            'method': 'POST',
+            'description': 'Run a translation or summarization in the background; poll /api/jobs/<id>/ for status and progress and fetch /api/jobs/<id>/result/ when it is done',
+            'parameters': {
+                'kind': {
+                    'type': 'string',
+                    'required': True,
+                    'description': '"translate" or "summarize"'
+                },
+                'text': {
+                    'type': 'string',
+                    'required': True,
+                    'description': 'Text to translate or summarize'
+                },
+                'options': {
+                    'description': 'target_language, source_language, mode and tier for translate; max_length, mode and tier for summarize'
+                }
+            },
+            'stats': get_job_stats(),
+        })
+    
+    try:
+        kind = request.data.get('kind')
+        text = request.data.get('text', '')
+        if kind == 'translate':
+            option_names = ('target_language', 'source_language', 'mode', 'tier')
+        elif kind == 'summarize':
+            option_names = ('max_length', 'mode', 'tier')
+        else:
+            option_names = None
+    except (ParseError, json.JSONDecodeError, ValueError) as parse_error:
+        return Response(
+            {'error': 'Invalid JSON format in request body', 'details': str(parse_error)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if option_names is None:
+        return Response(
+            {'error': 'kind must be "translate" or "summarize"'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not text or not isinstance(text, str):
+        return Response(
+            {'error': 'Text is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    params = {'text': text}
+    params.update({name: request.data[name] for name in option_names if request.data.get(name) is not None})
+    if 'max_length' in params:
+        try:
+            params['max_length'] = int(params['max_length'])
+        except (ValueError, TypeError):
+            params['max_length'] = 150
+    tier = params.get('tier')
+    if tier and str(tier).lower() not in get_generation_tiers()['tiers']:
+        return Response(
+            {'error': f"Unknown tier '{tier}'"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if kind == 'translate':
+        unsupported = language_error(params.get('target_language'), params.get('source_language'))
+        if unsupported:
+            return Response(
+                {'error': unsupported, 'suggestion': 'See /api/languages/ for the supported language codes.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    try:
+        job = submit_job(kind, params)
+    except JobQueueFull as e:
+        logger.warning(f"⚠️ Rejected {kind} job: {e}")
+        response = Response(
+            {'error': 'Too many jobs are waiting. Please retry later.', 'retry_after': e.retry_after},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        response['Retry-After'] = str(e.retry_after)
+        return response
+    except Exception as e:
+        logger.error(f"❌ Could not queue {kind} job: {e}")
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    response = Response(_job_payload(request, job), status=status.HTTP_202_ACCEPTED)
+    response['Location'] = f'/api/jobs/{job.id}/'
+    return response
+
+
+@api_view(['GET'])
+def job_status(request, job_id):
+    """Status and progress of a job."""
+    job = get_job(job_id)
+    if job is None:
+        return Response({'error': 'Job not found or expired'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(_job_payload(request, job), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def job_result(request, job_id):
+    """
+    Result of a job: the /api/translate/ or /api/summarize/ payload once it is
+    done, 202 with its status while it is queued or running.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return Response({'error': 'Job not found or expired'}, status=status.HTTP_404_NOT_FOUND)
+    if job.status in (job.STATUS_QUEUED, job.STATUS_RUNNING):
+        return Response(_job_payload(request, job), status=status.HTTP_202_ACCEPTED)
+    if job.status == job.STATUS_FAILED:
+        return Response(dict(job.result or {}, error=job.error), status=status.HTTP_400_BAD_REQUEST)
+    return Response(job.result, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 def supported_languages(request):
     """Get list of supported languages for translation."""
@@ -257,8 +771,61 @@ def supported_languages(request):
         )
 
 
+@api_view(['GET'])
+def stats(request):
+    """Inference statistics (micro-batching latency per batch size, cache and translation memory counters, streaming latency, inference queue, background jobs, inference workers)."""
+    try:
+        return Response({
+            'admission': get_admission_stats(),
+            'jobs': get_job_stats(),
+            'workers': get_worker_pool_stats(),
+            'batching': get_batching_stats(),
+            'cache': get_cache_stats(),
+            'translation_memory': get_translation_memory_stats(),
+            'streaming': get_streaming_stats(),
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        logger.error(f"❌ Error getting stats: {e}")
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+def models(request):
+    """Loaded models with resident sizes, the memory budget and recent load/evict events."""
+    try:
+        return Response(get_model_stats(), status=status.HTTP_200_OK)
+    except Exception as e:
+        logger.error(f"❌ Error getting model registry: {e}")
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 @api_view(['GET'])
 def health(request):
-    """Health check endpoint."""
+    """Health check endpoint (liveness: the process answers, models may still be loading)."""
     return Response({'status': 'ok', 'service': 'ai-service'}, status=status.HTTP_200_OK)
 
+
+@api_view(['GET'])
+def ready(request):
+    """
+    Readiness check: 200 once the required startup models are loaded and warm, else 503
+    with the state of each model, so orchestrators only route traffic to warm instances.
+    Failed models are listed in "failed" and retried after their retry delay.
+    """
+    try:
+        readiness = get_readiness()
+    except Exception as e:
+        logger.error(f"❌ Error checking readiness: {e}")
+        return Response({'status': 'error', 'ready': False, 'error': str(e)},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return Response(
+        dict(readiness, service='ai-service'),
+        status=status.HTTP_200_OK if readiness['ready'] else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
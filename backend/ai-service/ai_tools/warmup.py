@@ -0,0 +1,217 @@
+"""
+Startup warmup from a manifest, and the per-model warm state behind /api/ready/.
+
+The "warmup" section of the model manifest (model_manifest.json, see
+AI_WARMUP_MANIFEST) lists the models to load before an instance takes
+traffic and dummy inferences to run on them, so the first real requests
+don't pay for the allocations and kernel selection of the first generate
+calls:
+
+    "warmup": {
+        "summarization": true,
+        "translation_pairs": ["en-fr"],
+        "inferences": [
+            {"task": "translation", "pair": "en-fr", "text": "...", "tier": "fast"},
+            {"task": "summarization", "text": "..."}
+        ],
+        "required": ["summarization", "en-fr"]
+    }
+
+Each model goes pending → loading → warming → warm, or failed. An instance
+is ready once the models of its required routes (by default the
+summarization model and the translation pairs) are warm; other models that
+failed are listed but don't hold it back. Failed models are warmed up again
+once their retry delay has passed.
+"""
+import json
+import logging
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+LOADING = 'loading'
+WARMING = 'warming'
+WARM = 'warm'
+FAILED = 'failed'
+
+
+def load_plan(path, pairs=None, default_pairs=('en-fr',)):
+    """
+    The warmup section of the manifest at ``path``, with defaults filled in.
+
+    ``pairs`` replaces its translation pairs. Without a manifest (or a warmup
+    section) the summarization model and ``default_pairs`` are loaded and no
+    dummy inferences run. Pairs that aren't 'src-tgt' are dropped. Without a
+    "required" list every route of the plan is required.
+    """
+    section = {}
+    if path:
+        try:
+            with open(path, encoding='utf-8') as f:
+                section = json.load(f).get('warmup') or {}
+        except FileNotFoundError:
+            logger.info(f"No warmup manifest at {path}, using the default warmup")
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable warmup manifest {path}: {e}")
+    valid_pairs = []
+    for pair in pairs or section.get('translation_pairs', default_pairs):
+        if re.fullmatch(r'[a-z]{2,3}-[a-z]{2,3}', pair):
+            valid_pairs.append(pair)
+        else:
+            logger.warning(f"⚠️ Ignoring warmup translation pair {pair!r} (expected 'src-tgt')")
+    summarization = bool(section.get('summarization', True))
+    required = section.get('required')
+    if required is None:
+        required = (['summarization'] if summarization else []) + valid_pairs
+    return {
+        'summarization': summarization,
+        'translation_pairs': valid_pairs,
+        'inferences': list(section.get('inferences', [])),
+        'required': list(required),
+    }
+
+
+class Warmup:
+    """
+    Runs the warmup steps of one process once, tracks the warm state of their
+    models and warms failed ones up again after ``retry_seconds``.
+    ``on_change(describe())`` is called when the run or a retry finishes.
+    """
+
+    def __init__(self, retry_seconds=600, on_change=None):
+        self.retry_seconds = retry_seconds
+        self.on_change = on_change
+        self._models = {}
+        self._steps = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._retry_thread = None
+        self.started = None
+        self.finished = None
+
+    def _update(self, model, **fields):
+        with self._lock:
+            self._models[model].update(fields)
+
+    def run(self, steps):
+        """
+        Load and warm up models one after the other.
+
+        ``steps`` is a list of (model, task, routes, required, load, inferences):
+        ``load()`` loads the model, each of ``inferences`` runs one dummy
+        inference on it, and ``required`` says whether readiness waits for it.
+        A model that fails is marked failed and the next one is warmed up.
+        """
+        with self._lock:
+            if self.started is not None:
+                return
+            self.started = time.time()
+            for model, task, routes, required, load, inferences in steps:
+                self._models[model] = {
+                    'task': task, 'routes': list(routes), 'required': bool(required), 'state': PENDING,
+                    'inferences': len(inferences), 'attempts': 0,
+                }
+                self._steps[model] = (load, inferences)
+        logger.info(f"🔥 Warming up {len(steps)} models...")
+        for model, *_ in steps:
+            self._warm(model)
+        self.finished = time.time()
+        failed = self.describe()['failed']
+        if failed:
+            logger.warning(f"⚠️ Warmup finished in {self.finished - self.started:.1f}s, failed: {', '.join(failed)}")
+        else:
+            logger.info(f"✅ AI models warmed up in {self.finished - self.started:.1f}s")
+        self._changed()
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change(self.describe())
+
+    def _warm(self, model):
+        load, inferences = self._steps[model]
+        with self._lock:
+            entry = self._models[model]
+            entry.pop('error', None)
+            entry.pop('retry_at', None)
+            entry['attempts'] += 1
+        try:
+            self._update(model, state=LOADING)
+            started = time.perf_counter()
+            load()
+            self._update(model, state=WARMING, load_seconds=round(time.perf_counter() - started, 2))
+            started = time.perf_counter()
+            for infer in inferences:
+                infer()
+            self._update(model, state=WARM, warm_seconds=round(time.perf_counter() - started, 2))
+            return True
+        except Exception as e:
+            self._update(model, state=FAILED, error=str(e), retry_at=time.time() + self.retry_seconds)
+            logger.warning(f"⚠️ Warmup of {model} failed: {e}")
+            return False
+
+    def retry_failed(self):
+        """
+        Warm up the failed models whose retry delay has passed again, on a
+        background thread; returns whether a retry started.
+        """
+        now = time.time()
+        with self._lock:
+            if self.finished is None or (self._retry_thread is not None and self._retry_thread.is_alive()):
+                return False
+            due = [model for model, entry in self._models.items()
+                   if entry['state'] == FAILED and entry['retry_at'] <= now]
+            if not due:
+                return False
+            for model in due:
+                self._models[model]['state'] = PENDING
+            self._retry_thread = threading.Thread(target=self._retry, args=(due,), name='ai-warmup-retry', daemon=True)
+        self._retry_thread.start()
+        return True
+
+    def _retry(self, models):
+        logger.info(f"🔥 Retrying warmup of {', '.join(models)}")
+        for model in models:
+            if self._warm(model):
+                logger.info(f"✅ {model} warmed up on retry")
+        self._changed()
+
+    def start(self, steps):
+        """Run the steps on a background thread (once per process); the server answers meanwhile."""
+        with self._lock:
+            if self._thread is not None or self.started is not None:
+                return
+            self._thread = threading.Thread(target=self.run, args=(steps(),) if callable(steps) else (steps,),
+                                            name='ai-warmup', daemon=True)
+        self._thread.start()
+
+    def describe(self):
+        """
+        {'status', 'ready', 'models', 'failed'}: status is 'idle' (not started),
+        'warming', 'ready' (every required model is warm) or 'failed' (a required
+        model failed and waits for its retry); 'failed' lists the failed models.
+        """
+        now = time.time()
+        with self._lock:
+            models = {model: dict(entry) for model, entry in self._models.items()}
+            started, finished = self.started, self.finished
+        for entry in models.values():
+            retry_at = entry.pop('retry_at', None)
+            if retry_at is not None:
+                entry['retry_in_seconds'] = round(max(0.0, retry_at - now))
+        required = {entry['state'] for entry in models.values() if entry['required']}
+        if started is None:
+            status = 'idle'
+        elif required <= {WARM} and finished is not None:
+            status = 'ready'
+        elif FAILED in required and finished is not None:
+            status = 'failed'
+        else:
+            status = 'warming'
+        failed = sorted(model for model, entry in models.items() if entry['state'] == FAILED)
+        result = {'status': status, 'ready': status == 'ready', 'models': models, 'failed': failed}
+        if started is not None:
+            result['seconds'] = round((finished or time.time()) - started, 1)
+        return result
@@ -0,0 +1,472 @@
+"""
+Multi-process inference pool.
+
+The front process loads the models, then forks worker processes that share
+the weights copy-on-write. ``gc.freeze()`` right before forking moves every
+existing object out of the garbage collector's generations, so collections
+in the workers don't write to (and copy) the pages holding them. Each worker
+pins its torch thread count, can be bound to its own CPUs, and serves calls
+from its own IPC queue on a few handler threads, so its micro-batcher can
+still group concurrent requests. Each call goes to the worker of its shard
+with the fewest calls in flight.
+
+Workers are grouped in shards. The default is one shard of identical workers
+serving everything. In router mode (a shard layout such as
+"summary=summarization:1;enfr=en-fr,fr-en:2;rest=*:1") each shard owns the
+models its routes name: calls are dispatched by model name or language pair
+('*' takes the rest), and shard workers load their own models after forking,
+so per-process memory is bounded and loads or evictions in one shard don't
+disturb the others. Every worker runs the warmup's dummy inferences itself,
+after forking, and reports its warm state back (see warmup_states()).
+
+The pool must be started before the front process starts any threads
+(warmup, micro-batcher): a forked child only gets the forking thread, and a
+lock held by another thread at fork time would stay locked in the child.
+
+Each worker has its own task queue and result pipe: a process killed while
+holding a queue's lock (OOM kill, crash in native code) would otherwise
+wedge every other worker of the queue. Only the worker holds the write end
+of its result pipe, so its death shows up at once as end of file there: the
+front process fails the worker's calls straight away and forks a new worker
+in its place, the one fork made while threads run. Only one front process
+may read the results: with gunicorn --preload the pool needs --workers 1
+(gunicorn.conf.py refuses more), and a second front process gets
+WorkerPoolError.
+"""
+import gc
+import itertools
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from . import timing
+
+logger = logging.getLogger(__name__)
+
+# Set in forked workers, which always run calls themselves
+_in_worker = False
+# Longest wait of the result reader between checks that the pool isn't stopping
+_READ_TIMEOUT_SECONDS = 1.0
+
+
+class WorkerPoolError(Exception):
+    """A call failed in, or never came back from, an inference worker."""
+
+
+class Shard:
+    """Workers that serve the calls whose routes (model names, 'src-tgt' pairs, '*') match."""
+
+    def __init__(self, name, routes, processes=1):
+        self.name = name
+        self.routes = list(routes)
+        self.processes = max(1, int(processes))
+        self.workers = []
+
+    def serves(self, keys):
+        return any(key in self.routes for key in keys)
+
+
+def parse_shards(spec):
+    """
+    Shards from a layout like "summary=summarization:1;enfr=en-fr,fr-en:2;rest=*:1".
+
+    Each ';'-separated entry is [name=]route,route[:processes]; without a name
+    the routes name the shard.
+    """
+    shards = []
+    for entry in (spec or '').split(';'):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, entry = entry.rpartition('=')
+        routes, _, processes = entry.partition(':')
+        routes = [route.strip() for route in routes.split(',') if route.strip()]
+        if not routes:
+            raise ValueError(f"Shard without routes in AI_WORKER_SHARDS: {entry!r}")
+        shards.append(Shard(name.strip() or ','.join(routes), routes, int(processes or 1)))
+    return shards
+
+
+class _Worker:
+    """One worker process of a shard, with its task queue, its result pipe and the calls sent to it."""
+
+    def __init__(self, name, process, tasks, results, cpus):
+        self.name = name
+        self.process = process
+        self.tasks = tasks
+        self.results = results
+        self.cpus = cpus
+        self.in_flight = set()
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def _memory_mb(pid):
+    """(RSS, PSS) of a process in MB; PSS splits shared pages between the processes mapping them."""
+    rss = pss = None
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    rss = round(int(line.split()[1]) / 1024, 1)
+        with open(f'/proc/{pid}/smaps_rollup') as rollup:
+            for line in rollup:
+                if line.startswith('Pss:'):
+                    pss = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return rss, pss
+
+
+def cpu_sets(workers, affinity):
+    """CPUs per worker: 'auto' splits the CPUs this process may use evenly; anything else leaves affinity alone."""
+    if affinity != 'auto' or not hasattr(os, 'sched_getaffinity'):
+        return [None] * workers
+    cpus = sorted(os.sched_getaffinity(0))
+    per_worker = max(1, len(cpus) // workers)
+    return [
+        {cpus[j % len(cpus)] for j in range(index * per_worker, (index + 1) * per_worker)}
+        for index in range(workers)
+    ]
+
+
+def _worker_main(name, handlers, tasks, results, threads, cpus, concurrency, warm_up, routes):
+    """Entry point of a forked worker: serve calls from ``tasks`` until the front process exits."""
+    global _in_worker
+    _in_worker = True
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    import torch
+    if threads:
+        torch.set_num_threads(threads)
+    pid = os.getpid()
+    logger.info(f"Inference worker {name} started (pid {pid}, {torch.get_num_threads()} torch threads"
+                f"{', cpus ' + ','.join(map(str, sorted(cpus))) if cpus else ''})")
+    # Handler threads and warmup reports share the result pipe
+    send_lock = threading.Lock()
+
+    def send(*message):
+        with send_lock:
+            results.send(message)
+
+    if warm_up is not None:
+        try:
+            warm_up(routes, lambda state: send('warmup', state))
+        except Exception as e:
+            logger.warning(f"⚠️ Warmup of inference worker {name} failed, models load on demand: {e}")
+            send('warmup', {'status': 'failed', 'ready': False, 'models': {}, 'failed': [], 'error': str(e)})
+
+    def serve():
+        while True:
+            call_id, name, args = tasks.get()
+            started = time.perf_counter()
+            # Stage timings go back with the result, for the caller's Server-Timing
+            with timing.collect() as timings:
+                try:
+                    value, error = handlers[name](*args), None
+                except Exception as e:
+                    value, error = None, f"{type(e).__name__}: {e}"
+            send('result', call_id, pid, value, error, time.perf_counter() - started, timings.as_dict())
+
+    for _ in range(concurrency - 1):
+        threading.Thread(target=serve, name='ai-worker-handler', daemon=True).start()
+    serve()
+
+
+class InferencePool:
+    """Forked inference workers fed through IPC queues; ``call`` runs a registered handler in one of them."""
+
+    def __init__(self, workers=0, threads_per_worker=0, affinity='', concurrency=2, timeout=120, shards=None):
+        # Router mode when a shard layout is given, else one shard of identical workers
+        self.router = bool(shards)
+        self.shards = list(shards) if shards else ([Shard('all', ['*'], workers)] if workers > 0 else [])
+        self.workers = sum(shard.processes for shard in self.shards)
+        self.threads_per_worker = threads_per_worker
+        self.affinity = affinity
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self._handlers = {}
+        self._warm_up = None
+        self._processes = []
+        self._ctx = None
+        self._threads = None
+        # Pid of the front process that reads the results, shared with the processes forked later
+        self._owner = None
+        self._stopping = False
+        self._futures = {}
+        self._calls = {}
+        # Latest warmup state reported by each worker, by worker name
+        self._warmup_states = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        # The front process that reads results (gunicorn --preload forks it after the pool)
+        self._reader_pid = None
+        self._handled = defaultdict(int)
+        self._busy_seconds = defaultdict(float)
+        self._shard_calls = defaultdict(int)
+        self._errors = 0
+        self._timeouts = 0
+        self._restarts = 0
+
+    def register(self, handler):
+        """Make ``handler`` callable in the workers by its name; register before start()."""
+        self._handlers[handler.__name__] = handler
+        return handler
+
+    def register_warm_up(self, warm_up):
+        """
+        Each worker calls ``warm_up(routes, report)`` after forking, e.g. to
+        load its shard's models in router mode; ``report(state)`` sends its
+        warm state to the front process (see warmup_states()).
+        """
+        self._warm_up = warm_up
+        return warm_up
+
+    def shard_for(self, keys):
+        """The shard serving a call with route ``keys`` (model name, pair), else the '*' shard, else None."""
+        for shard in self.shards:
+            if shard.serves(keys):
+                return shard
+        for shard in self.shards:
+            if '*' in shard.routes:
+                return shard
+        return None
+
+    @property
+    def active(self):
+        """Whether calls from this process go to the workers (never inside a worker)."""
+        return bool(self._processes) and not _in_worker
+
+    def start(self):
+        """Fork the workers. Call once the models are loaded and before any other thread starts."""
+        if not self.workers or self._processes:
+            return
+        self._ctx = multiprocessing.get_context('fork')
+        self._owner = self._ctx.Value('i', 0)
+        self._threads = self.threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        cpus = iter(cpu_sets(self.workers, self.affinity))
+        gc.collect()
+        gc.freeze()
+        for shard in self.shards:
+            for index in range(shard.processes):
+                shard.workers.append(self._spawn(shard, index, next(cpus)))
+        logger.info(f"🧵 Forked {self.workers} inference workers in {len(self.shards)} shards "
+                    f"({', '.join(f'{shard.name}: {shard.processes}' for shard in self.shards)}; "
+                    f"{self._threads} torch threads and {self.concurrency} handler threads each)")
+
+    def _spawn(self, shard, index, cpus):
+        tasks = self._ctx.Queue()
+        results, sender = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(f'{shard.name}/{index}', self._handlers, tasks, sender, self._threads,
+                  cpus, self.concurrency, self._warm_up, shard.routes),
+            name=f'ai-inference-{shard.name}-{index}',
+            daemon=True,
+        )
+        process.start()
+        # Left to the worker alone (workers forked later don't inherit it either), so its exit ends the pipe
+        sender.close()
+        self._processes.append(process)
+        return _Worker(f'{shard.name}/{index}', process, tasks, results, cpus)
+
+    def stop(self):
+        """Terminate the workers without replacing them."""
+        self._stopping = True
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+
+    def _ensure_reader(self):
+        """
+        Start the result reader in this process (threads don't survive a fork,
+        so check the pid). Raises WorkerPoolError when another front process
+        already reads the results.
+        """
+        pid = os.getpid()
+        with self._lock:
+            if self._reader_pid == pid:
+                return
+            with self._owner.get_lock():
+                owner = self._owner.value
+                if owner and owner != pid and _pid_alive(owner):
+                    raise WorkerPoolError(f"Inference workers already serve front process {owner}; "
+                                          f"run one front process (gunicorn --workers 1) with the worker pool")
+                self._owner.value = pid
+            self._reader_pid = pid
+            self._futures.clear()
+            self._calls.clear()
+            self._warmup_states.clear()
+            for shard in self.shards:
+                for worker in shard.workers:
+                    worker.in_flight.clear()
+        threading.Thread(target=self._read_results, name='ai-worker-results', daemon=True).start()
+
+    def _read_results(self):
+        while not self._stopping:
+            workers = {worker.results: (shard, index, worker)
+                       for shard in self.shards for index, worker in enumerate(shard.workers)}
+            for results in multiprocessing.connection.wait(list(workers), timeout=_READ_TIMEOUT_SECONDS):
+                try:
+                    kind, *message = results.recv()
+                except (EOFError, OSError):
+                    if not self._stopping:
+                        self._replace(*workers[results])
+                    continue
+                if kind == 'warmup':
+                    with self._lock:
+                        self._warmup_states[workers[results][2].name] = message[0]
+                else:
+                    self._deliver(*message)
+
+    def _deliver(self, call_id, pid, value, error, seconds, stages):
+        with self._lock:
+            future = self._futures.pop(call_id, None)
+            worker = self._calls.pop(call_id, None)
+            if worker is not None:
+                worker.in_flight.discard(call_id)
+            self._handled[pid] += 1
+            self._busy_seconds[pid] += seconds
+            if error:
+                self._errors += 1
+        if future is None:
+            return  # the caller already timed out
+        future.stages = stages
+        if error:
+            future.set_exception(WorkerPoolError(error))
+        else:
+            future.set_result(value)
+
+    def _replace(self, shard, index, worker):
+        """Fail the calls of a worker that died and fork a new one in its place."""
+        with self._lock:
+            lost = [self._futures.pop(call_id, None) for call_id in worker.in_flight]
+            for call_id in worker.in_flight:
+                self._calls.pop(call_id, None)
+            # Swapped under the lock so call() never picks the dead worker again
+            shard.workers[index] = self._spawn(shard, index, worker.cpus)
+            self._processes.remove(worker.process)
+            # The new worker warms up again
+            self._warmup_states.pop(worker.name, None)
+            self._restarts += 1
+        worker.results.close()
+        worker.tasks.cancel_join_thread()
+        worker.tasks.close()
+        logger.error(f"❌ Inference worker {worker.name} (pid {worker.pid}) died, failing its "
+                     f"{len(lost)} calls; forked pid {shard.workers[index].pid} in its place")
+        for future in lost:
+            if future is not None:
+                future.set_exception(WorkerPoolError(f"Inference worker {worker.name} died"))
+
+    def call(self, name, *args, shard=None):
+        """
+        Run handler ``name`` with ``args`` in a worker of ``shard`` (default:
+        the first shard) and return its result; raises WorkerPoolError.
+        """
+        shard = shard or self.shards[0]
+        self._ensure_reader()
+        future = Future()
+        with self._lock:
+            worker = min(shard.workers, key=lambda worker: len(worker.in_flight))
+            call_id = next(self._ids)
+            self._futures[call_id] = future
+            self._calls[call_id] = worker
+            worker.in_flight.add(call_id)
+            self._shard_calls[shard.name] += 1
+        started = time.perf_counter()
+        worker.tasks.put((call_id, name, args))
+        try:
+            value = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._futures.pop(call_id, None)
+                if self._calls.pop(call_id, None) is not None:
+                    worker.in_flight.discard(call_id)
+                self._timeouts += 1
+            raise WorkerPoolError(f"Inference worker ({shard.name}) timed out after {self.timeout}s")
+        finally:
+            timing.record('worker', time.perf_counter() - started)
+            for timings in timing.current():
+                timings.merge(getattr(future, 'stages', {}))
+        return value
+
+    def warmup_states(self):
+        """
+        {worker name: {'shard', 'pid', 'state'}} with the latest warm state
+        each worker reported (None until it does); raises WorkerPoolError
+        like call() in a second front process.
+        """
+        self._ensure_reader()
+        with self._lock:
+            return {
+                worker.name: {'shard': shard.name, 'pid': worker.pid, 'state': self._warmup_states.get(worker.name)}
+                for shard in self.shards for worker in shard.workers
+            }
+
+    def get_stats(self):
+        with self._lock:
+            in_flight = len(self._futures)
+            handled = dict(self._handled)
+            busy = dict(self._busy_seconds)
+            shard_in_flight = {shard.name: sum(len(worker.in_flight) for worker in shard.workers)
+                               for shard in self.shards}
+            shard_calls = dict(self._shard_calls)
+            errors, timeouts, restarts = self._errors, self._timeouts, self._restarts
+        workers = []
+        shards = []
+        for shard in self.shards:
+            shard_workers = []
+            for worker in list(shard.workers):
+                pid, cpus = worker.pid, worker.cpus
+                rss, pss = _memory_mb(pid)
+                shard_workers.append({
+                    'pid': pid,
+                    'shard': shard.name,
+                    'alive': rss is not None,
+                    'cpus': sorted(cpus) if cpus else None,
+                    'rss_mb': rss,
+                    'pss_mb': pss,
+                    'calls': handled.get(pid, 0),
+                    'busy_seconds': round(busy.get(pid, 0.0), 2),
+                })
+            workers.extend(shard_workers)
+            shards.append({
+                'name': shard.name,
+                'routes': shard.routes,
+                'processes': shard.processes,
+                'in_flight': shard_in_flight.get(shard.name, 0),
+                'calls': shard_calls.get(shard.name, 0),
+                'busy_seconds': round(sum(worker['busy_seconds'] for worker in shard_workers), 2),
+                'rss_mb': round(sum(worker['rss_mb'] or 0 for worker in shard_workers), 1),
+                'pss_mb': round(sum(worker['pss_mb'] or 0 for worker in shard_workers), 1),
+            })
+        rss, pss = _memory_mb(os.getpid())
+        return {
+            'mode': 'router' if self.router else 'pool',
+            'size': len(self._processes),
+            'concurrency': self.concurrency,
+            'in_flight': in_flight,
+            'errors': errors,
+            'timeouts': timeouts,
+            'restarts': restarts,
+            'front': {'pid': os.getpid(), 'rss_mb': rss, 'pss_mb': pss},
+            'shards': shards,
+            'workers': workers,
+        }
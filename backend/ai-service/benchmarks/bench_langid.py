@@ -0,0 +1,122 @@
+"""
+Accuracy and throughput of the n-gram language identifier against the old heuristic.
+
+The old heuristic (substring hits of French indicator words plus scans for
+accented and Arabic characters, defaulting to English) is reproduced here as
+``legacy_detect``. Both run on the hand-written sentences in langid_eval.json;
+the identifier is also checked on its mixed-language documents.
+
+Short texts (words, headings, URLs) are scored separately, both with the
+identifier's raw guess and with the service's policy of falling back to
+English when a short text's best guess is not clearly ahead of the second
+(``detect_confident`` with the service's default thresholds).
+
+Usage (from backend/ai-service):
+    python benchmarks/bench_langid.py [--repeat 200] [--output langid.json]
+"""
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+EVAL_PATH = Path(__file__).resolve().parent / 'langid_eval.json'
+# AI_LANGID_SHORT_MIN_MARGIN default (the other thresholds are detect_confident's defaults)
+SHORT_MIN_MARGIN = 0.2
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from ai_tools.langid import LanguageIdentifier  # noqa: E402
+
+_FRENCH_INDICATORS = [
+    'est', 'une', 'des', 'les', 'dans', 'pour', 'avec', 'sont', 'être', 'avoir',
+    'texte', 'langue', 'sonne', 'réveille', 'écoute', 'répondeur', 'message',
+    'mère', 'demande', 'inquiète', 'fille', 'disparue', 'craint', 'accident',
+    'janvier', 'matin', 'téléphone', 'enfant', 'grave', 'nouvelle'
+]
+
+
+def legacy_detect(text):
+    """The substring heuristic that services._detect_source_language used before."""
+    text_lower = text.lower()
+    french_count = sum(1 for word in _FRENCH_INDICATORS if word in text_lower)
+    has_french_chars = any(char in text for char in ['é', 'è', 'ê', 'ë', 'à', 'â', 'ç', 'ù', 'û', 'ü', 'ô', 'ö'])
+    has_arabic = any('؀' <= char <= 'ۿ' for char in text)
+    if french_count >= 2 or has_french_chars:
+        return 'fr'
+    if has_arabic:
+        return 'ar'
+    return 'en'
+
+
+def _evaluate(detect, samples, repeat):
+    correct = defaultdict(int)
+    totals = defaultdict(int)
+    for language, text in samples:
+        totals[language] += 1
+        correct[language] += detect(text) == language
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for _, text in samples:
+            detect(text)
+    elapsed = time.perf_counter() - started
+    return {
+        'accuracy': round(sum(correct.values()) / len(samples), 4),
+        'per_language': {language: round(correct[language] / totals[language], 3) for language in totals},
+        'us_per_text': round(elapsed / (repeat * len(samples)) * 1e6, 2),
+        'texts_per_s': round(repeat * len(samples) / elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark language identification.')
+    parser.add_argument('--repeat', type=int, default=200, help='timing passes over the eval set')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    data = json.loads(EVAL_PATH.read_text(encoding='utf-8'))
+    samples = [(language, text) for language, texts in data['sentences'].items() for text in texts]
+    short_samples = [(language, text) for language, texts in data['short_texts'].items() for text in texts]
+
+    started = time.perf_counter()
+    identifier = LanguageIdentifier()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    def confident(text):
+        return identifier.detect_confident(text, short_margin=SHORT_MIN_MARGIN)[0]
+
+    mixed = []
+    for document in data['mixed_documents']:
+        runs = [language for language, _ in identifier.detect_runs(document['text'])]
+        mixed.append({'expected': document['runs'], 'detected': runs, 'ok': runs == document['runs']})
+
+    report = {
+        'samples': len(samples),
+        'ngram_identifier': dict(
+            _evaluate(lambda text: identifier.detect(text)[0], samples, args.repeat),
+            load_ms=round(load_ms, 1),
+        ),
+        'legacy_heuristic': _evaluate(legacy_detect, samples, args.repeat),
+        'short_texts': {
+            'samples': len(short_samples),
+            'ngram_identifier': _evaluate(lambda text: identifier.detect(text)[0], short_samples, args.repeat),
+            'ngram_with_fallback': dict(
+                _evaluate(lambda text: confident(text) or 'en', short_samples, args.repeat),
+                fallback_rate=round(sum(confident(text) is None for _, text in short_samples) / len(short_samples), 3),
+            ),
+            'legacy_heuristic': _evaluate(legacy_detect, short_samples, args.repeat),
+        },
+        'mixed_documents': mixed,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Golden-output parity and speed of the post-processing rule engine.
+
+``legacy_fix_pronoun_references`` (kept in ai_tools/tests.py with the golden
+cases) is the sequential re.sub implementation that services used before the
+engine. Both run on hand-written cases and on seeded random combinations of
+the phrases the rules look for (all casings); any output difference is
+reported and makes the script exit non-zero.
+Timing covers short outputs and long (document-sized) outputs.
+
+Usage (from backend/ai-service):
+    python benchmarks/bench_postprocess.py [--random-cases 5000] [--output postprocess.json]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from ai_tools.postprocess import PostProcessor  # noqa: E402
+from ai_tools.tests import GOLDEN_CASES, _random_case, legacy_fix_pronoun_references  # noqa: E402
+
+
+def _time(function, cases, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for source, output in cases:
+            function(output, source)
+    return (time.perf_counter() - started) / (repeat * len(cases)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check post-processing parity and measure speed.')
+    parser.add_argument('--random-cases', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    processor = PostProcessor()
+
+    def engine(output, source):
+        return processor.apply('fr', 'en', output, source)
+
+    rng = random.Random(args.seed)
+    cases = GOLDEN_CASES + [_random_case(rng) for _ in range(args.random_cases)]
+    mismatches = []
+    for source, output in cases:
+        expected = legacy_fix_pronoun_references(output, source)
+        actual = engine(output, source)
+        if actual != expected:
+            mismatches.append({'source': source, 'output': output, 'expected': expected, 'actual': actual})
+
+    # A document-sized output: many sentences, several of which trigger rules
+    long_source = "Sa mère craint qu'il soit arrivé quelque chose à sa fille. " * 50
+    long_output = ' '.join(output for _, output in GOLDEN_CASES) * 40
+    long_cases = [(long_source, long_output)]
+    short_cases = GOLDEN_CASES[:-1]
+
+    report = {
+        'cases': len(cases),
+        'mismatches': len(mismatches),
+        'first_mismatches': mismatches[:5],
+        'short_outputs_us': {
+            'legacy': round(_time(legacy_fix_pronoun_references, short_cases, 2000), 2),
+            'engine': round(_time(engine, short_cases, 2000), 2),
+        },
+        'long_output_chars': len(long_output),
+        'long_output_us': {
+            'legacy': round(_time(legacy_fix_pronoun_references, long_cases, 200), 1),
+            'engine': round(_time(engine, long_cases, 200), 1),
+        },
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    else:
+        print(output)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
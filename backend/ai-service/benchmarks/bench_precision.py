@@ -0,0 +1,200 @@
+"""
+Compare CPU precision modes (fp32, int8, bf16) and the ONNX Runtime backend
+for the translation and summarization models.
+
+Each precision runs in a fresh process so resident memory is measured in
+isolation. For every mode the script reports load time, per-item latency
+percentiles, batched throughput, RSS after loading and after inference, and
+how closely the outputs agree with fp32 on the fixed corpus in corpus.json.
+
+Usage (from backend/ai-service):
+    python benchmarks/bench_precision.py
+    python benchmarks/bench_precision.py --translation-model Helsinki-NLP/opus-mt-en-fr \\
+        --summarization-model sshleifer/distilbart-cnn-12-6 --precisions fp32,int8,onnx --output precision.json
+"""
+import argparse
+import difflib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CORPUS_PATH = Path(__file__).resolve().parent / 'corpus.json'
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+
+def _rss_mb():
+    """Current resident set size of this process in MB."""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return round(int(line.split()[1]) / 1024, 1)
+    return None
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _run_model(kind, model_name, precision, texts, batch_size, cache_dir, max_new_tokens, num_beams):
+    """Load one model in one precision and time it on ``texts``."""
+    import torch
+    from transformers import AutoTokenizer
+    from ai_tools.pipelines import load_onnx_seq2seq_model, load_seq2seq_model
+    from ai_tools.registry import estimate_model_bytes
+
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=False)
+    if precision == 'onnx':
+        model, effective = load_onnx_seq2seq_model(model_name, cache_dir), 'onnx'
+    else:
+        model, effective = load_seq2seq_model(model_name, precision, cache_dir)
+    load_seconds = time.perf_counter() - started
+    rss_loaded = _rss_mb()
+
+    generation = dict(max_new_tokens=max_new_tokens, num_beams=num_beams, do_sample=False)
+    prefix = ''
+    if kind == 'translation':
+        task_params = getattr(model.config, 'task_specific_params', None) or {}
+        prefix = task_params.get('translation_en_to_fr', {}).get('prefix', '')
+
+    def generate(batch):
+        inputs = tokenizer([prefix + text for text in batch], return_tensors='pt',
+                           padding=True, truncation=True, max_length=512)
+        with torch.no_grad():
+            output_ids = model.generate(**inputs, **generation)
+        return tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+
+    generate(texts[:1])  # warm up kernels and allocator
+
+    latencies = []
+    outputs = []
+    for text in texts:
+        started = time.perf_counter()
+        outputs.extend(generate([text]))
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        generate(texts[start:start + batch_size])
+    batch_seconds = time.perf_counter() - started
+
+    return {
+        'model': model_name,
+        'requested_precision': precision,
+        'precision': effective,
+        'load_seconds': round(load_seconds, 3),
+        'model_mb': round(estimate_model_bytes(model) / 2**20, 1),
+        'rss_mb': {'before_load': rss_before, 'after_load': rss_loaded, 'after_inference': _rss_mb()},
+        'latency_ms': {
+            'p50': round(_percentile(latencies, 50), 1),
+            'p90': round(_percentile(latencies, 90), 1),
+            'p99': round(_percentile(latencies, 99), 1),
+            'mean': round(sum(latencies) / len(latencies), 1),
+        },
+        'throughput_items_per_s': round(len(texts) / batch_seconds, 2),
+        'outputs': outputs,
+    }
+
+
+def _worker(queue, kind, model_name, precision, texts, batch_size, cache_dir, max_new_tokens, num_beams, threads):
+    import torch
+    if threads:
+        torch.set_num_threads(threads)
+    try:
+        queue.put(_run_model(kind, model_name, precision, texts, batch_size, cache_dir, max_new_tokens, num_beams))
+    except Exception as e:
+        queue.put({'model': model_name, 'requested_precision': precision, 'error': str(e)})
+
+
+def _agreement(reference, outputs):
+    """Exact-match rate and mean word-level similarity against the fp32 outputs."""
+    exact = sum(1 for ref, out in zip(reference, outputs) if ref.strip() == out.strip())
+    similarity = [
+        difflib.SequenceMatcher(None, ref.split(), out.split()).ratio()
+        for ref, out in zip(reference, outputs)
+    ]
+    return {
+        'exact_match': round(exact / len(reference), 3),
+        'mean_similarity': round(sum(similarity) / len(similarity), 3),
+    }
+
+
+def benchmark(kind, model_name, precisions, texts, args):
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    for precision in precisions:
+        queue = ctx.Queue()
+        process = ctx.Process(target=_worker, args=(
+            queue, kind, model_name, precision, texts, args.batch_size,
+            args.cache_dir, args.max_new_tokens, args.num_beams, args.threads,
+        ))
+        process.start()
+        result = queue.get()
+        process.join()
+        results.append(result)
+        print(f"{kind} {precision}: " + json.dumps({k: v for k, v in result.items() if k != 'outputs'}),
+              file=sys.stderr)
+
+    reference = next((r['outputs'] for r in results if r.get('precision') == 'fp32' and 'outputs' in r), None)
+    for result in results:
+        if reference is not None and 'outputs' in result:
+            result['agreement_with_fp32'] = _agreement(reference, result['outputs'])
+        if not args.keep_outputs:
+            result.pop('outputs', None)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--translation-model',
+                        default=os.getenv('AI_TRANSLATION_MODEL') or 'Helsinki-NLP/opus-mt-en-fr')
+    parser.add_argument('--summarization-model',
+                        default=os.getenv('AI_SUMMARIZATION_MODEL') or 'sshleifer/distilbart-cnn-12-6')
+    parser.add_argument('--precisions', default='fp32,int8,bf16',
+                        help="comma-separated fp32, int8, bf16 or onnx (ONNX Runtime backend)")
+    parser.add_argument('--skip', choices=['translation', 'summarization'], action='append', default=[])
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--max-new-tokens', type=int, default=64)
+    parser.add_argument('--num-beams', type=int, default=1, help='4 matches the production summarizer')
+    parser.add_argument('--threads', type=int, default=0, help='torch intra-op threads (0 = torch default)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='int8 conversion cache and ONNX export dir (default: a temp dir)')
+    parser.add_argument('--keep-outputs', action='store_true', help='include generated texts in the report')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args()
+    args.cache_dir = args.cache_dir or tempfile.mkdtemp(prefix='precision-bench-')
+
+    corpus = json.loads(CORPUS_PATH.read_text(encoding='utf-8'))
+    precisions = [p.strip() for p in args.precisions.split(',') if p.strip()]
+    if 'fp32' in precisions:
+        precisions.remove('fp32')
+    precisions.insert(0, 'fp32')  # reference for agreement
+
+    report = {'cpu_count': os.cpu_count(), 'corpus': str(CORPUS_PATH), 'results': {}}
+    if 'translation' not in args.skip:
+        # Only the English → French side; a single checkpoint covers one direction
+        texts = [item['text'] for item in corpus['translation'] if item['source'] == 'en']
+        report['results']['translation'] = benchmark('translation', args.translation_model, precisions, texts, args)
+    if 'summarization' not in args.skip:
+        report['results']['summarization'] = benchmark(
+            'summarization', args.summarization_model, precisions, corpus['summarization'], args)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
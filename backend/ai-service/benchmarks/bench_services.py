@@ -0,0 +1,358 @@
+"""
+Offline benchmark suite for ai_tools.services.
+
+By default the suite builds tiny randomly initialized Marian and BART
+checkpoints (see tiny_models.py), so it needs no network and finishes in a
+few minutes on a laptop CPU; their absolute numbers only mean something
+relative to an earlier run on the same machine, which is what the suite is
+for. Pass --translation-model/--summarization-model to measure real model
+directories (or hub names) instead.
+
+Every stage runs in a fresh process with the result cache, translation
+memory, admission control and startup warmup turned off:
+
+- cold: import time of the service, load time of each model and the first
+  request, with resident memory after each step
+- warm: single-request latency percentiles per input length (long inputs go
+  through document translation and map-reduce summarization), then
+  throughput with concurrent client threads
+- overhead: language detection and post-processing time per call, which
+  every translation pays on top of the model
+
+Each stage reports its peak RSS. The JSON report has a flat ``summary`` of
+the headline metrics; --compare prints how they moved against an earlier
+report.
+
+Usage (from backend/ai-service):
+    python benchmarks/bench_services.py --output services.json
+    python benchmarks/bench_services.py --compare services.json
+    python benchmarks/bench_services.py --translation-model Helsinki-NLP/opus-mt-en-fr \\
+        --summarization-model sshleifer/distilbart-cnn-12-6 --output services-real.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BENCH_DIR = Path(__file__).resolve().parent
+CORPUS_PATH = BENCH_DIR / 'corpus.json'
+LANGID_EVAL_PATH = BENCH_DIR / 'langid_eval.json'
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+if str(BENCH_DIR) not in sys.path:
+    sys.path.insert(0, str(BENCH_DIR))
+
+# Input lengths (characters) of the latency stage
+TRANSLATE_LENGTHS = [64, 256, 1024, 4096]
+SUMMARIZE_LENGTHS = [256, 1024, 4096, 16384]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _percentiles(values, digits=1):
+    return {f'p{pct}': round(_percentile(values, pct), digits) for pct in (50, 90, 99)}
+
+
+def _memory_mb():
+    """(current RSS, peak RSS) of this process in MB."""
+    rss = peak = None
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    rss = round(int(line.split()[1]) / 1024, 1)
+                elif line.startswith('VmHWM:'):
+                    peak = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        import resource
+        peak = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return rss, peak
+
+
+def _text_of_length(sentences, chars, salt):
+    """Sentences from the corpus joined up to ``chars`` characters; ``salt`` makes every text unique."""
+    parts, length, index = [], 0, salt
+    while length < chars:
+        sentence = sentences[index % len(sentences)]
+        parts.append(sentence)
+        length += len(sentence) + 1
+        index += 1
+    return f"{' '.join(parts)[:chars].rstrip()} ({salt})"
+
+
+def _setup(models):
+    """Configure and start Django in a stage process; returns the seconds it took to import the services."""
+    os.environ.update({
+        'DJANGO_SETTINGS_MODULE': 'ai_service.settings',
+        'AI_TRANSLATION_MODEL': models['translation'],
+        'AI_SUMMARIZATION_MODEL': models['summarization'],
+        'AI_WARMUP_ENABLED': 'false',
+        'AI_WORKER_POOL_SIZE': '0',
+        'AI_WORKER_SHARDS': '',
+        # Every request must reach a model
+        'AI_CACHE_ENABLED': 'false',
+        'AI_TM_ENABLED': 'false',
+        'AI_ADMISSION_ENABLED': 'false',
+    })
+    if models.get('offline'):
+        os.environ.update({'HF_HUB_OFFLINE': '1', 'TRANSFORMERS_OFFLINE': '1'})
+    started = time.perf_counter()
+    import django
+    django.setup()
+    from ai_tools import services  # noqa: F401
+    return time.perf_counter() - started
+
+
+def _stage_cold(args, models, corpus):
+    import_seconds = _setup(models)
+    from ai_tools import services
+
+    report = {'import_seconds': round(import_seconds, 3), 'rss_mb_after_import': _memory_mb()[0]}
+    steps = [
+        ('translation_load', lambda: services._get_translation_pipeline('en', 'fr')),
+        ('translation_first_request', lambda: services.translate_text(corpus['translate'][0], 'fr', 'en', 'text', args.tier)),
+        ('summarization_load', services._get_summarization_pipeline),
+        ('summarization_first_request', lambda: services.summarize_text(corpus['summarize'][0], 150, 'text', args.tier)),
+    ]
+    for name, step in steps:
+        started = time.perf_counter()
+        step()
+        report[f'{name}_seconds'] = round(time.perf_counter() - started, 3)
+        report[f'rss_mb_after_{name}'] = _memory_mb()[0]
+    return report
+
+
+def _call(services, kind, text, tier):
+    started = time.perf_counter()
+    if kind == 'translate':
+        result = services.translate_text(text, 'fr', 'en', 'auto', tier)
+    else:
+        result = services.summarize_text(text, 150, 'auto', tier)
+    return (time.perf_counter() - started) * 1000, result
+
+
+def _stage_warm(args, models, corpus):
+    _setup(models)
+    from ai_tools import services
+
+    services.warm_up_models()
+    latency = {}
+    for kind, lengths in (('translate', TRANSLATE_LENGTHS), ('summarize', SUMMARIZE_LENGTHS)):
+        latency[kind] = {}
+        for chars in lengths:
+            _call(services, kind, _text_of_length(corpus[kind], chars, -1), args.tier)
+            samples, modes = [], set()
+            for salt in range(args.iterations):
+                ms, result = _call(services, kind, _text_of_length(corpus[kind], chars, salt), args.tier)
+                samples.append(ms)
+                modes.add(result.get('mode', 'error' if result.get('error') else 'text'))
+            latency[kind][str(chars)] = dict(_percentiles(samples), mean=round(sum(samples) / len(samples), 1),
+                                             modes=sorted(modes))
+
+    throughput = {}
+    for kind in ('translate', 'summarize'):
+        texts = [_text_of_length(corpus[kind], args.throughput_chars, salt) for salt in range(args.requests)]
+        with ThreadPoolExecutor(args.concurrency) as executor:
+            started = time.perf_counter()
+            samples = list(executor.map(lambda text: _call(services, kind, text, args.tier), texts))
+            elapsed = time.perf_counter() - started
+        throughput[kind] = {
+            'requests': len(samples),
+            'clients': args.concurrency,
+            'input_chars': args.throughput_chars,
+            'per_second': round(len(samples) / elapsed, 2),
+            'errors': sum(1 for _, result in samples if result.get('error')),
+            'latency_ms': _percentiles([ms for ms, _ in samples]),
+        }
+    return {'latency_ms': latency, 'throughput': throughput, 'batching': services.get_batching_stats()}
+
+
+def _time_calls(fn, inputs, repeat):
+    """Per-call microseconds of ``fn`` over ``inputs``, ``repeat`` passes."""
+    samples = []
+    for _ in range(repeat):
+        for item in inputs:
+            started = time.perf_counter()
+            fn(*item)
+            samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+
+def _stage_overhead(args, models, corpus):
+    _setup(models)
+    from ai_tools import services
+    from ai_tools.langid import get_identifier
+
+    evaluation = json.loads(LANGID_EVAL_PATH.read_text(encoding='utf-8'))
+    sentences = [(text,) for texts in evaluation['sentences'].values() for text in texts]
+    documents = [(_text_of_length(corpus['translate'], 4096, salt),) for salt in range(5)]
+    identifier = get_identifier()
+    identifier.detect('warm up')
+
+    # (source, target, output, original): outputs that trigger the French rules, then plain ones
+    pairs = [
+        ('fr', 'en', "The mother said that his daughter had left.", "La mère a dit que sa fille était partie."),
+        ('fr', 'en', "She heard news of his daughter at school.", "Elle a eu des nouvelles de sa fille à l'école."),
+    ] + [('en', 'fr', text, text) for text in corpus['translate'][:10]]
+    long_pairs = [('fr', 'en', document[0], 'La mère et sa fille. ' * 200) for document in documents]
+
+    return {
+        'detect_sentence_us': _percentiles(_time_calls(identifier.detect, sentences, args.repeat)),
+        'detect_document_us': _percentiles(_time_calls(identifier.detect, documents, args.repeat)),
+        'detect_runs_document_us': _percentiles(_time_calls(identifier.detect_runs, documents, args.repeat)),
+        'postprocess_sentence_us': _percentiles(_time_calls(services._postprocessor.apply, pairs, args.repeat)),
+        'postprocess_document_us': _percentiles(_time_calls(services._postprocessor.apply, long_pairs, args.repeat)),
+    }
+
+
+_STAGES = {
+    'cold': _stage_cold,
+    'warm': _stage_warm,
+    'overhead': _stage_overhead,
+}
+
+
+def _run_stage(queue, stage, args, models, corpus):
+    """Run one stage in this (fresh) process and put its report on ``queue``."""
+    try:
+        report = _STAGES[stage](args, models, corpus)
+        report['peak_rss_mb'] = _memory_mb()[1]
+        queue.put(report)
+    except Exception as e:
+        queue.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def _summary(stages):
+    """Flat {metric: value} of the headline numbers, for comparing reports."""
+    summary = {}
+    cold = stages.get('cold', {})
+    for key in ('import_seconds', 'translation_load_seconds', 'summarization_load_seconds'):
+        if key in cold:
+            summary[f'cold.{key}'] = cold[key]
+    warm = stages.get('warm', {})
+    for kind, buckets in warm.get('latency_ms', {}).items():
+        for chars, percentiles in buckets.items():
+            summary[f'latency.{kind}.{chars}.p50_ms'] = percentiles['p50']
+            summary[f'latency.{kind}.{chars}.p90_ms'] = percentiles['p90']
+    for kind, result in warm.get('throughput', {}).items():
+        summary[f'throughput.{kind}_per_s'] = result['per_second']
+    for key, percentiles in stages.get('overhead', {}).items():
+        if isinstance(percentiles, dict):
+            summary[f'overhead.{key}.p50'] = percentiles['p50']
+    for stage, report in stages.items():
+        if report.get('peak_rss_mb') is not None:
+            summary[f'peak_rss_mb.{stage}'] = report['peak_rss_mb']
+    return summary
+
+
+def _compare(previous, current):
+    """Print how every summary metric moved against an earlier report."""
+    print(f"{'metric':<46} {'before':>10} {'after':>10} {'change':>8}")
+    for metric, value in current.items():
+        before = previous.get(metric)
+        if before is None:
+            print(f"{metric:<46} {'-':>10} {value:>10}")
+            continue
+        change = f"{(value - before) / before * 100:+.1f}%" if before else '-'
+        print(f"{metric:<46} {before:>10} {value:>10} {change:>8}")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--translation-model', help='model directory or hub name (default: a tiny local Marian)')
+    parser.add_argument('--summarization-model', help='model directory or hub name (default: a tiny local BART)')
+    parser.add_argument('--models-dir', default=os.path.join(tempfile.gettempdir(), 'scholara-tiny-models'),
+                        help='where the tiny models are built (reused across runs)')
+    parser.add_argument('--stages', default=','.join(_STAGES), help='comma-separated subset of ' + ', '.join(_STAGES))
+    parser.add_argument('--tier', default=None, help='generation tier of every request (default: the service default)')
+    parser.add_argument('--iterations', type=int, default=5, help='requests per input length in the warm stage')
+    parser.add_argument('--requests', type=int, default=32, help='requests per kind in the throughput run')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads in the throughput run')
+    parser.add_argument('--throughput-chars', type=int, default=256, help='input length of the throughput run')
+    parser.add_argument('--repeat', type=int, default=20, help='passes over the inputs in the overhead stage')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='earlier JSON report to compare the summary against')
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in _STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    models = {'translation': args.translation_model, 'summarization': args.summarization_model}
+    if not all(models.values()):
+        from tiny_models import build_tiny_models
+        tiny = build_tiny_models(args.models_dir)
+        models = {kind: models[kind] or tiny[kind] for kind in tiny}
+        models['offline'] = not (args.translation_model or args.summarization_model)
+
+    raw = json.loads(CORPUS_PATH.read_text(encoding='utf-8'))
+    corpus = {
+        'translate': [item['text'] for item in raw['translation'] if item['source'] == 'en'],
+        'summarize': raw['summarization'],
+    }
+
+    ctx = multiprocessing.get_context('spawn')
+    results = {}
+    for stage in stages:
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_stage, args=(queue, stage, args, models, corpus))
+        started = time.perf_counter()
+        process.start()
+        results[stage] = queue.get()
+        process.join()
+        print(f"{stage}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    import torch
+    import transformers
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'machine': {
+            'cpu_count': os.cpu_count(),
+            'torch_threads': torch.get_num_threads(),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'torch': torch.__version__,
+            'transformers': transformers.__version__,
+        },
+        'translation_model': models['translation'],
+        'summarization_model': models['summarization'],
+        'tier': args.tier,
+        'stages': results,
+        'summary': _summary(results),
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    else:
+        print(output)
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        _compare(previous.get('summary', {}), report['summary'])
+
+
+if __name__ == '__main__':
+    main()
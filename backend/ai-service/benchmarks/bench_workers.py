@@ -0,0 +1,155 @@
+"""
+Measure how translation/summarization throughput scales with the number of
+forked inference workers (AI_WORKER_POOL_SIZE) on this machine.
+
+Each pool size runs in a fresh process: the models are loaded, the workers
+are forked exactly as the WSGI entry point does it, and a fixed number of
+uncached requests is sent from concurrent client threads. The report has
+throughput and latency percentiles per pool size, plus RSS and PSS (shared
+pages split between the processes that map them) of the front process and
+of every worker, which shows how much of the weights stay shared.
+Pool size 0 is the in-process baseline.
+
+Usage (from backend/ai-service):
+    python benchmarks/bench_workers.py
+    python benchmarks/bench_workers.py --max-workers 4 --requests 64 --kind summarize --output workers.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CORPUS_PATH = Path(__file__).resolve().parent / 'corpus.json'
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _run_pool(queue, workers, args, texts):
+    """Start a pool of ``workers`` in this (fresh) process and time ``args.requests`` calls."""
+    os.environ.update({
+        'DJANGO_SETTINGS_MODULE': 'ai_service.settings',
+        'AI_WORKER_POOL_SIZE': str(workers),
+        'AI_WORKER_CONCURRENCY': str(args.concurrency),
+        'AI_WORKER_CPU_AFFINITY': 'auto' if args.affinity else '',
+        'AI_WORKER_THREADS': str(args.threads),
+        # Every request must reach a model
+        'AI_CACHE_ENABLED': 'false',
+        'AI_TM_ENABLED': 'false',
+        'AI_ADMISSION_ENABLED': 'false',
+    })
+    try:
+        import django
+        django.setup()
+        from ai_tools import services
+
+        started = time.perf_counter()
+        if workers:
+            services.start_worker_pool()
+        else:
+            services.warm_up_models()
+        startup_seconds = time.perf_counter() - started
+
+        def call(index):
+            # A unique suffix per request keeps any cache from answering it
+            text = f"{texts[index % len(texts)]} ({index})"
+            started = time.perf_counter()
+            if args.kind == 'translate':
+                result = services.translate_text(text, 'fr', 'en', 'text', args.tier)
+            else:
+                result = services.summarize_text(text, 150, 'text', args.tier)
+            return (time.perf_counter() - started) * 1000, bool(result.get('error'))
+
+        clients = args.clients or max(1, workers) * args.concurrency * 2
+        with ThreadPoolExecutor(clients) as executor:
+            list(executor.map(call, range(clients)))  # warm up every worker
+            started = time.perf_counter()
+            samples = list(executor.map(call, range(args.requests)))
+            elapsed = time.perf_counter() - started
+
+        latencies = [ms for ms, _ in samples]
+        pool = services.get_worker_pool_stats()
+        queue.put({
+            'workers': workers,
+            'clients': clients,
+            'startup_seconds': round(startup_seconds, 2),
+            'throughput_per_s': round(len(samples) / elapsed, 2),
+            'errors': sum(1 for _, error in samples if error),
+            'latency_ms': {
+                'p50': round(_percentile(latencies, 50), 1),
+                'p90': round(_percentile(latencies, 90), 1),
+                'p99': round(_percentile(latencies, 99), 1),
+            },
+            'front': pool['front'],
+            'worker_memory': [
+                {'rss_mb': worker['rss_mb'], 'pss_mb': worker['pss_mb'], 'calls': worker['calls']}
+                for worker in pool['workers']
+            ],
+        })
+    except Exception as e:
+        queue.put({'workers': workers, 'error': str(e)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--kind', choices=['translate', 'summarize'], default='translate')
+    parser.add_argument('--tier', default='fast', help='generation tier of every request')
+    parser.add_argument('--requests', type=int, default=48)
+    parser.add_argument('--clients', type=int, default=0, help='concurrent client threads (0 = 2 x workers x concurrency)')
+    parser.add_argument('--concurrency', type=int, default=2, help='handler threads per worker')
+    parser.add_argument('--threads', type=int, default=0, help='torch threads per worker (0 = CPUs / workers)')
+    parser.add_argument('--affinity', action='store_true', help='pin each worker to its own CPUs')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    corpus = json.loads(CORPUS_PATH.read_text(encoding='utf-8'))
+    if args.kind == 'translate':
+        texts = [item['text'] for item in corpus['translation'] if item['source'] == 'en']
+    else:
+        texts = corpus['summarization']
+
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    for workers in range(0, args.max_workers + 1):
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_pool, args=(queue, workers, args, texts))
+        process.start()
+        result = queue.get()
+        process.join()
+        results.append(result)
+        print(f"{workers} workers: " + json.dumps(result), file=sys.stderr)
+
+    baseline = next((r['throughput_per_s'] for r in results if r.get('workers') == 0 and 'throughput_per_s' in r), None)
+    for result in results:
+        if baseline and 'throughput_per_s' in result:
+            result['speedup'] = round(result['throughput_per_s'] / baseline, 2)
+
+    report = {
+        'cpu_count': os.cpu_count(),
+        'kind': args.kind,
+        'tier': args.tier,
+        'translation_model': os.getenv('AI_TRANSLATION_MODEL'),
+        'summarization_model': os.getenv('AI_SUMMARIZATION_MODEL'),
+        'results': results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Build tiny randomly initialized Marian (translation) and BART (summarization)
+checkpoints so the benchmarks run offline.
+
+The models have two 32-wide layers and vocabularies trained on a small
+generated corpus, so their output is noise, but they go through the same
+tokenizers, pipelines and generate loops as the real checkpoints. Building
+is deterministic and skipped when the directories already exist.
+
+Usage (from backend/ai-service):
+    python benchmarks/tiny_models.py /tmp/scholara-tiny-models
+"""
+import json
+import random
+import shutil
+import sys
+from pathlib import Path
+
+_WORDS = (
+    "the course student teacher lecture note exam week schedule library "
+    "le la les cours étudiant professeur semaine examen notes bibliothèque "
+    "de du une un est sont pour avec dans sur and of to in"
+).split()
+
+
+def _write_corpus(path, seed):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as corpus:
+        for _ in range(3000):
+            corpus.write(' '.join(rng.choice(_WORDS) for _ in range(rng.randint(3, 15))) + '.\n')
+
+
+def _build_marian(directory, corpus):
+    import sentencepiece as spm
+    from transformers import MarianConfig, MarianMTModel, MarianTokenizer
+
+    directory.mkdir(parents=True, exist_ok=True)
+    spm.SentencePieceTrainer.train(
+        input=str(corpus), model_prefix=str(directory / 'spm'), vocab_size=80, hard_vocab_limit=False,
+        model_type='unigram', character_coverage=1.0, minloglevel=2,
+    )
+    (directory / 'spm.model').rename(directory / 'source.spm')
+    shutil.copy(directory / 'source.spm', directory / 'target.spm')
+    (directory / 'spm.vocab').unlink()
+    pieces = spm.SentencePieceProcessor(model_file=str(directory / 'source.spm'))
+    vocab = {'</s>': 0, '<unk>': 1, '<pad>': 2}
+    for index in range(pieces.get_piece_size()):
+        vocab.setdefault(pieces.id_to_piece(index), len(vocab))
+    (directory / 'vocab.json').write_text(json.dumps(vocab), encoding='utf-8')
+
+    tokenizer = MarianTokenizer(str(directory / 'source.spm'), str(directory / 'target.spm'), str(directory / 'vocab.json'))
+    config = MarianConfig(
+        vocab_size=len(vocab), d_model=32, encoder_layers=2, decoder_layers=2,
+        encoder_attention_heads=2, decoder_attention_heads=2, encoder_ffn_dim=64, decoder_ffn_dim=64,
+        max_position_embeddings=512, pad_token_id=2, eos_token_id=0, decoder_start_token_id=2,
+        forced_eos_token_id=0,
+    )
+    MarianMTModel(config).save_pretrained(directory)
+    tokenizer.save_pretrained(directory)
+
+
+def _build_bart(directory, corpus):
+    from tokenizers import ByteLevelBPETokenizer
+    from transformers import BartConfig, BartForConditionalGeneration, BartTokenizerFast
+
+    directory.mkdir(parents=True, exist_ok=True)
+    bpe = ByteLevelBPETokenizer()
+    bpe.train([str(corpus)], vocab_size=400, special_tokens=['<s>', '<pad>', '</s>', '<unk>', '<mask>'], show_progress=False)
+    bpe.save_model(str(directory))
+    tokenizer = BartTokenizerFast(vocab_file=str(directory / 'vocab.json'), merges_file=str(directory / 'merges.txt'))
+    config = BartConfig(
+        vocab_size=len(tokenizer), d_model=32, encoder_layers=2, decoder_layers=2,
+        encoder_attention_heads=2, decoder_attention_heads=2, encoder_ffn_dim=64, decoder_ffn_dim=64,
+        max_position_embeddings=1024,
+    )
+    BartForConditionalGeneration(config).save_pretrained(directory)
+    tokenizer.save_pretrained(directory)
+
+
+def build_tiny_models(root, seed=0):
+    """Build (or reuse) the tiny checkpoints under ``root``; returns {'translation': dir, 'summarization': dir}."""
+    import torch
+
+    root = Path(root)
+    models = {'translation': root / 'marian', 'summarization': root / 'bart'}
+    missing = [kind for kind, directory in models.items() if not (directory / 'config.json').exists()]
+    if missing:
+        root.mkdir(parents=True, exist_ok=True)
+        corpus = root / 'corpus.txt'
+        _write_corpus(corpus, seed)
+        torch.manual_seed(seed)
+        if 'translation' in missing:
+            _build_marian(models['translation'], corpus)
+        if 'summarization' in missing:
+            _build_bart(models['summarization'], corpus)
+    return {kind: str(directory) for kind, directory in models.items()}
+
+
+if __name__ == '__main__':
+    print(json.dumps(build_tiny_models(sys.argv[1] if len(sys.argv) > 1 else 'tiny_models'), indent=2))
@@ -1,59 +1,224 @@
 """
-Script to pre-download AI models during Docker build.
-This will cache the models in the Docker image to speed up deployment.
+Script to package the AI models during Docker build.
+
+Every model in the manifest (model_manifest.json) is downloaded and packaged
+into AI_PACKAGED_MODELS_DIR so the service loads it offline and fast (see
+ai_tools/packaging.py): safetensors weights, a fast tokenizer when it passes
+the token-parity check on the manifest's parity texts, and package.json.
+Models flagged "onnx" are also exported to ONNX Runtime graphs.
+
+Afterwards every packaged model is loaded cold in a fresh process, once the
+way the service loaded it before packaging (Hugging Face cache, slow
+translation tokenizers) and once from its package, and the load times and
+tokenization throughput of both are logged and saved to report.json in the
+packaged models directory. Both loads read files from a warm page cache.
+
+Usage (from backend/ai-service):
+    python download_models.py
+    python download_models.py --manifest model_manifest.json --output packaged_models --no-report
 """
+import argparse
+import json
+import multiprocessing
 import os
 import logging
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-import torch
+import resource
+import time
+from pathlib import Path
+from queue import Empty
+
+BASE_DIR = Path(__file__).resolve().parent
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def download_translation_models():
-    """Download commonly used translation models."""
-    models_to_download = [
-        "t5-small",  # Much smaller than Helsinki-NLP models
-        "Helsinki-NLP/opus-mt-en-fr",
-        "Helsinki-NLP/opus-mt-fr-en"
-    ]
-    
-    for model_name in models_to_download:
+# Copies of the parity texts tokenized for the throughput figures
+_THROUGHPUT_REPEAT = 50
+# Longest a cold-load measurement may take before it is recorded as an error
+_MEASURE_TIMEOUT_SECONDS = 600
+
+
+def load_manifest(path):
+    """Models and parity texts to package; AI_TRANSLATION_MODEL/AI_SUMMARIZATION_MODEL are added in."""
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    models = list(manifest.get('models', []))
+    summarization_model = os.getenv('AI_SUMMARIZATION_MODEL')
+    if summarization_model:
+        # The service only ever loads the configured summarization model
+        models = [entry for entry in models if entry['task'] != 'summarization']
+        models.append({'name': summarization_model, 'task': 'summarization', 'onnx': True})
+    translation_model = os.getenv('AI_TRANSLATION_MODEL')
+    if translation_model and translation_model not in {entry['name'] for entry in models}:
+        models.append({'name': translation_model, 'task': 'translation'})
+    return models, manifest.get('parity_texts', [])
+
+
+def package_models(models, models_dir, parity_texts):
+    """Package each model; returns {name: package.json contents} of the ones that succeeded."""
+    from ai_tools.packaging import package_model
+
+    packages = {}
+    for entry in models:
+        model_name = entry['name']
+        try:
+            logger.info(f"Packaging {entry['task']} model: {model_name}")
+            packages[model_name] = package_model(model_name, models_dir, entry['task'], parity_texts)
+            logger.info(f"✅ Successfully packaged: {model_name}")
+        except Exception as e:
+            logger.warning(f"Failed to package {model_name}: {e}")
+    return packages
+
+
+def export_onnx_models(models):
+    """Export the models to ONNX Runtime graphs so the image ships them pre-exported."""
+    if os.getenv('AI_EXPORT_ONNX', 'true').lower() in ('false', '0', 'no', 'off'):
+        logger.info("Skipping ONNX export (AI_EXPORT_ONNX is off)")
+        return
+    try:
+        from ai_tools.pipelines import export_onnx_model
+    except ImportError as e:
+        logger.warning(f"Skipping ONNX export, optimum/onnxruntime not available: {e}")
+        return
+
+    onnx_dir = os.getenv('AI_ONNX_DIR') or str(BASE_DIR / 'onnx_models')
+    for entry in models:
+        if not entry.get('onnx'):
+            continue
+        model_name = entry['name']
         try:
-            logger.info(f"Downloading translation model: {model_name}")
-            # Download tokenizer
-            tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=False)
-            # Download model
-            model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-            logger.info(f"✅ Successfully downloaded: {model_name}")
+            logger.info(f"Exporting to ONNX: {model_name}")
+            export_onnx_model(model_name, onnx_dir)
+            logger.info(f"✅ Successfully exported: {model_name}")
         except Exception as e:
-            logger.warning(f"Failed to download {model_name}: {e}")
+            logger.warning(f"Failed to export {model_name} to ONNX: {e}")
+
 
-def download_summarization_model():
-    """Download the summarization model."""
-    model_name = os.getenv('AI_SUMMARIZATION_MODEL') or "sshleifer/distilbart-cnn-12-6"
+def _peak_rss_mb():
+    """Peak RSS of this process in MB (VmHWM: ru_maxrss would carry over the parent's peak across exec)."""
     try:
-        logger.info(f"Downloading summarization model: {model_name}")
-        # Download tokenizer
-        tokenizer = AutoTokenizer.from_pretrained(model_name)
-        # Download model
-        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-        logger.info(f"✅ Successfully downloaded: {model_name}")
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+
+
+def _measure_load(queue, model_name, task, package, texts):
+    """Load a model cold (in a fresh process) and tokenize ``texts``; puts the timings on ``queue``."""
+    try:
+        from ai_tools.packaging import load_tokenizer
+        from ai_tools.pipelines import load_seq2seq_model
+
+        started = time.perf_counter()
+        # Translation models used the slow tokenizer before packaging
+        tokenizer = load_tokenizer(model_name, package, use_fast=task != 'translation')
+        tokenizer_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        load_seq2seq_model(model_name, source=package['path'] if package else None)
+        weights_seconds = time.perf_counter() - started
+        peak_rss_mb = _peak_rss_mb()
+
+        started = time.perf_counter()
+        tokens = sum(len(ids) for ids in tokenizer(texts)['input_ids'])
+        tokenize_seconds = time.perf_counter() - started
+        queue.put({
+            'tokenizer': type(tokenizer).__name__,
+            'tokenizer_load_s': round(tokenizer_seconds, 3),
+            'weights_load_s': round(weights_seconds, 3),
+            'load_s': round(tokenizer_seconds + weights_seconds, 3),
+            'tokens_per_s': round(tokens / tokenize_seconds) if tokenize_seconds else None,
+            'peak_rss_mb': peak_rss_mb,
+        })
     except Exception as e:
-        logger.warning(f"Failed to download {model_name}: {e}")
-        # Try fallback model - use a much smaller model
-        fallback_model = "sshleifer/distilbart-cnn-12-6"  # This is actually smaller than bart-large-xsum
+        queue.put({'error': str(e)})
+
+
+def _measure_in_process(model_name, task, package, texts):
+    """Run _measure_load in a fresh process; an error entry if it dies or times out without a result."""
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure_load, args=(queue, model_name, task, package, texts))
+    process.start()
+    deadline = time.monotonic() + _MEASURE_TIMEOUT_SECONDS
+    result = None
+    while result is None:
         try:
-            logger.info(f"Downloading fallback summarization model: {fallback_model}")
-            tokenizer = AutoTokenizer.from_pretrained(fallback_model)
-            model = AutoModelForSeq2SeqLM.from_pretrained(fallback_model)
-            logger.info(f"✅ Successfully downloaded fallback: {fallback_model}")
-        except Exception as e2:
-            logger.error(f"Failed to download fallback model {fallback_model}: {e2}")
+            result = queue.get(timeout=1)
+        except Empty:
+            if process.exitcode is not None:
+                try:
+                    # A result put just before exiting may still be on its way
+                    result = queue.get(timeout=1)
+                except Empty:
+                    # Killed (e.g. out of memory) before putting its result
+                    result = {'error': f"Measurement process exited with code {process.exitcode}"}
+            elif time.monotonic() >= deadline:
+                process.terminate()
+                result = {'error': f"Measurement timed out after {_MEASURE_TIMEOUT_SECONDS}s"}
+    process.join()
+    return result
+
+
+def report_load_times(models, packages, parity_texts, models_dir):
+    """Cold load time and tokenization throughput of each packaged model, before and after packaging."""
+    from ai_tools.packaging import read_package
+
+    texts = [text for text in parity_texts if text] * _THROUGHPUT_REPEAT
+    report = {'models': {}}
+    for entry in models:
+        if entry['name'] not in packages:
+            continue
+        package = read_package(models_dir, entry['name'])
+        before = _measure_in_process(entry['name'], entry['task'], None, texts)
+        after = _measure_in_process(entry['name'], entry['task'], package, texts)
+        report['models'][entry['name']] = {'before': before, 'after': after}
+        if 'error' in before or 'error' in after:
+            logger.warning(f"Could not measure {entry['name']}: {before.get('error') or after.get('error')}")
+            continue
+        logger.info(
+            f"📊 {entry['name']}: cold load {before['load_s']:.2f}s → {after['load_s']:.2f}s "
+            f"(tokenizer {before['tokenizer_load_s']:.2f}s → {after['tokenizer_load_s']:.2f}s, "
+            f"weights {before['weights_load_s']:.2f}s → {after['weights_load_s']:.2f}s), "
+            f"tokenization {before['tokens_per_s']:,} → {after['tokens_per_s']:,} tokens/s "
+            f"({before['tokenizer']} → {after['tokenizer']}), "
+            f"peak RSS {before['peak_rss_mb']} → {after['peak_rss_mb']} MB"
+        )
+
+    measured = [result for result in report['models'].values()
+                if 'error' not in result['before'] and 'error' not in result['after']]
+    if measured:
+        report['total_load_s'] = {
+            'before': round(sum(result['before']['load_s'] for result in measured), 3),
+            'after': round(sum(result['after']['load_s'] for result in measured), 3),
+        }
+        logger.info(f"📊 Total cold load of {len(measured)} models: "
+                    f"{report['total_load_s']['before']:.2f}s → {report['total_load_s']['after']:.2f}s")
+    with open(Path(models_dir) / 'report.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--manifest', default=str(BASE_DIR / 'model_manifest.json'))
+    parser.add_argument('--output', default=os.getenv('AI_PACKAGED_MODELS_DIR') or str(BASE_DIR / 'packaged_models'),
+                        help='packaged models directory (AI_PACKAGED_MODELS_DIR)')
+    parser.add_argument('--no-report', action='store_true', help='skip the before/after load measurements')
+    args = parser.parse_args()
+
+    models, parity_texts = load_manifest(args.manifest)
+    Path(args.output).mkdir(parents=True, exist_ok=True)
+    logger.info(f"Starting model packaging: {len(models)} models → {args.output}")
+    packages = package_models(models, args.output, parity_texts)
+    export_onnx_models(models)
+    if packages and not args.no_report:
+        report_load_times(models, packages, parity_texts, args.output)
+    logger.info("Model packaging completed.")
+
 
 if __name__ == "__main__":
-    logger.info("Starting model download process...")
-    download_translation_models()
-    download_summarization_model()
-    logger.info("Model download process completed.")
\ No newline at end of file
+    main()
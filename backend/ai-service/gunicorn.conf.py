@@ -0,0 +1,42 @@
+"""
+Gunicorn settings hooks for the ai-service (read from the working directory).
+
+With PROMETHEUS_MULTIPROC_DIR set, every process writes its metrics to files
+in that directory. Files left by a previous run are removed here, when the
+config is read and before --preload loads the app, and the files of workers
+that exit are marked dead so their per-process gauges drop out of /metrics.
+
+Each worker warms up the models on its own once it has forked, as the
+master's threads don't survive the fork (with AI_WORKER_POOL_SIZE the models
+are loaded before forking the inference pool instead); /api/ready/ reports
+ready when that is done.
+
+With --preload the inference pool is forked by the master and its results
+go back to a single front process, so it needs --workers 1.
+"""
+import os
+import shutil
+
+_metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if _metrics_dir:
+    shutil.rmtree(_metrics_dir, ignore_errors=True)
+    os.makedirs(_metrics_dir, exist_ok=True)
+
+
+def on_starting(server):
+    if server.cfg.preload_app and server.cfg.workers > 1:
+        from ai_tools.services import get_worker_pool_stats
+        if get_worker_pool_stats()['size']:
+            raise RuntimeError('The inference worker pool (AI_WORKER_POOL_SIZE / AI_WORKER_SHARDS) '
+                               'with --preload needs a single gunicorn worker (--workers 1)')
+
+
+def post_worker_init(worker):
+    from ai_tools.services import start_warmup
+    start_warmup()
+
+
+def child_exit(server, worker):
+    if _metrics_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -14,4 +14,10 @@ pip install -r requirements.txt
 # Collect static files
 python manage.py collectstatic --no-input
 
+# Package the AI models (as the Docker build does) so they load offline on first start
+python download_models.py --no-report
+
+# Create/upgrade the database tables (background jobs)
+python manage.py migrate --no-input
+
 echo "✅ AI Service build complete!"